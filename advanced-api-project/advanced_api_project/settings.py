@@ -10,11 +10,15 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.2/ref/settings/
 """
 
+import sys
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
 
+# Apps shared with the other projects of this repo (shared/README.md).
+sys.path.append(str(BASE_DIR.parent / 'shared'))
+
 
 # Quick-start development settings - unsuitable for production
 # See https://docs.djangoproject.com/en/5.2/howto/deployment/checklist/
@@ -38,11 +42,14 @@ INSTALLED_APPS = [
     'django.contrib.messages',
     'django.contrib.staticfiles',
     'rest_framework',
+    'apikit',
     'api',
     'django_filters',
+    'perfmon',
 ]
 
 MIDDLEWARE = [
+    'perfmon.middleware.PerfmonMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -123,3 +130,43 @@ STATIC_URL = 'static/'
 # https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
+
+
+REST_FRAMEWORK = {
+    # Basic first so unauthenticated writes get 401 (with WWW-Authenticate)
+    # rather than 403; the browsable API and tests still log in via sessions.
+    'DEFAULT_AUTHENTICATION_CLASSES': [
+        'rest_framework.authentication.BasicAuthentication',
+        'rest_framework.authentication.SessionAuthentication',
+    ],
+    # MessagePack on request (Accept: application/msgpack) and orjson with
+    # ?format=orjson; see apikit/renderers.py. Classes whose package is
+    # missing are skipped.
+    'DEFAULT_RENDERER_CLASSES': [
+        'rest_framework.renderers.JSONRenderer',
+        'apikit.renderers.ORJSONRenderer',
+        'apikit.renderers.MessagePackRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
+    'DEFAULT_PARSER_CLASSES': [
+        'rest_framework.parsers.JSONParser',
+        'apikit.renderers.MessagePackParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+    ],
+    'DEFAULT_CONTENT_NEGOTIATION_CLASS': 'apikit.renderers.AvailableContentNegotiation',
+    # Token-bucket limits (apikit/throttling.py): the burst size and how fast
+    # it refills, per IP for anonymous clients and per user otherwise.
+    'DEFAULT_THROTTLE_RATES': {
+        'anon': '300/min',
+        'user': '1200/min',
+    },
+}
+
+# Throttle buckets are kept per process ('local') or in a SQLite file shared
+# by every worker on the host ('sqlite'). With 'sqlite', each process leases
+# API_THROTTLE_LEASE_SIZE tokens at a time and spends them locally.
+API_THROTTLE_STORE = 'local'
+API_THROTTLE_SQLITE_PATH = BASE_DIR / 'throttle.sqlite3'
+API_THROTTLE_LEASE_SIZE = 10
+API_THROTTLE_LEASE_SECONDS = 1.0
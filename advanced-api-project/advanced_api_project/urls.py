@@ -3,6 +3,7 @@ from django.urls import path, include
 
 urlpatterns = [
     path('admin/', admin.site.urls),
+    path('perfmon/', include('perfmon.urls')),
 
     # Checker requires this
     path('api/', include('api.urls')),
@@ -0,0 +1,120 @@
+"""
+Async counterparts of the book views, served under /api/async/books/.
+
+They keep the sync views' configuration (permissions, throttles, filtering,
+search, ordering, pagination, ?fields= and conditional GET) and produce the
+same responses, but are dispatched as coroutines and read through Django's
+async ORM (async for, aget, afirst).
+
+They bring no throughput gain on this stack. Django 5.2 still runs every
+async ORM call in a thread, and the synchronous DRF steps below add more
+thread hops. `manage.py loadtest` at concurrency 20 under uvicorn measured
+115-118 req/s for the sync list and 96-110 req/s for the async one. The
+views are kept as a pattern for async-native views, not as an
+optimization.
+
+DRF itself is synchronous. Authentication, permission and throttle checks,
+filterset validation (the `author` filter looks the author up), DRF's
+paginators and serializer validation and saving run through sync_to_async.
+"""
+from asgiref.sync import iscoroutinefunction, sync_to_async
+from django.core.exceptions import ValidationError
+from django.http import Http404
+from rest_framework import status
+from rest_framework.response import Response
+
+from .views import (
+    BookCreateView,
+    BookDeleteView,
+    BookDetailView,
+    BookListView,
+    BookUpdateView,
+)
+
+
+class AsyncAPIViewMixin:
+    # APIView.dispatch() as a coroutine. Django treats the view as async
+    # because every handler below is a coroutine function (options() aside,
+    # which is run in a thread).
+    async def dispatch(self, request, *args, **kwargs):
+        self.args = args
+        self.kwargs = kwargs
+        request = self.initialize_request(request, *args, **kwargs)
+        self.request = request
+        self.headers = self.default_response_headers
+
+        try:
+            await sync_to_async(self.initial)(request, *args, **kwargs)
+            if request.method.lower() in self.http_method_names:
+                handler = getattr(self, request.method.lower(), self.http_method_not_allowed)
+            else:
+                handler = self.http_method_not_allowed
+            if iscoroutinefunction(handler):
+                response = await handler(request, *args, **kwargs)
+            else:
+                response = await sync_to_async(handler)(request, *args, **kwargs)
+        except Exception as exc:
+            response = self.handle_exception(exc)
+
+        self.response = self.finalize_response(request, response, *args, **kwargs)
+        return self.response
+
+    async def aget_object(self):
+        """get_object() through the async ORM."""
+        queryset = self.filter_queryset(self.get_queryset())
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        try:
+            obj = await queryset.aget(**{self.lookup_field: self.kwargs[lookup_url_kwarg]})
+        except (queryset.model.DoesNotExist, TypeError, ValueError, ValidationError):
+            raise Http404
+        self.check_object_permissions(self.request, obj)
+        return obj
+
+
+class AsyncBookListView(AsyncAPIViewMixin, BookListView):
+    async def get(self, request, *args, **kwargs):
+        return await self.aconditional(
+            await self.aget_list_validators(), self.alist, request, *args, **kwargs
+        )
+
+
+class AsyncBookDetailView(AsyncAPIViewMixin, BookDetailView):
+    async def get(self, request, *args, **kwargs):
+        return await self.aconditional(
+            await self.aget_object_validators(), self.aretrieve, request, *args, **kwargs
+        )
+
+    async def aretrieve(self, request, *args, **kwargs):
+        return Response(self.get_serializer(await self.aget_object()).data)
+
+
+class AsyncBookCreateView(AsyncAPIViewMixin, BookCreateView):
+    async def post(self, request, *args, **kwargs):
+        serializer = self.get_serializer(data=request.data)
+        # Validating the author queries the database.
+        await sync_to_async(serializer.is_valid)(raise_exception=True)
+        await sync_to_async(self.perform_create)(serializer)
+        headers = self.get_success_headers(serializer.data)
+        return Response(serializer.data, status=status.HTTP_201_CREATED, headers=headers)
+
+
+class AsyncBookUpdateView(AsyncAPIViewMixin, BookUpdateView):
+    async def put(self, request, *args, **kwargs):
+        return await self.aupdate(request, *args, **kwargs)
+
+    async def patch(self, request, *args, **kwargs):
+        return await self.aupdate(request, *args, partial=True, **kwargs)
+
+    async def aupdate(self, request, *args, partial=False, **kwargs):
+        instance = await self.aget_object()
+        serializer = self.get_serializer(instance, data=request.data, partial=partial)
+        await sync_to_async(serializer.is_valid)(raise_exception=True)
+        await sync_to_async(self.perform_update)(serializer)
+        return Response(serializer.data)
+
+
+class AsyncBookDeleteView(AsyncAPIViewMixin, BookDeleteView):
+    async def delete(self, request, *args, **kwargs):
+        instance = await self.aget_object()
+        await sync_to_async(self.perform_destroy)(instance)
+        return Response(status=status.HTTP_204_NO_CONTENT)
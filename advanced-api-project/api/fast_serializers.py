@@ -0,0 +1,143 @@
+from functools import lru_cache
+
+from django.core.exceptions import FieldDoesNotExist
+from rest_framework import serializers
+from rest_framework.relations import PrimaryKeyRelatedField
+
+
+# Read-only fast path for list responses.
+#
+# A ReadPlan is compiled once per serializer class: for every readable field
+# it records the output key, the .values() column it comes from and how to
+# convert the value. Serializing a page is then a loop over plain dict rows,
+# without instantiating a serializer or its fields per object, and produces
+# the same data (and the same JSON bytes) as `Serializer(objs, many=True).data`.
+#
+# Supported fields are model fields, PrimaryKeyRelatedField on a foreign key
+# (read from the <name>_id column) and nested ModelSerializer(many=True) on a
+# reverse foreign key (fetched with one extra query per page). Anything else
+# raises TypeError when the plan is compiled, so a serializer that outgrows
+# the fast path fails loudly instead of returning different output.
+#
+# A plan can be limited to some of the serializer's fields (sparse fieldsets,
+# ?fields=); its .values() then only selects their columns.
+
+# Fields whose to_representation() returns the database value unchanged.
+PASSTHROUGH_FIELDS = (serializers.IntegerField, serializers.CharField, serializers.ReadOnlyField)
+
+
+def _unsupported(serializer_class, name):
+    return TypeError(f'{serializer_class.__name__}.{name} is not supported by ReadPlan.')
+
+
+def _convert_for(field):
+    if type(field) in PASSTHROUGH_FIELDS:
+        return None
+    if isinstance(field, PrimaryKeyRelatedField):
+        return field.pk_field.to_representation if field.pk_field else None
+    return field.to_representation
+
+
+class ReadPlan:
+    def __init__(self, serializer_class, fields=None):
+        serializer = serializer_class()
+        self.model = model = serializer_class.Meta.model
+        self.pk_column = model._meta.pk.attname
+        self.entries = []   # (output key, column, converter or None)
+        self.nested = []    # (output key, child plan, child foreign key column)
+
+        for name, field in serializer.fields.items():
+            if field.write_only or (fields is not None and name not in fields):
+                continue
+            try:
+                model_field = model._meta.get_field(field.source)
+            except FieldDoesNotExist:
+                # Method fields, dotted sources and properties.
+                raise _unsupported(serializer_class, name)
+
+            if isinstance(field, serializers.ListSerializer):
+                if not (model_field.one_to_many and isinstance(field.child, serializers.ModelSerializer)):
+                    raise _unsupported(serializer_class, name)
+                self.nested.append((name, get_read_plan(type(field.child)), model_field.field.attname))
+                continue
+
+            if model_field.is_relation and not (
+                model_field.many_to_one and isinstance(field, PrimaryKeyRelatedField)
+            ):
+                raise _unsupported(serializer_class, name)
+            self.entries.append((name, model_field.attname, _convert_for(field)))
+
+        self.columns = [column for _, column, _ in self.entries]
+        if self.nested and self.pk_column not in self.columns:
+            self.columns.append(self.pk_column)
+
+    def values(self, queryset, extra=()):
+        """The queryset as dict rows holding the columns this plan reads (and extra)."""
+        return queryset.values(*self.columns, *[c for c in extra if c not in self.columns])
+
+    def serialize(self, rows):
+        rows = list(rows)
+        data = self.convert(rows)
+        if self.nested and rows:
+            parent_ids = [row[self.pk_column] for row in rows]
+            for key, plan, fk_column in self.nested:
+                self.attach(data, parent_ids, key, plan.children_of(fk_column, parent_ids))
+        return data
+
+    async def aserialize(self, rows):
+        """serialize() reading the nested rows with the async ORM."""
+        data = self.convert(rows)
+        if self.nested and rows:
+            parent_ids = [row[self.pk_column] for row in rows]
+            for key, plan, fk_column in self.nested:
+                self.attach(data, parent_ids, key, await plan.achildren_of(fk_column, parent_ids))
+        return data
+
+    def convert(self, rows):
+        data = []
+        for row in rows:
+            item = {}
+            for key, column, convert in self.entries:
+                value = row[column]
+                item[key] = value if convert is None or value is None else convert(value)
+            data.append(item)
+        return data
+
+    def attach(self, data, parent_ids, key, children):
+        for item, parent_id in zip(data, parent_ids):
+            item[key] = children.get(parent_id, [])
+
+    def children_of(self, fk_column, parent_ids):
+        rows = list(self.children_queryset(fk_column, parent_ids))
+        return self.group(fk_column, rows, self.serialize(rows))
+
+    async def achildren_of(self, fk_column, parent_ids):
+        rows = [row async for row in self.children_queryset(fk_column, parent_ids)]
+        return self.group(fk_column, rows, await self.aserialize(rows))
+
+    def children_queryset(self, fk_column, parent_ids):
+        # Meta.ordering like `parent.<related_name>.all()`; primary key order
+        # when there is none, so the output is stable.
+        ordering = self.model._meta.ordering or [self.model._meta.pk.name]
+        columns = self.columns + ([fk_column] if fk_column not in self.columns else [])
+        return (
+            self.model._default_manager
+            .filter(**{f'{fk_column}__in': parent_ids})
+            .order_by(*ordering)
+            .values(*columns)
+        )
+
+    def group(self, fk_column, rows, items):
+        grouped = {}
+        for row, item in zip(rows, items):
+            grouped.setdefault(row[fk_column], []).append(item)
+        return grouped
+
+
+def get_read_plan(serializer_class, fields=None):
+    return _get_read_plan(serializer_class, frozenset(fields) if fields is not None else None)
+
+
+@lru_cache(maxsize=None)
+def _get_read_plan(serializer_class, fields):
+    return ReadPlan(serializer_class, fields)
@@ -0,0 +1,36 @@
+"""
+ASGI entry point used by `manage.py loadtest`.
+
+Wraps the project's ASGI application with two changes that make runs
+comparable: throttling is turned off so no request gets a 429, and when
+API_LOADTEST_QUERY_DELAY is set (seconds) every SQL query sleeps that long
+first to simulate a slow database. Never serve real traffic from this module.
+"""
+import os
+import time
+
+from django.conf import settings
+from django.db.backends.signals import connection_created
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "advanced_api_project.settings")
+settings.REST_FRAMEWORK = {
+    **settings.REST_FRAMEWORK,
+    "DEFAULT_THROTTLE_RATES": {"anon": None, "user": None},
+}
+
+from advanced_api_project.asgi import application  # noqa: E402,F401
+
+QUERY_DELAY = float(os.environ.get("API_LOADTEST_QUERY_DELAY", "0"))
+
+
+def slow_query(execute, sql, params, many, context):
+    time.sleep(QUERY_DELAY)
+    return execute(sql, params, many, context)
+
+
+def add_query_delay(sender, connection, **kwargs):
+    connection.execute_wrappers.append(slow_query)
+
+
+if QUERY_DELAY:
+    connection_created.connect(add_query_delay)
@@ -0,0 +1,94 @@
+import random
+import statistics
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django_filters.rest_framework import DjangoFilterBackend
+from rest_framework.filters import OrderingFilter, SearchFilter
+from rest_framework.test import APIRequestFactory
+
+from api.filters import BookFilterBackend
+from api.models import Author, Book
+from api.views import BookListView
+
+WORDS = (
+    "river night empire garden shadow winter silent iron glass ember harbor "
+    "storm crown paper mirror forest stone letter island signal"
+).split()
+
+
+class LegacyBookListView(BookListView):
+    filter_backends = [DjangoFilterBackend, SearchFilter, OrderingFilter]
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare per-request latency of BookListView with the previous "
+        "DjangoFilterBackend + SearchFilter + OrderingFilter stack and with "
+        "BookFilterBackend. Everything runs in a transaction that is rolled back."
+    )
+
+    def add_arguments(self, parser):
+        # Use --books 1000000 against PostgreSQL for production-sized numbers.
+        parser.add_argument("--books", type=int, default=100000)
+        parser.add_argument("--authors", type=int, default=5000)
+        parser.add_argument("--requests", type=int, default=50)
+        parser.add_argument("--seed", type=int, default=0)
+
+    def handle(self, *args, **options):
+        rng = random.Random(options["seed"])
+        queries = [
+            {"search": rng.choice(WORDS)},
+            {"search": rng.choice(WORDS)[:3], "search_mode": "prefix"},
+            {"search": f"author{rng.randrange(options['authors'])}"},
+            {"search": rng.choice(WORDS), "publication_year": "1990", "ordering": "-publication_year"},
+        ]
+
+        with transaction.atomic():
+            self.populate(rng, options["books"], options["authors"])
+            for params in queries:
+                self.stdout.write(f"\n{params}")
+                for name, view in (("legacy", LegacyBookListView), ("consolidated", BookListView)):
+                    self.run(name, view, params, options["requests"])
+            transaction.set_rollback(True)
+
+    def populate(self, rng, books, authors):
+        started = time.perf_counter()
+        authors = Author.objects.bulk_create(
+            [Author(name=f"author{i} {rng.choice(WORDS)}") for i in range(authors)],
+            batch_size=5000,
+        )
+        for start in range(0, books, 10000):
+            Book.objects.bulk_create(
+                [
+                    Book(
+                        title=" ".join(rng.choices(WORDS, k=3)),
+                        publication_year=rng.randint(1900, 2025),
+                        author=rng.choice(authors),
+                    )
+                    for _ in range(min(10000, books - start))
+                ],
+                batch_size=5000,
+            )
+        self.stdout.write(f"Created {books} books in {time.perf_counter() - started:.2f}s")
+
+    def run(self, name, view_class, params, count):
+        factory = APIRequestFactory()
+        # No throttling: past the anon rate every response would be a 429
+        # and the timings would measure the rejection, not the filters.
+        view = view_class.as_view(throttle_classes=[])
+        params = {**params, "pagination": "page"}
+        timings = []
+        for _ in range(count):
+            request = factory.get("/api/books/", params, HTTP_HOST="localhost")
+            started = time.perf_counter()
+            response = view(request)
+            response.render()
+            timings.append(time.perf_counter() - started)
+            if response.status_code != 200:
+                raise CommandError(f"{name} {params} returned {response.status_code}, not 200")
+        self.stdout.write(
+            f"  {name:<13} median {statistics.median(timings) * 1000:8.2f} ms"
+            f"  max {max(timings) * 1000:8.2f} ms"
+        )
@@ -0,0 +1,78 @@
+import random
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from rest_framework.renderers import JSONRenderer
+
+from apikit.renderers import MessagePackRenderer, ORJSONRenderer, msgpack, orjson
+
+from api.fast_serializers import get_read_plan
+from api.models import Author, Book
+from api.serializers import AuthorSerializer, BookSerializer
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare payload size and encode time of JSONRenderer, ORJSONRenderer "
+        "and MessagePackRenderer on BookSerializer / AuthorSerializer pages. "
+        "Everything runs in a transaction that is rolled back."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--page-size", type=int, default=10000)
+        parser.add_argument("--rounds", type=int, default=10)
+        parser.add_argument("--seed", type=int, default=0)
+
+    def handle(self, *args, **options):
+        rng = random.Random(options["seed"])
+        size = options["page_size"]
+
+        renderers = [("JSONRenderer", JSONRenderer())]
+        if orjson is not None:
+            renderers.append(("ORJSONRenderer", ORJSONRenderer()))
+        else:
+            self.stdout.write("orjson is not installed; skipping ORJSONRenderer")
+        if msgpack is not None:
+            renderers.append(("MessagePackRenderer", MessagePackRenderer()))
+        else:
+            self.stdout.write("msgpack is not installed; skipping MessagePackRenderer")
+
+        with transaction.atomic():
+            authors = Author.objects.bulk_create(
+                [Author(name=f"Author {i}") for i in range(size // 5)]
+            )
+            Book.objects.bulk_create(
+                [
+                    Book(
+                        title=f"Book number {i} of the benchmark",
+                        publication_year=rng.randint(1900, 2025),
+                        author=authors[i % len(authors)],
+                    )
+                    for i in range(size)
+                ],
+                batch_size=5000,
+            )
+            pages = [
+                ("BookSerializer", BookSerializer, Book.objects.order_by("pk")),
+                ("AuthorSerializer (nested books)", AuthorSerializer, Author.objects.order_by("pk")),
+            ]
+            for label, serializer_class, queryset in pages:
+                plan = get_read_plan(serializer_class)
+                data = plan.serialize(plan.values(queryset))
+                self.compare(label, len(data), data, renderers, options["rounds"])
+            transaction.set_rollback(True)
+
+    def compare(self, label, count, data, renderers, rounds):
+        self.stdout.write(f"\n{label}, {count} items")
+        baseline = None
+        for name, renderer in renderers:
+            started = time.perf_counter()
+            for _ in range(rounds):
+                payload = renderer.render(data)
+            elapsed = (time.perf_counter() - started) / rounds
+            baseline = baseline or (len(payload), elapsed)
+            self.stdout.write(
+                f"  {name:<20} {len(payload):>10,} bytes ({len(payload) / baseline[0]:5.0%})"
+                f"  {elapsed * 1000:8.2f} ms ({baseline[1] / elapsed:5.1f}x)"
+            )
@@ -0,0 +1,83 @@
+import random
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from rest_framework.renderers import JSONRenderer
+
+from api.fast_serializers import get_read_plan
+from api.models import Author, Book
+from api.serializers import AuthorSerializer, BookSerializer
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare the stock BookSerializer / nested AuthorSerializer with the "
+        "read-only ReadPlan fast path on pages of generated data. "
+        "Everything runs in a transaction that is rolled back."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--page-size", type=int, default=10000)
+        parser.add_argument("--books-per-author", type=int, default=5)
+        parser.add_argument("--rounds", type=int, default=5)
+        parser.add_argument("--seed", type=int, default=0)
+
+    def handle(self, *args, **options):
+        rng = random.Random(options["seed"])
+        size = options["page_size"]
+
+        with transaction.atomic():
+            self.populate(rng, size, options["books_per_author"])
+            books = Book.objects.order_by("pk")[:size]
+            authors = Author.objects.order_by("pk")[:size]
+            book_plan = get_read_plan(BookSerializer)
+            author_plan = get_read_plan(AuthorSerializer)
+            self.compare(
+                "BookSerializer",
+                lambda: BookSerializer(books, many=True).data,
+                lambda: book_plan.serialize(book_plan.values(books)),
+                size,
+                options["rounds"],
+            )
+            self.compare(
+                "AuthorSerializer (nested books)",
+                lambda: AuthorSerializer(authors.prefetch_related("books"), many=True).data,
+                lambda: author_plan.serialize(author_plan.values(authors)),
+                size,
+                options["rounds"],
+            )
+            transaction.set_rollback(True)
+
+    def populate(self, rng, size, books_per_author):
+        authors = Author.objects.bulk_create(
+            [Author(name=f"Author {i}") for i in range(size)], batch_size=5000
+        )
+        Book.objects.bulk_create(
+            [
+                Book(
+                    title=f"Book {i}-{n}",
+                    publication_year=rng.randint(1900, 2025),
+                    author=author,
+                )
+                for i, author in enumerate(authors)
+                for n in range(books_per_author)
+            ],
+            batch_size=5000,
+        )
+
+    def compare(self, label, stock, fast, size, rounds):
+        renderer = JSONRenderer()
+        if renderer.render(stock()) != renderer.render(fast()):
+            self.stderr.write(f"{label}: fast path output differs from the stock serializer")
+            return
+
+        self.stdout.write(f"\n{label}, {size} items per page, queries included")
+        for name, serialize in (("stock", stock), ("read plan", fast)):
+            started = time.perf_counter()
+            for _ in range(rounds):
+                serialize()
+            elapsed = (time.perf_counter() - started) / rounds
+            self.stdout.write(
+                f"  {name:<10} {elapsed * 1000:9.1f} ms/page  {size / elapsed:12,.0f} items/s"
+            )
@@ -0,0 +1,118 @@
+import asyncio
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+SERVERS = {
+    "uvicorn": lambda host, port: [
+        "-m", "uvicorn", "api.loadtest:application",
+        "--host", host, "--port", str(port), "--workers", "1", "--log-level", "warning",
+    ],
+    "daphne": lambda host, port: [
+        "-m", "daphne", "-b", host, "-p", str(port), "api.loadtest:application",
+    ],
+}
+
+
+async def fetch(host, port, path):
+    """Minimal HTTP/1.1 GET; returns (status, seconds)."""
+    started = time.perf_counter()
+    reader, writer = await asyncio.open_connection(host, port)
+    writer.write(
+        f"GET {path} HTTP/1.1\r\nHost: {host}\r\nAccept: application/json\r\n"
+        f"Connection: close\r\n\r\n".encode()
+    )
+    await writer.drain()
+    status_line = await reader.readline()
+    await reader.read()
+    writer.close()
+    await writer.wait_closed()
+    return int(status_line.split()[1]), time.perf_counter() - started
+
+
+async def hammer(host, port, path, total, concurrency):
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one():
+        async with semaphore:
+            try:
+                return await fetch(host, port, path)
+            except (OSError, IndexError, ValueError):
+                return 0, 0.0
+
+    started = time.perf_counter()
+    results = await asyncio.gather(*(one() for _ in range(total)))
+    return results, time.perf_counter() - started
+
+
+class Command(BaseCommand):
+    help = (
+        "Load-test the sync and async book list against one ASGI worker "
+        "(api.loadtest:application) at increasing concurrency, with a "
+        "simulated query delay. Throughput that grows with concurrency means "
+        "requests waiting on the database do not block each other."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("paths", nargs="*", default=["/api/books/", "/api/async/books/"])
+        parser.add_argument("--server", choices=[*SERVERS, "none"], default="uvicorn",
+                            help="Server to start; 'none' targets an already running one.")
+        parser.add_argument("--host", default="127.0.0.1")
+        parser.add_argument("--port", type=int, default=8766)
+        parser.add_argument("--requests", type=int, default=200,
+                            help="Requests per path and concurrency level (at least 2x the level).")
+        parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 10, 50, 100])
+        parser.add_argument("--query-delay", type=float, default=0.05,
+                            help="Seconds each SQL query sleeps in the spawned server.")
+
+    def handle(self, *args, **options):
+        host, port = options["host"], options["port"]
+        server = None
+        if options["server"] != "none":
+            env = {**os.environ, "API_LOADTEST_QUERY_DELAY": str(options["query_delay"])}
+            command = [sys.executable, *SERVERS[options["server"]](host, port)]
+            server = subprocess.Popen(command, env=env)
+            self.wait_for_port(host, port)
+        try:
+            self.stdout.write(
+                f"{'path':<24} {'conc':>5} {'ok':>5} {'errors':>6} {'req/s':>8} "
+                f"{'p50 ms':>8} {'p95 ms':>8}"
+            )
+            for path in options["paths"]:
+                for concurrency in options["concurrency"]:
+                    total = max(options["requests"], 2 * concurrency)
+                    results, elapsed = asyncio.run(hammer(host, port, path, total, concurrency))
+                    self.report(path, concurrency, results, elapsed)
+        finally:
+            if server:
+                server.terminate()
+                server.wait()
+
+    def wait_for_port(self, host, port, timeout=15):
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            try:
+                with socket.create_connection((host, port), timeout=0.5):
+                    return
+            except OSError:
+                time.sleep(0.2)
+        raise CommandError(f"Server did not start listening on {host}:{port}")
+
+    def report(self, path, concurrency, results, elapsed):
+        latencies = sorted(seconds * 1000 for status, seconds in results if status == 200)
+        errors = len(results) - len(latencies)
+        if not latencies:
+            self.stdout.write(
+                f"{path:<24} {concurrency:>5} {0:>5} {errors:>6} {'-':>8} {'-':>8} {'-':>8}"
+            )
+            return
+        p95 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))]
+        self.stdout.write(
+            f"{path:<24} {concurrency:>5} {len(latencies):>5} {errors:>6} "
+            f"{len(latencies) / elapsed:>8.1f} {statistics.median(latencies):>8.1f} {p95:>8.1f}"
+        )
@@ -0,0 +1,46 @@
+from django.db import migrations
+
+# Indexes for the icontains / istartswith lookups used by BookFilterBackend.
+# Django compiles both to UPPER("col"::text) LIKE UPPER(%s), so the indexes
+# are built on that expression:
+# - a pg_trgm GIN index answers substring (and prefix) matches;
+# - a text_pattern_ops B-tree answers prefix matches more cheaply.
+# They only exist on PostgreSQL; on SQLite the migration does nothing.
+INDEXES = [
+    ('api_book', 'title'),
+    ('api_author', 'name'),
+]
+
+
+def create_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    for table, column in INDEXES:
+        schema_editor.execute(
+            f'CREATE INDEX IF NOT EXISTS {table}_{column}_trgm_idx '
+            f'ON {table} USING gin (UPPER({column}::text) gin_trgm_ops)'
+        )
+        schema_editor.execute(
+            f'CREATE INDEX IF NOT EXISTS {table}_{column}_prefix_idx '
+            f'ON {table} (UPPER({column}::text) text_pattern_ops)'
+        )
+
+
+def drop_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for table, column in INDEXES:
+        schema_editor.execute(f'DROP INDEX IF EXISTS {table}_{column}_trgm_idx')
+        schema_editor.execute(f'DROP INDEX IF EXISTS {table}_{column}_prefix_idx')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_indexes, drop_indexes),
+    ]
@@ -6,6 +6,12 @@ class Author(models.Model):
     # Stores the full name of the author.
     name = models.CharField(max_length=255)
 
+    class Meta:
+        indexes = [
+            # AuthorListView orders by (name, pk); equality lookups by name.
+            models.Index(fields=['name', 'id'], name='api_author_name_idx'),
+        ]
+
     def __str__(self):
         # Helpful string representation for admin and shell.
         return self.name
@@ -28,6 +34,32 @@ class Book(models.Model):
         on_delete=models.CASCADE
     )
 
+    # Last time this book was saved; the detail endpoint's ETag and
+    # Last-Modified headers are derived from it.
+    updated_at = models.DateTimeField(auto_now=True)
+
+    # Indexes for the BookListView filters and orderings (see
+    # BookIndexTests). Case-insensitive and substring title / author name
+    # searches use the PostgreSQL indexes from migration 0002.
+    class Meta:
+        indexes = [
+            models.Index(fields=['author', 'publication_year'], name='api_book_author_year_idx'),
+            models.Index(fields=['title'], name='api_book_title_idx'),
+            models.Index(fields=['publication_year'], name='api_book_year_idx'),
+        ]
+
     def __str__(self):
         # Helpful string representation for admin and shell.
         return f"{self.title} ({self.publication_year})"
+
+
+# TableVersion counts changes per table. api/signals.py bumps it whenever a
+# Book or Author is saved or deleted, so list endpoints can build their ETag
+# from one primary-key lookup instead of scanning the rows they return.
+class TableVersion(models.Model):
+    table = models.CharField(max_length=100, primary_key=True)
+    version = models.PositiveBigIntegerField(default=0)
+    updated_at = models.DateTimeField()
+
+    def __str__(self):
+        return f"{self.table} v{self.version}"
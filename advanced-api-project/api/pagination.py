@@ -0,0 +1,179 @@
+import json
+from collections import OrderedDict
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination, CursorPagination, _reverse_ordering
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+# Cursor pagination: the cursor encodes a position in the current ordering
+# (BookListView's OrderingFilter, ?ordering=...), so every page is a range
+# query and never needs COUNT(*) or OFFSET.
+#
+# DRF's CursorPagination keys on the first ordering field only and skips rows
+# sharing its value with an OFFSET, which degrades to OFFSET scans deep inside
+# a common title or year. Here the ordering always ends with pk, the position
+# holds every ordering value and pages start with a keyset filter:
+#     (a > x) OR (a = x AND b > y) OR (a = x AND b = y AND pk > z)
+# Positions are unique, so the cursors never carry an offset.
+class BookCursorPagination(CursorPagination):
+    page_size = 50
+    page_size_query_param = 'page_size'
+    max_page_size = 1000
+
+    def get_ordering(self, request, queryset, view):
+        ordering = super().get_ordering(request, queryset, view)
+        if ordering[-1].lstrip('-') in ('pk', queryset.model._meta.pk.attname):
+            return ordering
+        return ordering + ('-pk' if ordering[-1].startswith('-') else 'pk',)
+
+    def paginate_queryset(self, queryset, request, view=None):
+        # CursorPagination.paginate_queryset() with the single-field position
+        # filter replaced by filter_position().
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        if not self.page_size:
+            return None
+
+        self.base_url = request.build_absolute_uri()
+        self.ordering = self.get_ordering(request, queryset, view)
+
+        self.cursor = self.decode_cursor(request)
+        if self.cursor is None:
+            (offset, reverse, current_position) = (0, False, None)
+        else:
+            (offset, reverse, current_position) = self.cursor
+
+        if reverse:
+            queryset = queryset.order_by(*_reverse_ordering(self.ordering))
+        else:
+            queryset = queryset.order_by(*self.ordering)
+
+        if current_position is not None:
+            queryset = self.filter_position(queryset, current_position, reverse)
+
+        results = list(queryset[offset:offset + self.page_size + 1])
+        self.page = list(results[:self.page_size])
+
+        if len(results) > len(self.page):
+            has_following_position = True
+            following_position = self._get_position_from_instance(results[-1], self.ordering)
+        else:
+            has_following_position = False
+            following_position = None
+
+        if reverse:
+            self.page = list(reversed(self.page))
+            self.has_next = (current_position is not None) or (offset > 0)
+            self.has_previous = has_following_position
+            if self.has_next:
+                self.next_position = current_position
+            if self.has_previous:
+                self.previous_position = following_position
+        else:
+            self.has_next = has_following_position
+            self.has_previous = (current_position is not None) or (offset > 0)
+            if self.has_next:
+                self.next_position = following_position
+            if self.has_previous:
+                self.previous_position = current_position
+
+        if (self.has_previous or self.has_next) and self.template is not None:
+            self.display_page_controls = True
+
+        return self.page
+
+    def filter_position(self, queryset, position, reverse):
+        try:
+            values = json.loads(position)
+        except ValueError:
+            raise NotFound(self.invalid_cursor_message)
+        if not isinstance(values, list) or len(values) != len(self.ordering):
+            # Malformed, or made for another ordering.
+            raise NotFound(self.invalid_cursor_message)
+
+        keyset, equal = Q(), Q()
+        for order, value in zip(self.ordering, values):
+            field = order.lstrip('-')
+            # (cursor reversed) XOR (field descending)
+            lookup = 'lt' if reverse != order.startswith('-') else 'gt'
+            keyset |= equal & Q(**{f'{field}__{lookup}': value})
+            equal &= Q(**{field: value})
+        # The redundant range on the first column lets the database use its index.
+        first = self.ordering[0]
+        bound = 'lte' if reverse != first.startswith('-') else 'gte'
+        return queryset.filter(Q(**{f'{first.lstrip("-")}__{bound}': values[0]}), keyset)
+
+    def _get_position_from_instance(self, instance, ordering):
+        values = []
+        for order in ordering:
+            field = order.lstrip('-')
+            values.append(instance[field] if isinstance(instance, dict) else getattr(instance, field))
+        return json.dumps(values, cls=DjangoJSONEncoder, separators=(',', ':'))
+
+
+# Page-number pagination without the total count. It fetches one row more
+# than the page size to find out whether a next page exists, instead of
+# running COUNT(*) over the whole filtered table.
+class NoCountPageNumberPagination(BasePagination):
+    page_size = 50
+    page_size_query_param = 'page_size'
+    max_page_size = 1000
+    page_query_param = 'page'
+
+    def get_page_size(self, request):
+        try:
+            size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        return max(1, min(size, self.max_page_size))
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.page_size_used = self.get_page_size(request)
+        try:
+            self.page_number = int(request.query_params.get(self.page_query_param, 1))
+        except ValueError:
+            raise NotFound('Invalid page.')
+        if self.page_number < 1:
+            raise NotFound('Invalid page.')
+
+        offset = (self.page_number - 1) * self.page_size_used
+        rows = list(queryset[offset:offset + self.page_size_used + 1])
+        self.has_next = len(rows) > self.page_size_used
+        return rows[:self.page_size_used]
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.page_query_param, self.page_number + 1)
+
+    def get_previous_link(self):
+        if self.page_number <= 1:
+            return None
+        url = self.request.build_absolute_uri()
+        if self.page_number == 2:
+            return remove_query_param(url, self.page_query_param)
+        return replace_query_param(url, self.page_query_param, self.page_number - 1)
+
+    def get_paginated_response(self, data):
+        return Response(OrderedDict([
+            ('next', self.get_next_link()),
+            ('previous', self.get_previous_link()),
+            ('results', data),
+        ]))
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'required': ['results'],
+            'properties': {
+                'next': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'previous': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'results': schema,
+            },
+        }
@@ -0,0 +1,58 @@
+from django.core.exceptions import FieldDoesNotExist
+from django.db.models import Prefetch
+from rest_framework import serializers
+
+
+# Derives select_related / prefetch_related from a serializer's declared
+# fields, so views that render nested serializers do not have to keep a
+# hand-written prefetch list in sync with them:
+# - a nested serializer on a forward foreign key or one-to-one is joined in
+#   with select_related (and its own relations are followed with the prefix);
+# - a nested serializer with many=True, or a many-valued related field, is
+#   loaded with a Prefetch whose queryset is planned the same way.
+# Primary key fields on a foreign key need nothing: DRF reads the <name>_id
+# column. Method fields and dotted sources are ignored.
+# With `fields`, relations of fields that will not be rendered are skipped.
+def get_prefetch_plan(serializer_class, prefix='', fields=None):
+    """Return (select_related lookups, prefetch_related lookups) for serializer_class."""
+    model = serializer_class.Meta.model
+    select, prefetch = [], []
+
+    for name, field in serializer_class().fields.items():
+        if fields is not None and name not in fields:
+            continue
+        if field.write_only or field.source == '*' or '.' in field.source:
+            continue
+        try:
+            model_field = model._meta.get_field(field.source)
+        except FieldDoesNotExist:
+            continue
+        if not model_field.is_relation:
+            continue
+
+        lookup = prefix + field.source
+        many = model_field.one_to_many or model_field.many_to_many
+        if isinstance(field, serializers.ListSerializer) and many:
+            queryset = optimize_queryset(
+                model_field.related_model._default_manager.all(), type(field.child)
+            )
+            prefetch.append(Prefetch(lookup, queryset=queryset))
+        elif isinstance(field, serializers.ManyRelatedField) and many:
+            prefetch.append(lookup)
+        elif isinstance(field, serializers.BaseSerializer) and not many:
+            select.append(lookup)
+            nested_select, nested_prefetch = get_prefetch_plan(type(field), prefix=f'{lookup}__')
+            select += nested_select
+            prefetch += nested_prefetch
+
+    return select, prefetch
+
+
+def optimize_queryset(queryset, serializer_class, fields=None):
+    """Apply the prefetch plan of serializer_class to queryset."""
+    select, prefetch = get_prefetch_plan(serializer_class, fields=fields)
+    if select:
+        queryset = queryset.select_related(*select)
+    if prefetch:
+        queryset = queryset.prefetch_related(*prefetch)
+    return queryset
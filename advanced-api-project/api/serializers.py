@@ -4,10 +4,22 @@ from datetime import datetime
 
 
 
+# SparseFieldsMixin lets a view render only some of a serializer's fields:
+# SomeSerializer(instance, fields=['id', 'title']) drops the others.
+# Used by the read endpoints for ?fields= (see SparseFieldsetMixin in views.py).
+class SparseFieldsMixin:
+    def __init__(self, *args, **kwargs):
+        fields = kwargs.pop('fields', None)
+        super().__init__(*args, **kwargs)
+        if fields is not None:
+            for name in set(self.fields) - set(fields):
+                self.fields.pop(name)
+
+
 # BookSerializer is responsible for converting Book model instances
 # to and from primitive data types (e.g., JSON).
 # It includes all fields of the Book model.
-class BookSerializer(serializers.ModelSerializer):
+class BookSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     class Meta:
         model = Book
         fields = ['id', 'title', 'publication_year', 'author']
@@ -25,7 +37,7 @@ class BookSerializer(serializers.ModelSerializer):
 
 # AuthorSerializer represents an Author along with their related books.
 # It uses a nested BookSerializer to serialize the one-to-many relationship.
-class AuthorSerializer(serializers.ModelSerializer):
+class AuthorSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     # The 'books' field uses the related_name defined in the Book model.
     # many=True indicates that an author can have multiple books.
     books = BookSerializer(many=True, read_only=True)
@@ -0,0 +1,15 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from apikit.conditional import bump_table_version
+
+from .models import Author, Book
+
+
+# Keep the TableVersion counters used for list ETags in step with the data.
+@receiver(post_save, sender=Book)
+@receiver(post_delete, sender=Book)
+@receiver(post_save, sender=Author)
+@receiver(post_delete, sender=Author)
+def table_changed(sender, **kwargs):
+    bump_table_version(sender)
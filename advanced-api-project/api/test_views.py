@@ -1,9 +1,32 @@
+import datetime
+import json
+import os
+import re
+import tempfile
+import tracemalloc
+import unittest
+from decimal import Decimal
+from unittest import mock
+
 from django.contrib.auth.models import User
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
-from rest_framework import status
+from rest_framework import serializers, status
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils.serializer_helpers import ReturnDict
 from rest_framework.test import APITestCase
 
+from apikit.renderers import MessagePackRenderer, ORJSONRenderer, msgpack, orjson
+from apikit.throttling import (
+    AnonBucketThrottle, Limiter, SQLiteBucketStore, UserBucketThrottle, get_limiter,
+)
+
+from .fast_serializers import ReadPlan, get_read_plan
+from .prefetching import get_prefetch_plan
 from .models import Author, Book
+from .serializers import AuthorSerializer, BookSerializer
+from .views import BookListView
 
 
 class BookAPITests(APITestCase):
@@ -192,6 +215,45 @@ class BookAPITests(APITestCase):
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertEqual(len(response.data), 2)
 
+    def test_search_matches_author_through_subquery(self):
+        """
+        Author names are matched with an id subquery, not a JOIN.
+        """
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(self.list_url, {'search': 'Orwell'})
+        self.assertEqual([book['title'] for book in response.data], ['1984'])
+        book_queries = [q['sql'] for q in queries if '"api_book"' in q['sql']]
+        self.assertEqual(len(book_queries), 1)
+        self.assertNotIn('JOIN', book_queries[0])
+
+    def test_search_terms_must_all_match(self):
+        """
+        Every search term has to match the title or the author name.
+        """
+        response = self.client.get(self.list_url, {'search': 'Achebe Ease'})
+        self.assertEqual([book['title'] for book in response.data], ['No Longer at Ease'])
+
+    def test_prefix_search_mode(self):
+        """
+        ?search_mode=prefix only matches the start of the title or name.
+        """
+        response = self.client.get(self.list_url, {'search': 'fall'})
+        self.assertEqual(len(response.data), 1)
+
+        response = self.client.get(self.list_url, {'search': 'fall', 'search_mode': 'prefix'})
+        self.assertEqual(response.data, [])
+
+        response = self.client.get(self.list_url, {'search': 'thi', 'search_mode': 'prefix'})
+        self.assertEqual([book['title'] for book in response.data], ['Things Fall Apart'])
+
+    def test_search_combines_with_filters_and_ordering(self):
+        response = self.client.get(self.list_url, {
+            'search': 'Achebe',
+            'publication_year': 1960,
+            'ordering': '-publication_year',
+        })
+        self.assertEqual([book['title'] for book in response.data], ['No Longer at Ease'])
+
     # ---------- ORDERING ----------
 
     def test_order_books_by_title(self):
@@ -211,3 +273,633 @@ class BookAPITests(APITestCase):
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         years = [book['publication_year'] for book in response.data]
         self.assertEqual(years, sorted(years, reverse=True))
+
+
+class BookExportTests(APITestCase):
+    """
+    Test suite for the streaming export endpoint:
+    - NDJSON and CSV output
+    - Same filtering/search/ordering as the list endpoint
+    - Bounded memory on a large table
+    """
+
+    def setUp(self):
+        self.author1 = Author.objects.create(name="Chinua Achebe")
+        self.author2 = Author.objects.create(name="George Orwell")
+        Book.objects.create(title="Things Fall Apart", publication_year=1958, author=self.author1)
+        Book.objects.create(title="No Longer at Ease", publication_year=1960, author=self.author1)
+        Book.objects.create(title="1984", publication_year=1949, author=self.author2)
+        self.export_url = reverse('book-export')
+
+    def export(self, params=None):
+        response = self.client.get(self.export_url, params or {})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response.streaming)
+        return b''.join(response.streaming_content).decode()
+
+    def test_ndjson_matches_list_endpoint(self):
+        params = {'search': 'Achebe', 'ordering': '-publication_year'}
+        rows = [json.loads(line) for line in self.export(params).splitlines()]
+        listed = self.client.get(reverse('book-list'), params).data
+        self.assertEqual(rows, [dict(book) for book in listed])
+
+    def test_csv_export_with_filter(self):
+        lines = self.export({'export_format': 'csv', 'publication_year': 1949}).splitlines()
+        self.assertEqual(lines[0], 'id,title,publication_year,author')
+        self.assertEqual(len(lines), 2)
+        self.assertIn('1984', lines[1])
+
+    def test_unknown_format_is_rejected(self):
+        response = self.client.get(self.export_url, {'export_format': 'xml'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_memory_stays_bounded_on_large_table(self):
+        """
+        Streaming 100k books must not hold the whole export in memory:
+        peak allocation stays well under the size of the payload.
+        """
+        Book.objects.bulk_create(
+            [
+                Book(title=f"Generated book number {i:06d}", publication_year=2000, author=self.author2)
+                for i in range(100000)
+            ],
+            batch_size=5000,
+        )
+        response = self.client.get(self.export_url)
+        total = 0
+        tracemalloc.start()
+        try:
+            for chunk in response.streaming_content:
+                total += len(chunk)
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+        self.assertGreater(total, 8_000_000)
+        self.assertLess(peak, total / 4)
+
+
+class BookPaginationTests(APITestCase):
+    """
+    Test suite for the opt-in pagination modes of the list endpoint:
+    - cursor pagination following the requested ordering
+    - page-number pagination without COUNT(*)
+    """
+
+    def setUp(self):
+        author = Author.objects.create(name="Chinua Achebe")
+        Book.objects.bulk_create(
+            [Book(title=f"Book {i:02d}", publication_year=1900 + i, author=author) for i in range(25)]
+        )
+        self.list_url = reverse('book-list')
+
+    def collect(self, params):
+        titles, url, pages = [], self.list_url, 0
+        while url:
+            response = self.client.get(url, params if pages == 0 else None)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            titles += [book['title'] for book in response.data['results']]
+            url = response.data['next']
+            pages += 1
+        return titles, pages
+
+    def test_cursor_pagination_follows_ordering(self):
+        titles, pages = self.collect(
+            {'pagination': 'cursor', 'page_size': 10, 'ordering': '-publication_year'}
+        )
+        self.assertEqual(titles, [f"Book {i:02d}" for i in reversed(range(25))])
+        self.assertEqual(pages, 3)
+
+    def test_cursor_pagination_pages_through_ties_without_offset(self):
+        author = Author.objects.get()
+        Book.objects.bulk_create(
+            [Book(title="Same title", publication_year=2000, author=author) for _ in range(25)]
+        )
+        params = {'pagination': 'cursor', 'page_size': 10, 'ordering': 'publication_year'}
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(self.list_url, params)
+            ids = [book['id'] for book in response.data['results']]
+            while response.data['next']:
+                response = self.client.get(response.data['next'])
+                ids += [book['id'] for book in response.data['results']]
+        self.assertEqual(len(ids), 50)
+        self.assertEqual(len(set(ids)), 50)
+        book_queries = [q['sql'] for q in queries if 'FROM "api_book"' in q['sql']]
+        self.assertFalse(any('OFFSET' in sql for sql in book_queries))
+
+        previous = self.client.get(response.data['previous'])
+        self.assertEqual([book['id'] for book in previous.data['results']], ids[30:40])
+
+    def test_invalid_cursor_is_404(self):
+        for cursor in ('not-a-cursor', 'cD1bMV0='):  # the second is p=[1]
+            response = self.client.get(self.list_url, {'pagination': 'cursor', 'cursor': cursor})
+            self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_page_mode_walks_all_pages_without_count(self):
+        with CaptureQueriesContext(connection) as queries:
+            titles, pages = self.collect({'pagination': 'page', 'page_size': 10})
+        self.assertEqual(titles, sorted(titles))
+        self.assertEqual(len(titles), 25)
+        self.assertEqual(pages, 3)
+        self.assertFalse(any('COUNT(' in q['sql'].upper() for q in queries.captured_queries))
+
+    def test_page_mode_has_no_count_field(self):
+        response = self.client.get(self.list_url, {'pagination': 'page', 'page_size': 25})
+        self.assertNotIn('count', response.data)
+        self.assertIsNone(response.data['next'])
+
+    def test_unknown_pagination_mode_is_rejected(self):
+        response = self.client.get(self.list_url, {'pagination': 'offset'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class ReadPlanTests(APITestCase):
+    """
+    Test suite for the read-only serializer fast path:
+    - same JSON bytes as the stock serializers, flat and nested
+    - fixed number of queries for nested output
+    - unsupported fields are rejected up front
+    """
+
+    def setUp(self):
+        self.author1 = Author.objects.create(name="Chinua Achebe")
+        self.author2 = Author.objects.create(name="George Orwell")
+        Author.objects.create(name="No Books Yet")
+        Book.objects.create(title="Things Fall Apart", publication_year=1958, author=self.author1)
+        Book.objects.create(title="1984", publication_year=1949, author=self.author2)
+        Book.objects.create(title="No Longer at Ease", publication_year=1960, author=self.author1)
+
+    def render(self, data):
+        return JSONRenderer().render(data)
+
+    def test_book_output_is_byte_identical(self):
+        books = Book.objects.order_by('title')
+        stock = BookSerializer(books, many=True).data
+        plan = get_read_plan(BookSerializer)
+        self.assertEqual(self.render(plan.serialize(plan.values(books))), self.render(stock))
+
+    def test_nested_author_output_is_byte_identical(self):
+        authors = Author.objects.order_by('pk')
+        stock = AuthorSerializer(authors.prefetch_related('books'), many=True).data
+        plan = get_read_plan(AuthorSerializer)
+        with CaptureQueriesContext(connection) as queries:
+            fast = plan.serialize(plan.values(authors))
+        self.assertEqual(self.render(fast), self.render(stock))
+        self.assertEqual(len(queries), 2)
+
+    def test_list_endpoint_uses_plan_output(self):
+        response = self.client.get(reverse('book-list'))
+        stock = BookSerializer(Book.objects.order_by('title'), many=True).data
+        self.assertEqual(response.content, self.render(stock))
+
+    def test_unsupported_field_is_rejected(self):
+        class TitleLengthSerializer(serializers.ModelSerializer):
+            length = serializers.SerializerMethodField()
+
+            class Meta:
+                model = Book
+                fields = ['id', 'length']
+
+            def get_length(self, obj):
+                return len(obj.title)
+
+        with self.assertRaises(TypeError):
+            ReadPlan(TitleLengthSerializer)
+
+
+class AuthorAPITests(APITestCase):
+    """
+    Test suite for the author endpoints:
+    - nested books in list and detail responses
+    - prefetch plan derived from AuthorSerializer
+    - constant query count regardless of the number of authors
+    """
+
+    def create_authors(self, count, books_each=2):
+        authors = Author.objects.bulk_create(
+            [Author(name=f"Author {i:04d}") for i in range(count)]
+        )
+        Book.objects.bulk_create(
+            [
+                Book(title=f"Book {author.pk}-{n}", publication_year=2000 + n, author=author)
+                for author in authors
+                for n in range(books_each)
+            ],
+            batch_size=5000,
+        )
+        return authors
+
+    def test_prefetch_plan_follows_nested_books(self):
+        select, prefetch = get_prefetch_plan(AuthorSerializer)
+        self.assertEqual(select, [])
+        self.assertEqual([lookup.prefetch_through for lookup in prefetch], ['books'])
+        self.assertEqual(get_prefetch_plan(BookSerializer), ([], []))
+
+    def test_list_includes_nested_books(self):
+        self.create_authors(2)
+        response = self.client.get(reverse('author-list'))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([author['name'] for author in response.data], ['Author 0000', 'Author 0001'])
+        self.assertEqual(len(response.data[0]['books']), 2)
+
+    def test_list_query_count_is_constant(self):
+        self.create_authors(1000)
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse('author-list'))
+        self.assertEqual(len(response.data), 1000)
+        self.assertEqual(sum(len(author['books']) for author in response.data), 2000)
+        self.assertEqual(len(queries), 2)
+
+    def test_detail_includes_nested_books(self):
+        author = self.create_authors(1, books_each=3)[0]
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse('author-detail', args=[author.pk]))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data['books']), 3)
+        self.assertEqual(len(queries), 2)
+
+
+class SparseFieldsetTests(APITestCase):
+    """
+    Test suite for ?fields= on the read endpoints:
+    - responses only hold the requested fields, in serializer order
+    - the SQL only selects the matching columns
+    - AuthorSerializer's nested books are not prefetched unless requested
+    """
+
+    def setUp(self):
+        self.author = Author.objects.create(name="Ursula K. Le Guin")
+        self.book = Book.objects.create(
+            title="The Dispossessed", publication_year=1974, author=self.author
+        )
+        Book.objects.create(title="Lathe of Heaven", publication_year=1971, author=self.author)
+
+    def book_queries(self, queries):
+        return [q['sql'] for q in queries if 'FROM "api_book"' in q['sql']]
+
+    def test_list_returns_requested_fields_only(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse('book-list'), {'fields': 'title,id'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.json()[0], {"id": self.book.pk + 1, "title": "Lathe of Heaven"})
+        sql = self.book_queries(queries)[0]
+        self.assertNotIn('"publication_year"', sql)
+        self.assertNotIn('"author_id"', sql)
+
+    def test_cursor_pagination_with_fields_outside_ordering(self):
+        url = reverse('book-list')
+        response = self.client.get(url, {'fields': 'id', 'pagination': 'cursor', 'page_size': 1})
+        self.assertEqual(response.json()['results'], [{"id": self.book.pk + 1}])
+        response = self.client.get(response.json()['next'])
+        self.assertEqual(response.json()['results'], [{"id": self.book.pk}])
+
+    def test_unknown_field_is_rejected(self):
+        for value in ('title,isbn', ''):
+            response = self.client.get(reverse('book-list'), {'fields': value})
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+            self.assertIn('fields', response.data)
+
+    def test_detail_defers_unrequested_columns(self):
+        url = reverse('book-detail', args=[self.book.pk])
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url, {'fields': 'title'})
+        self.assertEqual(response.data, {"title": "The Dispossessed"})
+        self.assertNotIn('"publication_year"', self.book_queries(queries)[-1])
+
+        etag = response['ETag']
+        self.assertNotEqual(self.client.get(url)['ETag'], etag)
+
+    def test_authors_without_books_skip_the_prefetch(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse('author-list'), {'fields': 'name'})
+        self.assertEqual(response.data, [{"name": "Ursula K. Le Guin"}])
+        self.assertEqual(len(queries), 1)
+        self.assertEqual(get_prefetch_plan(AuthorSerializer, fields=['id', 'name']), ([], []))
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(
+                reverse('author-detail', args=[self.author.pk]), {'fields': 'books'}
+            )
+        self.assertEqual(list(response.data), ['books'])
+        self.assertEqual(len(response.data['books']), 2)
+        self.assertEqual(len(queries), 2)
+
+    def test_export_limits_columns(self):
+        response = self.client.get(
+            reverse('book-export'), {'fields': 'title', 'export_format': 'csv', 'ordering': 'title'}
+        )
+        body = b''.join(response.streaming_content).decode()
+        self.assertEqual(body.splitlines(), ['title', 'Lathe of Heaven', 'The Dispossessed'])
+
+
+class ExplainMixin:
+    """
+    EXPLAIN helpers: assert a query is answered from an index rather than a
+    full table scan (and, with ordered=True, without a separate sort).
+    On PostgreSQL sequential scans are disabled for the plan, since the
+    planner prefers them on tables as small as the test fixtures.
+    """
+
+    def explain(self, sql):
+        with connection.cursor() as cursor:
+            if connection.vendor == 'postgresql':
+                cursor.execute('SET LOCAL enable_seqscan = off')
+                cursor.execute('EXPLAIN ' + sql)
+            else:
+                cursor.execute('EXPLAIN QUERY PLAN ' + sql)
+            return '\n'.join(str(row[-1]) for row in cursor.fetchall())
+
+    def assertUsesIndex(self, sql, table, index=None, ordered=False):
+        plan = self.explain(sql)
+        table = re.escape(table)
+        self.assertNotRegex(plan, rf'\bSCAN {table}\b(?! USING)|Seq Scan on {table}\b')
+        if index:
+            self.assertIn(index, plan)
+        if ordered:
+            self.assertNotRegex(plan, r'TEMP B-TREE FOR ORDER BY|(^|-> +)Sort\b')
+
+    def table_queries(self, queries, table):
+        return [q['sql'] for q in queries if f'FROM "{table}"' in q['sql']]
+
+
+class BookIndexTests(ExplainMixin, APITestCase):
+    """
+    The hot BookListView / AuthorListView queries are served by the
+    Book and Author Meta.indexes.
+    """
+
+    def setUp(self):
+        author = Author.objects.create(name="Chinua Achebe")
+        Book.objects.create(title="Things Fall Apart", publication_year=1958, author=author)
+        self.author = author
+
+    def list_queries(self, url, params):
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(self.client.get(url, params).status_code, status.HTTP_200_OK)
+        return queries
+
+    def test_book_list_queries_use_indexes(self):
+        cases = [
+            ({}, 'api_book_title_idx', True),
+            ({'ordering': '-publication_year'}, 'api_book_year_idx', True),
+            ({'title': 'Things Fall Apart'}, 'api_book_title_idx', False),
+            ({'publication_year': 1958}, 'api_book_year_idx', False),
+            ({'author': self.author.pk, 'publication_year': 1958}, 'api_book_author_year_idx', False),
+        ]
+        for params, index, ordered in cases:
+            queries = self.list_queries(reverse('book-list'), params)
+            for sql in self.table_queries(queries, 'api_book'):
+                with self.subTest(params=params):
+                    self.assertUsesIndex(sql, 'api_book', index, ordered=ordered)
+
+    def test_author_list_uses_name_index(self):
+        queries = self.list_queries(reverse('author-list'), {})
+        sql = self.table_queries(queries, 'api_author')[0]
+        self.assertUsesIndex(sql, 'api_author', 'api_author_name_idx', ordered=True)
+
+
+class ConditionalGetTests(APITestCase):
+    """
+    Test suite for ETag / Last-Modified on the book list and detail endpoints:
+    - 304 for a matching validator, without touching the book rows
+    - validators change when books or authors change
+    """
+
+    def setUp(self):
+        self.author = Author.objects.create(name="Chinua Achebe")
+        self.book = Book.objects.create(title="Things Fall Apart", publication_year=1958, author=self.author)
+        self.list_url = reverse('book-list')
+        self.detail_url = reverse('book-detail', args=[self.book.pk])
+
+    def test_list_returns_304_without_querying_books(self):
+        response = self.client.get(self.list_url)
+        etag = response['ETag']
+        self.assertFalse(etag.startswith('W/'))
+        self.assertIn('Last-Modified', response)
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(self.list_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(response['ETag'], etag)
+        self.assertEqual(len(queries), 1)
+        self.assertNotIn('"api_book"', queries[0]['sql'])
+
+    def test_list_etag_depends_on_query_and_data(self):
+        etag = self.client.get(self.list_url)['ETag']
+        self.assertNotEqual(self.client.get(self.list_url, {'search': 'fall'})['ETag'], etag)
+
+        self.author.name = "Albert Chinualumogu Achebe"
+        self.author.save()
+        response = self.client.get(self.list_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(response['ETag'], etag)
+
+        Book.objects.create(title="Arrow of God", publication_year=1964, author=self.author)
+        self.assertEqual(len(self.client.get(self.list_url, HTTP_IF_NONE_MATCH=response['ETag']).data), 2)
+
+    def test_detail_conditional_get(self):
+        response = self.client.get(self.detail_url)
+        etag, last_modified = response['ETag'], response['Last-Modified']
+
+        response = self.client.get(self.detail_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+        response = self.client.get(self.detail_url, HTTP_IF_MODIFIED_SINCE=last_modified)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+        self.book.title = "Things Fall Apart (50th anniversary edition)"
+        self.book.save()
+        response = self.client.get(self.detail_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['title'], self.book.title)
+
+    def test_missing_book_is_still_404(self):
+        response = self.client.get(reverse('book-detail', args=[self.book.pk + 100]))
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+        self.assertNotIn('ETag', response)
+
+
+class ThrottleTests(APITestCase):
+    """
+    Test suite for token-bucket throttling:
+    - 429 with Retry-After once the burst is spent, per IP or per user
+    - the SQLite store shares one limit between limiters (worker processes)
+    """
+
+    class AnonThrottle(AnonBucketThrottle):
+        rate = '3/min'
+
+    class UserThrottle(UserBucketThrottle):
+        rate = '5/min'
+
+    def setUp(self):
+        get_limiter.cache_clear()
+        self.addCleanup(get_limiter.cache_clear)
+        patcher = mock.patch.object(
+            BookListView, 'throttle_classes', [self.AnonThrottle, self.UserThrottle]
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.list_url = reverse('book-list')
+
+    def test_anonymous_burst_then_429(self):
+        codes = [self.client.get(self.list_url).status_code for _ in range(4)]
+        self.assertEqual(codes, [200, 200, 200, 429])
+        response = self.client.get(self.list_url)
+        self.assertGreater(int(response['Retry-After']), 0)
+
+        other_ip = self.client.get(self.list_url, REMOTE_ADDR='10.0.0.2')
+        self.assertEqual(other_ip.status_code, status.HTTP_200_OK)
+
+    def test_users_have_their_own_buckets(self):
+        User.objects.create_user(username="reader", password="pass1234")
+        self.client.login(username="reader", password="pass1234")
+        codes = [self.client.get(self.list_url).status_code for _ in range(6)]
+        self.assertEqual(codes, [200] * 5 + [429])
+
+    def make_sqlite_store(self):
+        handle, path = tempfile.mkstemp(suffix='.sqlite3')
+        os.close(handle)
+        self.addCleanup(os.remove, path)
+        return path
+
+    def test_sqlite_store_is_shared_between_limiters(self):
+        path = self.make_sqlite_store()
+        first = Limiter(SQLiteBucketStore(path))
+        second = Limiter(SQLiteBucketStore(path))
+        allowed = [
+            limiter.allow('key', rate=0.001, capacity=4)[0]
+            for limiter in (first, second, first, second, first, second)
+        ]
+        self.assertEqual(allowed, [True] * 4 + [False] * 2)
+
+    def test_leases_bound_the_overshoot(self):
+        path = self.make_sqlite_store()
+        limiters = [Limiter(SQLiteBucketStore(path), lease_size=3, lease_seconds=60) for _ in range(2)]
+        allowed = sum(
+            limiter.allow('key', rate=0.001, capacity=10)[0]
+            for _ in range(10)
+            for limiter in limiters
+        )
+        self.assertEqual(allowed, 10)
+
+
+class RendererTests(APITestCase):
+    """
+    Test suite for the alternative renderers and parsers:
+    - JSONRenderer stays the default; orjson is chosen with ?format=orjson
+    - orjson output matches JSONRenderer except for floats
+    - MessagePack negotiated through the Accept / Content-Type headers
+    """
+
+    def setUp(self):
+        self.user = User.objects.create_user(username="testuser", password="testpassword123")
+        self.author = Author.objects.create(name="Chinua Achebe")
+        Book.objects.create(title="Things Fall Apart \u2028 Ọ̀kọ̀nkwọ", publication_year=1958, author=self.author)
+        self.list_url = reverse('book-list')
+
+    @unittest.skipIf(orjson is None, "orjson is not installed")
+    def test_orjson_matches_json_renderer(self):
+        data = {
+            'books': BookSerializer(Book.objects.all(), many=True).data,
+            'errors': {0: ['Invalid.'], 3: {'title': ['Required.']}},
+            'detail': ReturnDict({'price': Decimal('9.99')}, serializer=None),
+            'at': datetime.datetime(2026, 1, 2, 3, 4, 5, 678901, tzinfo=datetime.timezone.utc),
+            'big': 2 ** 70,
+        }
+        self.assertEqual(ORJSONRenderer().render(data), JSONRenderer().render(data))
+        self.assertEqual(
+            ORJSONRenderer().render(data, 'application/json; indent=4'),
+            JSONRenderer().render(data, 'application/json; indent=4'),
+        )
+
+    @unittest.skipIf(orjson is None, "orjson is not installed")
+    def test_orjson_floats_differ_from_json_renderer(self):
+        data = {'big': 1e16, 'small': 1e-7}
+        self.assertEqual(JSONRenderer().render(data), b'{"big":1e+16,"small":1e-07}')
+        self.assertEqual(ORJSONRenderer().render(data), b'{"big":1e16,"small":1e-7}')
+        with self.assertRaises(ValueError):
+            JSONRenderer().render({'value': float('nan')})
+        self.assertEqual(ORJSONRenderer().render({'value': float('nan')}), b'{"value":null}')
+
+    def test_json_stays_the_default(self):
+        response = self.client.get(self.list_url)
+        self.assertEqual(response['Content-Type'], 'application/json')
+        self.assertIs(type(response.accepted_renderer), JSONRenderer)
+        self.assertEqual(response.json()[0]['publication_year'], 1958)
+
+    def test_orjson_on_request(self):
+        response = self.client.get(self.list_url, {'format': 'orjson'})
+        self.assertEqual(response['Content-Type'], 'application/json')
+        self.assertIsInstance(response.accepted_renderer, ORJSONRenderer)
+        self.assertEqual(response.content, self.client.get(self.list_url).content)
+
+    @unittest.skipIf(msgpack is None, "msgpack is not installed")
+    def test_msgpack_list(self):
+        response = self.client.get(self.list_url, HTTP_ACCEPT='application/msgpack')
+        self.assertEqual(response['Content-Type'], 'application/msgpack')
+        self.assertEqual(
+            msgpack.unpackb(response.content),
+            json.loads(self.client.get(self.list_url).content),
+        )
+
+    @unittest.skipIf(msgpack is None, "msgpack is not installed")
+    def test_msgpack_request_body(self):
+        self.client.login(username="testuser", password="testpassword123")
+        body = msgpack.packb({'title': 'Arrow of God', 'publication_year': 1964, 'author': self.author.pk})
+        response = self.client.post(
+            reverse('book-create'), body, content_type='application/msgpack',
+            HTTP_ACCEPT='application/msgpack',
+        )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(msgpack.unpackb(response.content)['title'], 'Arrow of God')
+
+    def test_unavailable_renderer_is_not_negotiated(self):
+        with mock.patch.object(MessagePackRenderer, 'available', False):
+            response = self.client.get(self.list_url, HTTP_ACCEPT='application/msgpack')
+        self.assertEqual(response.status_code, status.HTTP_406_NOT_ACCEPTABLE)
+
+
+class AsyncBookAPITests(BookAPITests):
+    """
+    Runs every BookAPITests case against the async views (api/async_views.py).
+    """
+
+    def setUp(self):
+        super().setUp()
+        self.list_url = reverse('async-book-list')
+        self.create_url = reverse('async-book-create')
+        self.detail_url = reverse('async-book-detail', args=[self.book1.id])
+        self.update_url = reverse('async-book-update', args=[self.book1.id])
+        self.delete_url = reverse('async-book-delete', args=[self.book1.id])
+
+    async def test_async_list_matches_sync_list(self):
+        params = [
+            {},
+            {'author': self.author1.id, 'ordering': '-publication_year'},
+            {'search': 'achebe', 'search_mode': 'prefix'},
+            {'fields': 'id,title', 'pagination': 'cursor', 'page_size': 2},
+            {'pagination': 'page', 'page_size': 2, 'page': 2},
+            {'pagination': 'bogus'},
+        ]
+        for query in params:
+            expected = await self.async_client.get(reverse('book-list'), query)
+            response = await self.async_client.get(self.list_url, query)
+            self.assertEqual(response.status_code, expected.status_code)
+            self.assertEqual(
+                response.content.replace(b'/async/', b'/'), expected.content, query
+            )
+
+    async def test_async_conditional_get(self):
+        response = await self.async_client.get(self.detail_url)
+        self.assertEqual(response.json()['title'], 'Things Fall Apart')
+        response = await self.async_client.get(self.detail_url, headers={'If-None-Match': response['ETag']})
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+        etag = (await self.async_client.get(self.list_url))['ETag']
+        response = await self.async_client.get(self.list_url, headers={'If-None-Match': etag})
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    async def test_async_missing_book_is_404(self):
+        response = await self.async_client.get(reverse('async-book-detail', args=[0]))
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
@@ -1,18 +1,38 @@
 from django.urls import path
+from .async_views import (
+    AsyncBookListView,
+    AsyncBookDetailView,
+    AsyncBookCreateView,
+    AsyncBookUpdateView,
+    AsyncBookDeleteView,
+)
 from .views import (
     BookListView,
     BookDetailView,
     BookCreateView,
     BookUpdateView,
-    BookDeleteView
+    BookDeleteView,
+    BookExportView,
+    AuthorListView,
+    AuthorDetailView,
 )
 
 urlpatterns = [
     path('books/', BookListView.as_view(), name='book-list'),
     path('books/<int:pk>/', BookDetailView.as_view(), name='book-detail'),
     path('books/create/', BookCreateView.as_view(), name='book-create'),
+    path('books/export/', BookExportView.as_view(), name='book-export'),
+    path('authors/', AuthorListView.as_view(), name='author-list'),
+    path('authors/<int:pk>/', AuthorDetailView.as_view(), name='author-detail'),
 
     # Checker requires these substrings: "books/update" and "books/delete"
     path('books/update/<int:pk>/', BookUpdateView.as_view(), name='book-update'),
     path('books/delete/<int:pk>/', BookDeleteView.as_view(), name='book-delete'),
+
+    # Async counterparts (api/async_views.py), for serving under ASGI.
+    path('async/books/', AsyncBookListView.as_view(), name='async-book-list'),
+    path('async/books/<int:pk>/', AsyncBookDetailView.as_view(), name='async-book-detail'),
+    path('async/books/create/', AsyncBookCreateView.as_view(), name='async-book-create'),
+    path('async/books/update/<int:pk>/', AsyncBookUpdateView.as_view(), name='async-book-update'),
+    path('async/books/delete/<int:pk>/', AsyncBookDeleteView.as_view(), name='async-book-delete'),
 ]
@@ -1,34 +1,257 @@
+import csv
+import json
+
+from asgiref.sync import sync_to_async
+from django.http import StreamingHttpResponse
 from rest_framework import generics
+from rest_framework.exceptions import ValidationError
 from rest_framework.permissions import IsAuthenticatedOrReadOnly, IsAuthenticated
-from rest_framework.filters import SearchFilter, OrderingFilter
-from django_filters import rest_framework as filters
-from django_filters.rest_framework import DjangoFilterBackend
+from rest_framework.response import Response
+
+from apikit.conditional import ConditionalGetMixin
+from apikit.throttling import AnonBucketThrottle, UserBucketThrottle
+from perfmon.middleware import serializer_phase
+
+from .fast_serializers import get_read_plan
+from .filters import BookFilterBackend
+from .models import Author, Book
+from .pagination import BookCursorPagination, NoCountPageNumberPagination
+from .prefetching import optimize_queryset
+from .serializers import AuthorSerializer, BookSerializer
+
+
+class SparseFieldsetMixin:
+    # ?fields=id,title renders only the listed serializer fields. The
+    # queryset is narrowed to match: .only() their columns here, and
+    # ReadPlanListMixin / SerializerPrefetchMixin skip the columns and
+    # prefetches of fields that were left out.
+    fields_param = 'fields'
+
+    def get_requested_fields(self):
+        """The requested field names in serializer order, or None for all fields."""
+        if not hasattr(self, '_requested_fields'):
+            raw = self.request.query_params.get(self.fields_param)
+            if raw is None:
+                self._requested_fields = None
+            else:
+                available = self.get_serializer_class().Meta.fields
+                requested = {name.strip() for name in raw.split(',') if name.strip()}
+                unknown = sorted(requested.difference(available))
+                if not requested or unknown:
+                    raise ValidationError({
+                        self.fields_param: f"Unknown field(s): {', '.join(unknown) or '(none)'}. "
+                                           f"Choose from: {', '.join(available)}."
+                    })
+                self._requested_fields = [name for name in available if name in requested]
+        return self._requested_fields
+
+    def get_serializer(self, *args, **kwargs):
+        fields = self.get_requested_fields()
+        if fields is not None:
+            kwargs.setdefault('fields', fields)
+        return super().get_serializer(*args, **kwargs)
 
-from .models import Book
-from .serializers import BookSerializer
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        fields = self.get_requested_fields()
+        if fields is None:
+            return queryset
+        # Reverse relations (Author.books) have no column of their own.
+        columns = [
+            field.name for field in queryset.model._meta.concrete_fields if field.name in fields
+        ]
+        return queryset.only('pk', *columns)
 
 
-class BookListView(generics.ListAPIView):
+class ReadPlanListMixin:
+    def list(self, request, *args, **kwargs):
+        # Read-only fast path: paginate .values() rows and serialize them with
+        # the serializer's precompiled ReadPlan (api/fast_serializers.py).
+        # perfmon reports the ReadPlan's time as serializer time.
+        plan, queryset = self.get_plan_queryset()
+        page = self.paginate_queryset(queryset)
+        with serializer_phase():
+            data = plan.serialize(queryset if page is None else page)
+        if page is None:
+            return Response(data)
+        return self.get_paginated_response(data)
+
+    async def alist(self, request, *args, **kwargs):
+        # list() for the async views (api/async_views.py). Filterset
+        # validation and DRF's paginators query synchronously, so they run
+        # in a thread; everything else reads through the async ORM.
+        plan, queryset = await sync_to_async(self.get_plan_queryset)()
+        if self.paginator is not None:
+            page = await sync_to_async(self.paginate_queryset)(queryset)
+            with serializer_phase():
+                data = await plan.aserialize(page)
+            return self.get_paginated_response(data)
+        with serializer_phase():
+            data = await plan.aserialize([row async for row in queryset])
+        return Response(data)
+
+    def get_plan_queryset(self):
+        plan = get_read_plan(self.get_serializer_class(), self.get_requested_fields())
+        queryset = self.filter_queryset(self.get_queryset())
+        # Cursor pagination reads the ordering columns and its pk tiebreaker
+        # from every row, whether or not they were requested.
+        ordering = [name.lstrip('-') for name in queryset.query.order_by if isinstance(name, str)]
+        return plan, plan.values(queryset, extra=[*ordering, 'pk'])
+
+
+class BookListView(ConditionalGetMixin, SparseFieldsetMixin, ReadPlanListMixin, generics.ListAPIView):
     queryset = Book.objects.all()
     serializer_class = BookSerializer
     permission_classes = [IsAuthenticatedOrReadOnly]
+    throttle_classes = [AnonBucketThrottle, UserBucketThrottle]
+    # Searching matches author names, so author changes alter the response.
+    etag_models = [Book, Author]
 
-    # Required by the checker
-    filter_backends = [
-        DjangoFilterBackend,
-        SearchFilter,
-        OrderingFilter,
-        filters.OrderingFilter,
-        filters.SearchFilter,   # <-- THIS is what the checker wants
-    ]
+    # Field filters, search and ordering in one pass; see api/filters.py.
+    filter_backends = [BookFilterBackend]
 
     # Filtering
     filterset_fields = ['title', 'author', 'publication_year']
 
-    # Searching
+    # Searching (?search_mode=prefix for prefix matches)
     search_fields = ['title', 'author__name']
 
     # Ordering
     ordering_fields = ['title', 'publication_year']
     ordering = ['title']
 
+    # Pagination is opt-in so existing clients keep getting a plain list:
+    # ?pagination=cursor or ?pagination=page (page numbers, no total count).
+    pagination_modes = {
+        'cursor': BookCursorPagination,
+        'page': NoCountPageNumberPagination,
+    }
+
+    @property
+    def paginator(self):
+        if not hasattr(self, '_paginator'):
+            mode = self.request.query_params.get('pagination')
+            if mode and mode not in self.pagination_modes:
+                raise ValidationError({
+                    'pagination': f"Choose one of: {', '.join(self.pagination_modes)}."
+                })
+            self._paginator = self.pagination_modes[mode]() if mode else None
+        return self._paginator
+
+
+class BookDetailView(ConditionalGetMixin, SparseFieldsetMixin, generics.RetrieveAPIView):
+    queryset = Book.objects.all()
+    serializer_class = BookSerializer
+    permission_classes = [IsAuthenticatedOrReadOnly]
+
+
+class BookCreateView(generics.CreateAPIView):
+    queryset = Book.objects.all()
+    serializer_class = BookSerializer
+    permission_classes = [IsAuthenticated]
+
+    def perform_create(self, serializer):
+        # Hook for extra behaviour on create (validation lives in the serializer).
+        serializer.save()
+
+
+class BookUpdateView(generics.UpdateAPIView):
+    queryset = Book.objects.all()
+    serializer_class = BookSerializer
+    permission_classes = [IsAuthenticated]
+
+    def perform_update(self, serializer):
+        # Hook for extra behaviour on update (validation lives in the serializer).
+        serializer.save()
+
+
+class BookDeleteView(generics.DestroyAPIView):
+    queryset = Book.objects.all()
+    serializer_class = BookSerializer
+    permission_classes = [IsAuthenticated]
+
+
+class SerializerPrefetchMixin:
+    # Prefetches whatever the serializer nests (see api/prefetching.py), so
+    # the query count does not grow with the number of objects. Goes after
+    # SparseFieldsetMixin, whose ?fields= selection decides what is nested.
+    def get_queryset(self):
+        return optimize_queryset(
+            super().get_queryset(), self.get_serializer_class(), self.get_requested_fields()
+        )
+
+
+class AuthorListView(SparseFieldsetMixin, SerializerPrefetchMixin, generics.ListAPIView):
+    queryset = Author.objects.order_by('name', 'pk')
+    serializer_class = AuthorSerializer
+    permission_classes = [IsAuthenticatedOrReadOnly]
+
+
+class AuthorDetailView(SparseFieldsetMixin, SerializerPrefetchMixin, generics.RetrieveAPIView):
+    queryset = Author.objects.all()
+    serializer_class = AuthorSerializer
+    permission_classes = [IsAuthenticatedOrReadOnly]
+
+
+class _Echo:
+    # csv.writer needs a file-like object; this one hands each line back.
+    def write(self, value):
+        return value
+
+
+class BookExportView(BookListView):
+    """
+    Streams every book matching the BookListView filter, search and ordering
+    query parameters as NDJSON (default) or CSV (?export_format=csv).
+    ?fields= limits the exported columns.
+
+    Rows are read with .values().iterator() in chunks and written out as they
+    arrive, so memory use does not grow with the number of books.
+    """
+    export_formats = {
+        'ndjson': 'application/x-ndjson',
+        'csv': 'text/csv',
+    }
+    chunk_size = 2000
+
+    def list(self, request, *args, **kwargs):
+        export_format = request.query_params.get('export_format', 'ndjson')
+        if export_format not in self.export_formats:
+            raise ValidationError({
+                'export_format': f"Choose one of: {', '.join(self.export_formats)}."
+            })
+
+        fields = self.get_requested_fields() or BookSerializer.Meta.fields
+        rows = (
+            self.filter_queryset(self.get_queryset())
+            .values_list(*fields)
+            .iterator(chunk_size=self.chunk_size)
+        )
+        lines = self.csv_lines(fields, rows) if export_format == 'csv' else self.ndjson_lines(fields, rows)
+
+        response = StreamingHttpResponse(
+            self.batched(lines), content_type=self.export_formats[export_format]
+        )
+        response['Content-Disposition'] = f'attachment; filename="books.{export_format}"'
+        return response
+
+    def ndjson_lines(self, fields, rows):
+        for row in rows:
+            yield json.dumps(dict(zip(fields, row))) + '\n'
+
+    def csv_lines(self, fields, rows):
+        writer = csv.writer(_Echo())
+        yield writer.writerow(fields)
+        for row in rows:
+            yield writer.writerow(row)
+
+    def batched(self, lines):
+        # One write per chunk instead of per row keeps the WSGI overhead low.
+        batch = []
+        for line in lines:
+            batch.append(line)
+            if len(batch) >= self.chunk_size:
+                yield ''.join(batch)
+                batch = []
+        if batch:
+            yield ''.join(batch)
@@ -10,11 +10,15 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.2/ref/settings/
 """
 
+import sys
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
 
+# Apps shared with the other projects of this repo (shared/README.md).
+sys.path.append(str(BASE_DIR.parent.parent / 'shared'))
+
 
 # Quick-start development settings - unsuitable for production
 # See https://docs.djangoproject.com/en/5.2/howto/deployment/checklist/
@@ -60,9 +64,11 @@ INSTALLED_APPS = [
     'django.contrib.staticfiles',
     'bookshelf',
     'relationship_app',
+    'perfmon',
 ]
 
 MIDDLEWARE = [
+    'perfmon.middleware.PerfmonMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -147,6 +153,24 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 AUTH_USER_MODEL = 'bookshelf.CustomUser'
 
+# ModelBackend with each user's permissions cached across requests
+# (bookshelf/permissions.py).
+AUTHENTICATION_BACKENDS = ['bookshelf.permissions.CachedModelBackend']
+
+# Cache
+# https://docs.djangoproject.com/en/5.2/topics/cache/
+# Holds users' permission sets. Swap for a shared backend (e.g. Redis or
+# Memcached) so every worker reuses them.
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'library-project',
+    }
+}
+
+BOOKSHELF_PERMISSION_CACHE_TIMEOUT = 300
+
 
 MEDIA_URL = '/media/'
 MEDIA_ROOT = BASE_DIR / 'media'
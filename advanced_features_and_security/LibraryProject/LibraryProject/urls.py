@@ -19,5 +19,6 @@ from django.urls import include, path
 
 urlpatterns = [
     path('admin/', admin.site.urls),
+    path('perfmon/', include('perfmon.urls')),
     path('', include('relationship_app.urls')),
 ]
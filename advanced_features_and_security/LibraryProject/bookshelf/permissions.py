@@ -0,0 +1,54 @@
+"""
+Permission cache for CustomUser.
+
+CachedModelBackend stores each user's permission set (own permissions plus
+those of their groups) in the Django cache under the user's pk, so
+permission_required checks skip the auth_permission queries on every request
+after the first. With a shared cache backend the entry is reused by every
+worker.
+
+bookshelf/signals.py drops the entries of the affected users whenever group
+membership, user permissions or group permissions change (m2m_changed), and
+when a user, group or permission is saved or deleted.
+BOOKSHELF_PERMISSION_CACHE_TIMEOUT bounds how long an entry can outlive a
+change made without those signals (e.g. QuerySet.update() or raw SQL).
+"""
+from django.conf import settings
+from django.contrib.auth.backends import ModelBackend
+from django.core.cache import cache
+from django.db import transaction
+
+DEFAULT_TIMEOUT = 300
+KEY_PREFIX = "bookshelf:perms"
+
+
+def permission_cache_key(user_pk):
+    return f"{KEY_PREFIX}:{user_pk}"
+
+
+def invalidate_users(user_pks):
+    """Drop the cached permissions of the given users."""
+    keys = [permission_cache_key(pk) for pk in set(user_pks)]
+    if not keys:
+        return
+    cache.delete_many(keys)
+    # Again after commit: a request that read the old rows before the
+    # transaction committed may have cached them in the meantime.
+    transaction.on_commit(lambda: cache.delete_many(keys))
+
+
+class CachedModelBackend(ModelBackend):
+    """ModelBackend whose get_all_permissions() is served from the cache."""
+
+    def get_all_permissions(self, user_obj, obj=None):
+        if not user_obj.is_active or user_obj.is_anonymous or obj is not None:
+            return set()
+        if not hasattr(user_obj, "_perm_cache"):
+            key = permission_cache_key(user_obj.pk)
+            perms = cache.get(key)
+            if perms is None:
+                perms = super().get_all_permissions(user_obj)
+                timeout = getattr(settings, "BOOKSHELF_PERMISSION_CACHE_TIMEOUT", DEFAULT_TIMEOUT)
+                cache.set(key, perms, timeout)
+            user_obj._perm_cache = perms
+        return user_obj._perm_cache
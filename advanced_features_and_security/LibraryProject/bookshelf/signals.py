@@ -0,0 +1,75 @@
+"""
+Keeps the permission cache (bookshelf/permissions.py) in sync with group
+membership and permission assignments.
+"""
+from django.contrib.auth.models import Group, Permission
+from django.db.models import Q
+from django.db.models.signals import m2m_changed, post_save, pre_delete
+from django.dispatch import receiver
+
+from .models import CustomUser
+from .permissions import invalidate_users
+
+# clear() sends no pk_set, so members are looked up before the rows go.
+M2M_ACTIONS = ("post_add", "post_remove", "pre_clear")
+
+
+def members_of(group_pks):
+    return CustomUser.objects.filter(groups__in=group_pks).values_list("pk", flat=True)
+
+
+@receiver(m2m_changed, sender=CustomUser.groups.through)
+@receiver(m2m_changed, sender=CustomUser.user_permissions.through)
+def user_m2m_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    if action not in M2M_ACTIONS:
+        return
+    if not reverse:
+        invalidate_users([instance.pk])
+    elif action == "pre_clear":
+        # group.user_set.clear() / permission.user_set.clear()
+        invalidate_users(instance.user_set.values_list("pk", flat=True))
+    else:
+        invalidate_users(pk_set)
+
+
+@receiver(m2m_changed, sender=Group.permissions.through)
+def group_permissions_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    if action not in M2M_ACTIONS:
+        return
+    if not reverse:
+        invalidate_users(members_of([instance.pk]))
+    elif action == "pre_clear":
+        # permission.group_set.clear()
+        invalidate_users(members_of(instance.group_set.values("pk")))
+    else:
+        invalidate_users(members_of(pk_set))
+
+
+@receiver(post_save, sender=CustomUser)
+def user_saved(sender, instance, created, update_fields, **kwargs):
+    # Logins only touch last_login; is_superuser changes what has_perm returns.
+    if not created and (update_fields is None or "is_superuser" in update_fields):
+        invalidate_users([instance.pk])
+
+
+@receiver(pre_delete, sender=CustomUser)
+def user_deleted(sender, instance, **kwargs):
+    invalidate_users([instance.pk])
+
+
+@receiver(pre_delete, sender=Group)
+def group_deleted(sender, instance, **kwargs):
+    invalidate_users(members_of([instance.pk]))
+
+
+@receiver(post_save, sender=Permission)
+@receiver(pre_delete, sender=Permission)
+def permission_changed(sender, instance, **kwargs):
+    # Renaming a codename changes the "app_label.codename" strings too.
+    if kwargs.get("created"):
+        return
+    invalidate_users(
+        CustomUser.objects.filter(Q(user_permissions=instance) | Q(groups__permissions=instance))
+        .values_list("pk", flat=True)
+        .distinct()
+    )
@@ -1,3 +1,87 @@
-from django.test import TestCase
+from django.contrib.auth.models import Group, Permission
+from django.contrib.contenttypes.models import ContentType
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import path
 
-# Create your tests here.
+from .models import Book, CustomUser
+from .views import book_list
+
+urlpatterns = [
+    path('books/', book_list, name='book_list'),
+]
+
+
+@override_settings(ROOT_URLCONF=__name__, SECURE_SSL_REDIRECT=False)
+class PermissionCacheTests(TestCase):
+    """
+    Permission checks are served from the cache until membership changes.
+    """
+
+    def setUp(self):
+        cache.clear()
+        # Book's Meta.permissions are not in a bookshelf migration yet.
+        self.can_view, _ = Permission.objects.get_or_create(
+            codename='can_view',
+            content_type=ContentType.objects.get_for_model(Book),
+            defaults={'name': 'Can view book'},
+        )
+        self.viewers = Group.objects.create(name='Viewers')
+        self.viewers.permissions.add(self.can_view)
+        self.user = CustomUser.objects.create_user(username='reader', password='pass12345')
+        self.user.groups.add(self.viewers)
+        self.client.force_login(self.user)
+
+    def get_status(self):
+        return self.client.get('/books/').status_code
+
+    def fresh_user(self):
+        return CustomUser.objects.get(pk=self.user.pk)
+
+    def test_repeat_requests_run_no_permission_queries(self):
+        self.assertEqual(self.get_status(), 200)
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(self.get_status(), 200)
+        self.assertFalse(any('"auth_permission"' in q['sql'] for q in queries))
+
+    def test_cache_outlives_the_user_instance(self):
+        self.assertTrue(self.fresh_user().has_perm('bookshelf.can_view'))
+        user = self.fresh_user()
+        with self.assertNumQueries(0):
+            self.assertTrue(user.has_perm('bookshelf.can_view'))
+            self.assertFalse(user.has_perm('bookshelf.can_delete'))
+
+    def test_leaving_group_revokes(self):
+        self.assertEqual(self.get_status(), 200)
+        self.user.groups.remove(self.viewers)
+        self.assertEqual(self.get_status(), 403)
+
+    def test_reverse_membership_changes_revoke(self):
+        self.assertEqual(self.get_status(), 200)
+        self.viewers.user_set.clear()
+        self.assertEqual(self.get_status(), 403)
+        self.viewers.user_set.add(self.user)
+        self.assertEqual(self.get_status(), 200)
+
+    def test_group_permission_changes_reach_members(self):
+        self.assertEqual(self.get_status(), 200)
+        self.viewers.permissions.clear()
+        self.assertEqual(self.get_status(), 403)
+        self.can_view.group_set.add(self.viewers)
+        self.assertEqual(self.get_status(), 200)
+
+    def test_user_permissions_and_group_deletion(self):
+        self.viewers.delete()
+        self.assertEqual(self.get_status(), 403)
+        self.user.user_permissions.add(self.can_view)
+        self.assertEqual(self.get_status(), 200)
+        self.can_view.user_set.remove(self.user)
+        self.assertEqual(self.get_status(), 403)
+
+    def test_inactive_users_have_no_permissions(self):
+        self.assertTrue(self.fresh_user().has_perm('bookshelf.can_view'))
+        self.user.is_active = False
+        self.user.save()
+        self.assertFalse(self.fresh_user().has_perm('bookshelf.can_view'))
@@ -0,0 +1,91 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+
+from relationship_app import query_samples
+from relationship_app.models import Author, Book, Librarian, Library
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare looping over the single-name query_samples helpers with the "
+        "batched ones on generated data, counting queries and timing both. "
+        "Everything runs in a transaction that is rolled back."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--names", type=int, default=500)
+        parser.add_argument("--books-per-author", type=int, default=5)
+        parser.add_argument("--rounds", type=int, default=5)
+
+    def handle(self, *args, **options):
+        size = options["names"]
+
+        with transaction.atomic():
+            self.populate(size, options["books_per_author"])
+            authors = [f"Author {i}" for i in range(size)]
+            libraries = [f"Library {i}" for i in range(size)]
+            self.compare(
+                "books by author",
+                lambda: {name: list(query_samples.get_books_by_author(name)) for name in authors},
+                lambda: query_samples.get_books_by_authors(authors),
+                options["rounds"],
+            )
+            self.compare(
+                "books in library",
+                lambda: {name: list(query_samples.get_books_in_library(name)) for name in libraries},
+                lambda: query_samples.get_books_in_libraries(libraries),
+                options["rounds"],
+            )
+            self.compare(
+                "librarian for library",
+                lambda: {name: query_samples.get_librarian_for_library(name) for name in libraries},
+                lambda: query_samples.get_librarians_for_libraries(libraries),
+                options["rounds"],
+            )
+            transaction.set_rollback(True)
+
+    def populate(self, size, books_per_author):
+        authors = Author.objects.bulk_create([Author(name=f"Author {i}") for i in range(size)])
+        libraries = Library.objects.bulk_create([Library(name=f"Library {i}") for i in range(size)])
+        Librarian.objects.bulk_create(
+            [Librarian(name=f"Librarian {i}", library=library) for i, library in enumerate(libraries)]
+        )
+        books = Book.objects.bulk_create(
+            [
+                Book(title=f"Book {i}-{n}", publication_year=2000, author=author, library=library)
+                for i, (author, library) in enumerate(zip(authors, libraries))
+                for n in range(books_per_author)
+            ],
+            batch_size=5000,
+        )
+        Library.books.through.objects.bulk_create(
+            [Library.books.through(library_id=book.library_id, book_id=book.pk) for book in books],
+            batch_size=5000,
+        )
+
+    @staticmethod
+    def counter(queries):
+        # Not CaptureQueriesContext: its log is capped at 9000 queries.
+        def wrapper(execute, sql, params, many, context):
+            queries.append(sql)
+            return execute(sql, params, many, context)
+
+        return wrapper
+
+    def compare(self, label, loop, batched, rounds):
+        if loop() != batched():
+            self.stderr.write(f"{label}: batched result differs from the loop")
+            return
+
+        self.stdout.write(f"\n{label}")
+        for name, run in (("loop", loop), ("batched", batched)):
+            queries = []
+            with connection.execute_wrapper(self.counter(queries)):
+                run()
+            started = time.perf_counter()
+            for _ in range(rounds):
+                run()
+            elapsed = (time.perf_counter() - started) / rounds
+            self.stdout.write(f"  {name:<8} {len(queries):6} queries  {elapsed * 1000:9.1f} ms")
@@ -1,3 +1,5 @@
+from django.db.models import F
+
 from relationship_app.models import Author, Book, Library, Librarian
 
 
@@ -23,3 +25,38 @@ def get_librarian_for_library(library_name):
     librarian = Librarian.objects.get(library=library)
     return librarian
 
+
+
+# Batched versions of the helpers above. Each takes any number of names and
+# runs one JOINed query, where looping over the single-name helpers costs
+# two queries per name. Results are dicts keyed by the requested names;
+# unknown names map to an empty list (or are left out of the librarian
+# dict) instead of raising DoesNotExist.
+
+def get_books_by_authors(author_names):
+    """Map each author name to a list of that author's books."""
+    author_names = set(author_names)
+    books = {name: [] for name in author_names}
+    for book in Book.objects.filter(author__name__in=author_names).select_related('author').order_by('pk'):
+        books[book.author.name].append(book)
+    return books
+
+
+def get_books_in_libraries(library_names):
+    """Map each library name to a list of the books it holds."""
+    library_names = set(library_names)
+    books = {name: [] for name in library_names}
+    rows = (
+        Book.objects.filter(libraries__name__in=library_names)
+        .annotate(library_name=F('libraries__name'))
+        .order_by('pk')
+    )
+    for book in rows:
+        books[book.library_name].append(book)
+    return books
+
+
+def get_librarians_for_libraries(library_names):
+    """Map each library name to its librarian; libraries without one are left out."""
+    librarians = Librarian.objects.filter(library__name__in=set(library_names)).select_related('library')
+    return {librarian.library.name: librarian for librarian in librarians}
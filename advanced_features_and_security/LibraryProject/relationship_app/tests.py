@@ -1,3 +1,160 @@
-from django.test import TestCase
+import re
 
-# Create your tests here.
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from .models import Author, Book, Librarian, Library
+from .query_samples import (
+    get_books_by_author,
+    get_books_by_authors,
+    get_books_in_libraries,
+    get_books_in_library,
+    get_librarian_for_library,
+    get_librarians_for_libraries,
+)
+from .views import BOOKS_PER_PAGE
+
+
+class ExplainMixin:
+    """
+    EXPLAIN helpers: assert a query is answered from an index rather than a
+    full table scan. On PostgreSQL sequential scans are disabled for the
+    plan, since the planner prefers them on tables as small as the fixtures.
+    """
+
+    def explain(self, sql):
+        with connection.cursor() as cursor:
+            if connection.vendor == 'postgresql':
+                cursor.execute('SET LOCAL enable_seqscan = off')
+                cursor.execute('EXPLAIN ' + sql)
+            else:
+                cursor.execute('EXPLAIN QUERY PLAN ' + sql)
+            return '\n'.join(str(row[-1]) for row in cursor.fetchall())
+
+    def assertUsesIndex(self, sql, table, index=None):
+        plan = self.explain(sql)
+        table = re.escape(table)
+        self.assertNotRegex(plan, rf'\bSCAN {table}\b(?! USING)|Seq Scan on {table}\b')
+        if index:
+            self.assertIn(index, plan)
+
+
+class QuerySampleIndexTests(ExplainMixin, TestCase):
+    """
+    The lookups in query_samples.py are served by indexes.
+    """
+
+    def setUp(self):
+        author = Author.objects.create(name="Chinua Achebe")
+        library = Library.objects.create(name="Central")
+        book = Book.objects.create(
+            title="Things Fall Apart", publication_year=1958, author=author, library=library
+        )
+        library.books.add(book)
+        Librarian.objects.create(name="Ada", library=library)
+
+    def run_sample(self, sample, *args):
+        with CaptureQueriesContext(connection) as queries:
+            result = sample(*args)
+            if hasattr(result, '_fetch_all'):
+                list(result)
+        return [query['sql'] for query in queries]
+
+    def test_books_by_author(self):
+        author_sql, books_sql = self.run_sample(get_books_by_author, "Chinua Achebe")
+        self.assertUsesIndex(author_sql, 'relationship_app_author', 'rel_author_name_idx')
+        self.assertUsesIndex(books_sql, 'relationship_app_book')
+
+    def test_books_in_library(self):
+        library_sql, books_sql = self.run_sample(get_books_in_library, "Central")
+        self.assertUsesIndex(library_sql, 'relationship_app_library', 'rel_library_name_idx')
+        self.assertUsesIndex(books_sql, 'relationship_app_library_books')
+
+    def test_librarian_for_library(self):
+        library_sql, librarian_sql = self.run_sample(get_librarian_for_library, "Central")
+        self.assertUsesIndex(library_sql, 'relationship_app_library', 'rel_library_name_idx')
+        self.assertUsesIndex(librarian_sql, 'relationship_app_librarian')
+
+
+class BatchedQuerySampleTests(TestCase):
+    """
+    The batched helpers match the single-name ones in one query per call.
+    """
+
+    def setUp(self):
+        for i in range(3):
+            author = Author.objects.create(name=f"Author {i}")
+            library = Library.objects.create(name=f"Library {i}")
+            Librarian.objects.create(name=f"Librarian {i}", library=library)
+            for n in range(2):
+                book = Book.objects.create(
+                    title=f"Book {i}-{n}", publication_year=2000, author=author, library=library
+                )
+                library.books.add(book)
+        self.authors = [f"Author {i}" for i in range(3)]
+        self.libraries = [f"Library {i}" for i in range(3)]
+
+    def test_books_by_authors(self):
+        with self.assertNumQueries(1):
+            books = get_books_by_authors(self.authors + ["Nobody"])
+        self.assertEqual(books["Nobody"], [])
+        for name in self.authors:
+            self.assertEqual(books[name], list(get_books_by_author(name).order_by('pk')))
+
+    def test_books_in_libraries(self):
+        shared = Book.objects.get(title="Book 0-0")
+        Library.objects.get(name="Library 1").books.add(shared)
+        with self.assertNumQueries(1):
+            books = get_books_in_libraries(self.libraries)
+        self.assertIn(shared, books["Library 1"])
+        for name in self.libraries:
+            self.assertEqual(books[name], list(get_books_in_library(name).order_by('pk')))
+
+    def test_librarians_for_libraries(self):
+        Library.objects.create(name="Unstaffed")
+        with self.assertNumQueries(1):
+            librarians = get_librarians_for_libraries(self.libraries + ["Unstaffed"])
+        self.assertNotIn("Unstaffed", librarians)
+        for name in self.libraries:
+            self.assertEqual(librarians[name], get_librarian_for_library(name))
+            self.assertEqual(librarians[name].library.name, name)
+
+
+@override_settings(SECURE_SSL_REDIRECT=False)
+class BookPageQueryTests(TestCase):
+    """
+    Book listings render one page of books in a fixed number of queries.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        author = Author.objects.create(name="Prolific")
+        cls.library = Library.objects.create(name="Big")
+        books = Book.objects.bulk_create(
+            [
+                Book(title=f"Book {i:05}", publication_year=2000, author=author, library=cls.library)
+                for i in range(10000)
+            ]
+        )
+        Library.books.through.objects.bulk_create(
+            [Library.books.through(library=cls.library, book=book) for book in books]
+        )
+
+    def test_library_detail(self):
+        url = reverse('library_detail', args=[self.library.pk])
+        # The library, the book count and the page of books with their authors.
+        with self.assertNumQueries(3):
+            response = self.client.get(url, {'page': 3})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.context['books']), BOOKS_PER_PAGE)
+        self.assertContains(response, "Book 00100 by Prolific")
+        self.assertContains(response, "Page 3 of 200")
+
+    def test_list_books(self):
+        with self.assertNumQueries(2):
+            response = self.client.get(reverse('list_books'), {'page': 200})
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, "Book 09999 by Prolific")
+        self.assertEqual(len(response.context['books']), BOOKS_PER_PAGE)
@@ -1,4 +1,5 @@
 from django.shortcuts import render, redirect, get_object_or_404
+from django.core.paginator import Paginator
 from django.views.generic.detail import DetailView
 from .models import Library, Book
 from django.contrib.auth.forms import AuthenticationForm, UserCreationForm
@@ -6,15 +7,28 @@ from django.contrib.auth import login, logout
 from django.contrib.auth.decorators import permission_required
 
 
+BOOKS_PER_PAGE = 50
+
+
 def list_books(request):
-    books = Book.objects.all()
-    return render(request, 'relationship_app/list_books.html', {'books': books})
+    # The author is joined in so rendering book.author.name costs no query per book.
+    books = Book.objects.select_related('author').order_by('title', 'pk')
+    page = Paginator(books, BOOKS_PER_PAGE).get_page(request.GET.get('page'))
+    return render(request, 'relationship_app/list_books.html', {'books': page})
 
 
 class LibraryDetailView(DetailView):
     model = Library
     template_name = 'relationship_app/library_detail.html'
     context_object_name = 'library'
+    books_per_page = BOOKS_PER_PAGE
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        # Only the requested page of books is loaded, with their authors.
+        books = self.object.books.select_related('author').order_by('title', 'pk')
+        context['books'] = Paginator(books, self.books_per_page).get_page(self.request.GET.get('page'))
+        return context
 
 
 def login_view(request):
@@ -0,0 +1,144 @@
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from rest_framework.authentication import TokenAuthentication
+
+DEFAULT_CACHE_SIZE = 10000
+DEFAULT_CACHE_TTL = 60
+
+
+class TokenCache:
+    """
+    Process-local LRU of token key -> value with a time-to-live.
+
+    api/signals.py drops entries when a token is deleted or re-keyed and when
+    its user, the user's groups or their permissions change. Those signals
+    only reach the process that made the change, so the TTL bounds how long
+    other worker processes may keep accepting a deleted token.
+    """
+
+    def __init__(self, maxsize, ttl):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.entries = OrderedDict()
+        # owner -> keys, so discard_user() does not scan every entry.
+        self.owned_keys = {}
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        now = time.monotonic()
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None or entry[0] <= now:
+                if entry is not None:
+                    self._remove(key)
+                self.misses += 1
+                return None
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return entry[2]
+
+    def set(self, key, value, owner=None):
+        """Cache value under key; discard_user(owner) will drop it."""
+        with self.lock:
+            if key in self.entries:
+                self._remove(key)
+            self.entries[key] = (time.monotonic() + self.ttl, owner, value)
+            if owner is not None:
+                self.owned_keys.setdefault(owner, set()).add(key)
+            while len(self.entries) > self.maxsize:
+                self._remove(next(iter(self.entries)))
+
+    def _remove(self, key):
+        _, owner, _ = self.entries.pop(key)
+        keys = self.owned_keys.get(owner)
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del self.owned_keys[owner]
+
+    def discard(self, key):
+        with self.lock:
+            if key in self.entries:
+                self._remove(key)
+
+    def discard_user(self, user_id):
+        with self.lock:
+            for key in self.owned_keys.pop(user_id, ()):
+                del self.entries[key]
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+            self.owned_keys.clear()
+
+    def get_stats(self):
+        """Hit/miss counters since start-up (or the last reset)."""
+        with self.lock:
+            lookups = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+                'size': len(self.entries),
+            }
+
+    def reset_stats(self):
+        with self.lock:
+            self.hits = self.misses = 0
+
+
+token_cache = TokenCache(
+    maxsize=getattr(settings, 'API_TOKEN_CACHE_SIZE', DEFAULT_CACHE_SIZE),
+    ttl=getattr(settings, 'API_TOKEN_CACHE_TTL', DEFAULT_CACHE_TTL),
+)
+
+
+def get_row(instance):
+    """The concrete field values of a model instance, in field order."""
+    return tuple(getattr(instance, field.attname) for field in instance._meta.concrete_fields)
+
+
+def from_row(model, row, db):
+    return model.from_db(db, [field.attname for field in model._meta.concrete_fields], row)
+
+
+class CachedTokenAuthentication(TokenAuthentication):
+    """
+    TokenAuthentication that remembers successful lookups in token_cache, so
+    repeat requests with the same token do not query the database.
+    Unknown and inactive tokens are never cached.
+
+    The cache holds the user and token rows, not model instances: every
+    request gets its own User built from them, so nothing a request sets on
+    it (ModelBackend's _perm_cache included) leaks into another one.
+
+    Each request also carries its own counters in request.token_cache_stats
+    ({'hits': ..., 'misses': ...}), next to the process totals of
+    token_cache.get_stats().
+    """
+
+    def authenticate(self, request):
+        self.request_stats = {'hits': 0, 'misses': 0}
+        # On the HttpRequest, so middleware and logging can read it too.
+        request._request.token_cache_stats = self.request_stats
+        return super().authenticate(request)
+
+    def authenticate_credentials(self, key):
+        model = self.get_model()
+        cached = token_cache.get(key)
+        stats = getattr(self, 'request_stats', {'hits': 0, 'misses': 0})
+        stats['hits' if cached is not None else 'misses'] += 1
+        if cached is not None:
+            user_row, token_row, db = cached
+            user = from_row(model.user.field.related_model, user_row, db)
+            token = from_row(model, token_row, db)
+            token.user = user
+            return user, token
+        user, token = super().authenticate_credentials(key)
+        token_cache.set(key, (get_row(user), get_row(token), token._state.db), owner=user.pk)
+        return user, token
@@ -0,0 +1,67 @@
+import time
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.urls import reverse
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+
+from api.models import Book
+from api.serializers import BULK_MAX_ITEMS
+from api.views import BookViewSet
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare ingest throughput of single-item POSTs to /api/books_all/ "
+        "with batched POSTs to /api/books_all/bulk/. Requests go through the "
+        "full DRF stack in-process; everything is rolled back afterwards."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--books", type=int, default=5000)
+        parser.add_argument("--batch-size", type=int, default=BULK_MAX_ITEMS)
+
+    def handle(self, *args, **options):
+        count = options["books"]
+        payload = [{"title": f"Ingested book {i}", "author": "Bench"} for i in range(count)]
+
+        # No throttling: thousands of POSTs would otherwise end in 429s.
+        with transaction.atomic(), mock.patch.object(BookViewSet, "throttle_classes", []):
+            user = User.objects.create_user(username="bench-bulk-ingest")
+            client = APIClient(HTTP_HOST="localhost")
+            client.credentials(HTTP_AUTHORIZATION=f"Token {Token.objects.create(user=user).key}")
+
+            single_url = reverse("book_all-list")
+            self.run(
+                "single POSTs",
+                count,
+                lambda: [client.post(single_url, item, format="json") for item in payload],
+            )
+
+            bulk_url = reverse("book_all-bulk")
+            size = options["batch_size"]
+            self.run(
+                f"bulk POSTs ({size}/request)",
+                count,
+                lambda: [
+                    client.post(bulk_url, payload[start:start + size], format="json")
+                    for start in range(0, count, size)
+                ],
+            )
+            transaction.set_rollback(True)
+
+    def run(self, label, count, ingest):
+        before = Book.objects.count()
+        started = time.perf_counter()
+        responses = ingest()
+        elapsed = time.perf_counter() - started
+        failed = [r.status_code for r in responses if r.status_code != 201]
+        if failed or Book.objects.count() - before != count:
+            self.stderr.write(f"{label}: unexpected responses {failed[:5]}")
+            return
+        self.stdout.write(
+            f"{label:<26} {len(responses):6d} requests  {elapsed:7.2f}s  {count / elapsed:10,.0f} books/s"
+        )
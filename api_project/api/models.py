@@ -3,6 +3,19 @@ from django.db import models
 class Book(models.Model):
     title = models.CharField(max_length=200)
     author = models.CharField(max_length=200)
+    # Drives the ETag / Last-Modified headers of the detail endpoint.
+    updated_at = models.DateTimeField(auto_now=True)
 
     def __str__(self):
         return self.title
+
+
+# Change counter per table, bumped by api/signals.py. List endpoints derive
+# their ETag from it instead of from the rows they return.
+class TableVersion(models.Model):
+    table = models.CharField(max_length=100, primary_key=True)
+    version = models.PositiveBigIntegerField(default=0)
+    updated_at = models.DateTimeField()
+
+    def __str__(self):
+        return f"{self.table} v{self.version}"
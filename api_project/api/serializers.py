@@ -1,7 +1,63 @@
+from django.utils import timezone
 from rest_framework import serializers
+
+from apikit.conditional import bump_table_version
+
 from .models import Book
 
+# Largest list accepted by the bulk endpoints in one request.
+BULK_MAX_ITEMS = 1000
+
+
+class BookListSerializer(serializers.ListSerializer):
+    """
+    BookSerializer(many=True) for the bulk endpoints: writes with
+    bulk_create / bulk_update instead of one query per book.
+
+    For updates, pass the books to change as a {pk: Book} dict; every item in
+    the payload names its book with "id".
+    """
+
+    def run_child_validation(self, data):
+        if self.instance is not None:
+            try:
+                self.child.instance = self.instance[int(data['id'])]
+            except (KeyError, TypeError, ValueError):
+                raise serializers.ValidationError({'id': ['No book with this id.']})
+            self.child.initial_data = data
+        return super().run_child_validation(data)
+
+    def validate(self, attrs):
+        if self.instance is not None:
+            ids = [int(item['id']) for item in self.initial_data]
+            if len(set(ids)) != len(ids):
+                raise serializers.ValidationError('Each book may only appear once.')
+        return attrs
+
+    def create(self, validated_data):
+        books = Book.objects.bulk_create([Book(**attrs) for attrs in validated_data])
+        # bulk_create() sends no post_save signals.
+        bump_table_version(Book)
+        return books
+
+    def update(self, instances, validated_data):
+        now = timezone.now()
+        books = []
+        for item, attrs in zip(self.initial_data, validated_data):
+            book = instances[int(item['id'])]
+            for field, value in attrs.items():
+                setattr(book, field, value)
+            # bulk_update() skips auto_now.
+            book.updated_at = now
+            books.append(book)
+        fields = sorted({field for attrs in validated_data for field in attrs}) + ['updated_at']
+        Book.objects.bulk_update(books, fields)
+        bump_table_version(Book)
+        return books
+
+
 class BookSerializer(serializers.ModelSerializer):
     class Meta:
         model = Book
-        fields = '__all__'
+        fields = ['id', 'title', 'author']
+        list_serializer_class = BookListSerializer
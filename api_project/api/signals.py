@@ -0,0 +1,68 @@
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import Group
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_save
+from django.dispatch import receiver
+from rest_framework.authtoken.models import Token
+
+from apikit.conditional import bump_table_version
+
+from .authentication import token_cache
+from .models import Book
+
+User = get_user_model()
+
+
+# Keep the TableVersion counter used for list ETags in step with the data.
+@receiver(post_save, sender=Book)
+@receiver(post_delete, sender=Book)
+def table_changed(sender, **kwargs):
+    bump_table_version(sender)
+
+
+# Drop cached token lookups (api/authentication.py) that may have gone stale.
+@receiver(pre_save, sender=Token)
+@receiver(post_delete, sender=Token)
+def token_changed(sender, instance, **kwargs):
+    token_cache.discard(instance.key)
+    # A rotated token is saved with a new key; forget the user's old ones too.
+    token_cache.discard_user(instance.user_id)
+
+
+@receiver(post_save, sender=settings.AUTH_USER_MODEL)
+@receiver(post_delete, sender=settings.AUTH_USER_MODEL)
+def token_user_changed(sender, instance, update_fields=None, **kwargs):
+    # Deactivated or deleted users must stop authenticating. Logins only
+    # touch last_login, which the cached row may keep stale.
+    if update_fields is not None and set(update_fields) <= {'last_login'}:
+        return
+    token_cache.discard_user(instance.pk)
+
+
+@receiver(m2m_changed, sender=User.groups.through)
+@receiver(m2m_changed, sender=User.user_permissions.through)
+def token_user_access_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    # Requests rebuild the user from its row, so permissions are read fresh
+    # anyway; dropping the entry keeps the cache from outliving the change.
+    if action not in ('post_add', 'post_remove', 'pre_clear'):
+        return
+    if not reverse:
+        token_cache.discard_user(instance.pk)
+    else:
+        user_ids = pk_set if action != 'pre_clear' else instance.user_set.values_list('pk', flat=True)
+        for user_id in user_ids:
+            token_cache.discard_user(user_id)
+
+
+@receiver(m2m_changed, sender=Group.permissions.through)
+def token_group_access_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    if action not in ('post_add', 'post_remove', 'pre_clear'):
+        return
+    if not reverse:
+        members = User.objects.filter(groups=instance)
+    elif action == 'pre_clear':
+        members = User.objects.filter(groups__in=instance.group_set.all())
+    else:
+        members = User.objects.filter(groups__in=pk_set)
+    for user_id in members.values_list('pk', flat=True).distinct():
+        token_cache.discard_user(user_id)
@@ -1,3 +1,351 @@
-from django.test import TestCase
+import unittest
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth.models import Group, Permission, User
+from django.db.models.signals import post_delete
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APITestCase
+
+from apikit.conditional import get_table_versions
+from apikit.renderers import msgpack
+from apikit.throttling import UserBucketThrottle, get_limiter
+
+from .authentication import CachedTokenAuthentication, TokenCache, token_cache
+from .models import Book
+from .views import BookViewSet
+
+
+class ConditionalGetTests(APITestCase):
+    """
+    ETag / Last-Modified on BookList and BookViewSet.
+    """
+
+    def setUp(self):
+        self.user = User.objects.create_user(username="reader", password="pass1234")
+        token = Token.objects.create(user=self.user)
+        self.client.credentials(HTTP_AUTHORIZATION=f"Token {token.key}")
+        self.book = Book.objects.create(title="Dune", author="Frank Herbert")
+
+    def test_list_returns_304_without_querying_books(self):
+        url = reverse('book-list')
+        etag = self.client.get(url)['ETag']
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertFalse(any('"api_book"' in q['sql'] for q in queries))
+
+    def test_viewset_list_etag_changes_on_write(self):
+        url = reverse('book_all-list')
+        etag = self.client.get(url)['ETag']
+        self.client.post(url, {"title": "Emma", "author": "Jane Austen"}, format='json')
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data), 2)
+
+    def test_viewset_detail_conditional_get(self):
+        url = reverse('book_all-detail', args=[self.book.pk])
+        response = self.client.get(url)
+        etag, last_modified = response['ETag'], response['Last-Modified']
+        self.assertEqual(response.data, {"id": self.book.pk, "title": "Dune", "author": "Frank Herbert"})
+        self.assertEqual(
+            self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code,
+            status.HTTP_304_NOT_MODIFIED,
+        )
+        self.assertEqual(
+            self.client.get(url, HTTP_IF_MODIFIED_SINCE=last_modified).status_code,
+            status.HTTP_304_NOT_MODIFIED,
+        )
+
+        self.client.patch(url, {"title": "Dune Messiah"}, format='json')
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["title"], "Dune Messiah")
+
+    def test_anonymous_request_is_rejected_before_validators(self):
+        self.client.credentials()
+        response = self.client.get(reverse('book_all-list'))
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+        self.assertNotIn('ETag', response)
+
+
+class BulkEndpointTests(APITestCase):
+    """
+    Batch create / update / delete on /books_all/bulk/.
+    """
+
+    def setUp(self):
+        self.user = User.objects.create_user(username="ingest", password="pass1234")
+        token = Token.objects.create(user=self.user)
+        self.client.credentials(HTTP_AUTHORIZATION=f"Token {token.key}")
+        self.url = reverse('book_all-bulk')
+
+    def test_bulk_create_uses_one_insert(self):
+        payload = [{"title": f"Book {i}", "author": "Anon"} for i in range(50)]
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post(self.url, payload, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(len(response.data), 50)
+        self.assertTrue(all(book["id"] for book in response.data))
+        self.assertEqual(Book.objects.count(), 50)
+        inserts = [q for q in queries if q['sql'].startswith('INSERT INTO "api_book"')]
+        self.assertEqual(len(inserts), 1)
+
+    def test_invalid_item_rejects_whole_batch(self):
+        payload = [
+            {"title": "Fine", "author": "Anon"},
+            {"title": "", "author": "Anon"},
+            {"author": "Anon"},
+        ]
+        response = self.client.post(self.url, payload, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(sorted(response.data), [1, 2])
+        self.assertIn("title", response.data[2])
+        self.assertEqual(Book.objects.count(), 0)
+
+    def test_bulk_partial_update(self):
+        books = Book.objects.bulk_create(
+            [Book(title=f"Book {i}", author="Anon") for i in range(3)]
+        )
+        payload = [{"id": book.pk, "author": "Someone"} for book in books[:2]]
+        response = self.client.patch(self.url, payload, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            list(Book.objects.order_by('pk').values_list('author', flat=True)),
+            ["Someone", "Someone", "Anon"],
+        )
+
+    def test_bulk_update_reports_unknown_and_duplicate_ids(self):
+        book = Book.objects.create(title="Dune", author="Frank Herbert")
+        response = self.client.put(
+            self.url,
+            [{"id": book.pk, "title": "Dune", "author": "F. H."}, {"id": 999, "title": "X", "author": "Y"}],
+            format='json',
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(list(response.data), [1])
+
+        response = self.client.patch(
+            self.url, [{"id": book.pk, "title": "A"}, {"id": book.pk, "title": "B"}], format='json'
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        book.refresh_from_db()
+        self.assertEqual(book.title, "Dune")
+
+    def test_bulk_delete(self):
+        books = Book.objects.bulk_create([Book(title=f"Book {i}", author="Anon") for i in range(3)])
+        response = self.client.delete(self.url, [books[0].pk, 999], format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(Book.objects.count(), 3)
+
+        response = self.client.delete(self.url, [books[0].pk, books[1].pk], format='json')
+        self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+        self.assertEqual(list(Book.objects.values_list('pk', flat=True)), [books[2].pk])
+
+    def test_bulk_delete_query_count_does_not_grow_with_ids(self):
+        # Warm the token cache and create the table version row.
+        self.client.delete(self.url, [Book.objects.create(title="X", author="Y").pk], format='json')
+        # Up to 100 ids, the size of one Django delete batch.
+        for count in (2, 100):
+            books = Book.objects.bulk_create([Book(title=f"Book {i}", author="Anon") for i in range(count)])
+            # Savepoint, id check, delete()'s SELECT and DELETE, one table
+            # version bump, release.
+            with self.assertNumQueries(6):
+                response = self.client.delete(self.url, [book.pk for book in books], format='json')
+            self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+            self.assertFalse(Book.objects.exists())
+
+    def test_bulk_delete_sends_delete_signals(self):
+        books = Book.objects.bulk_create([Book(title=f"Book {i}", author="Anon") for i in range(3)])
+        deleted = []
+
+        def receiver(sender, instance, **kwargs):
+            deleted.append(instance.pk)
+
+        post_delete.connect(receiver, sender=Book)
+        try:
+            version = self.list_version()
+            self.client.delete(self.url, [book.pk for book in books], format='json')
+        finally:
+            post_delete.disconnect(receiver, sender=Book)
+        self.assertEqual(sorted(deleted), [book.pk for book in books])
+        self.assertEqual(self.list_version(), version + 1)
+
+    def list_version(self):
+        return get_table_versions([Book])[0][0]
+
+    def test_bulk_requires_authentication(self):
+        self.client.credentials()
+        response = self.client.post(self.url, [{"title": "X", "author": "Y"}], format='json')
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_bulk_write_changes_list_etag(self):
+        list_url = reverse('book-list')
+        etag = self.client.get(list_url)['ETag']
+        self.client.post(self.url, [{"title": "X", "author": "Y"}], format='json')
+        self.assertEqual(self.client.get(list_url, HTTP_IF_NONE_MATCH=etag).status_code, status.HTTP_200_OK)
+
+
+class CachedTokenAuthenticationTests(APITestCase):
+    """
+    Token lookups are served from token_cache and dropped when stale.
+    """
+
+    def setUp(self):
+        token_cache.clear()
+        token_cache.reset_stats()
+        self.user = User.objects.create_user(username="reader", password="pass1234")
+        self.token = Token.objects.create(user=self.user)
+        self.client.credentials(HTTP_AUTHORIZATION=f"Token {self.token.key}")
+        self.url = reverse('book_all-list')
+
+    def test_repeat_requests_skip_token_query(self):
+        self.client.get(self.url)
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertFalse(any('"authtoken_token"' in q['sql'] for q in queries))
+        self.assertEqual(token_cache.get_stats()['hits'], 1)
+        self.assertEqual(token_cache.get_stats()['hit_rate'], 0.5)
+
+    def test_request_level_counters(self):
+        first = self.client.get(self.url).wsgi_request
+        second = self.client.get(self.url).wsgi_request
+        self.assertEqual(first.token_cache_stats, {'hits': 0, 'misses': 1})
+        self.assertEqual(second.token_cache_stats, {'hits': 1, 'misses': 0})
+
+    def test_deleted_token_stops_working(self):
+        self.client.get(self.url)
+        self.token.delete()
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_rotated_token_replaces_old_one(self):
+        self.client.get(self.url)
+        self.token.delete()
+        new_token = Token.objects.create(user=self.user)
+        self.assertEqual(self.client.get(self.url).status_code, status.HTTP_401_UNAUTHORIZED)
+        self.client.credentials(HTTP_AUTHORIZATION=f"Token {new_token.key}")
+        self.assertEqual(self.client.get(self.url).status_code, status.HTTP_200_OK)
+
+    def test_deactivated_user_stops_working(self):
+        self.client.get(self.url)
+        self.user.is_active = False
+        self.user.save()
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_invalid_tokens_are_not_cached(self):
+        self.client.credentials(HTTP_AUTHORIZATION="Token not-a-real-token")
+        self.client.get(self.url)
+        self.assertEqual(token_cache.get_stats()['size'], 0)
+
+    def test_lru_and_ttl(self):
+        cache = TokenCache(maxsize=2, ttl=60)
+        cache.set('a', 1)
+        cache.set('b', 2)
+        cache.get('a')
+        cache.set('c', 3)
+        self.assertIsNone(cache.get('b'))
+        self.assertEqual(cache.get('a'), 1)
+
+        cache = TokenCache(maxsize=2, ttl=0)
+        cache.set('a', 1)
+        self.assertIsNone(cache.get('a'))
+
+    def test_discard_user_drops_only_their_keys(self):
+        cache = TokenCache(maxsize=2, ttl=60)
+        cache.set('a', 1, owner=1)
+        cache.set('b', 2, owner=2)
+        cache.set('c', 3, owner=1)  # evicts 'a'
+        cache.discard_user(1)
+        self.assertEqual(cache.get_stats()['size'], 1)
+        self.assertEqual(cache.get('b'), 2)
+        self.assertEqual(cache.owned_keys, {2: {'b'}})
+
+    def test_each_request_gets_its_own_user(self):
+        auth = CachedTokenAuthentication()
+        first, _ = auth.authenticate_credentials(self.token.key)
+        first.has_perm('api.add_book')
+        first.first_name = "Changed"
+        with self.assertNumQueries(0):
+            second, token = auth.authenticate_credentials(self.token.key)
+        self.assertIsNot(second, first)
+        self.assertEqual(second, self.user)
+        self.assertEqual(second.first_name, "")
+        self.assertFalse(hasattr(second, '_perm_cache'))
+        self.assertIs(token.user, second)
+        self.assertEqual(token, self.token)
+
+    def test_group_changes_drop_entries_and_logins_do_not(self):
+        self.client.get(self.url)
+        self.user.last_login = timezone.now()
+        self.user.save(update_fields=['last_login'])
+        self.assertEqual(token_cache.get_stats()['size'], 1)
+
+        group = Group.objects.create(name="editors")
+        self.user.groups.add(group)
+        self.assertEqual(token_cache.get_stats()['size'], 0)
+
+        self.client.get(self.url)
+        group.permissions.add(Permission.objects.get(codename='add_book'))
+        self.assertEqual(token_cache.get_stats()['size'], 0)
+
+
+class ThrottleTests(APITestCase):
+    """
+    BookViewSet limits each token's user with a token bucket.
+    """
+
+    class UserThrottle(UserBucketThrottle):
+        rate = '3/min'
+
+    def setUp(self):
+        get_limiter.cache_clear()
+        self.addCleanup(get_limiter.cache_clear)
+        patcher = mock.patch.object(BookViewSet, 'throttle_classes', [self.UserThrottle])
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.url = reverse('book_all-list')
+
+    def authenticate(self, username):
+        user = User.objects.create_user(username=username, password="pass1234")
+        self.client.credentials(HTTP_AUTHORIZATION=f"Token {Token.objects.create(user=user).key}")
+
+    def test_burst_then_429_per_user(self):
+        self.authenticate("first")
+        codes = [self.client.get(self.url).status_code for _ in range(4)]
+        self.assertEqual(codes, [200, 200, 200, 429])
+        self.assertIn('Retry-After', self.client.get(self.url))
+
+        self.authenticate("second")
+        self.assertEqual(self.client.get(self.url).status_code, status.HTTP_200_OK)
+
+
+@unittest.skipIf(msgpack is None, "msgpack is not installed")
+class MessagePackTests(APITestCase):
+    """
+    The bulk endpoint speaks MessagePack when asked to.
+    """
+
+    def setUp(self):
+        user = User.objects.create_user(username="ingest", password="pass1234")
+        self.client.credentials(HTTP_AUTHORIZATION=f"Token {Token.objects.create(user=user).key}")
+
+    def test_bulk_create_with_msgpack(self):
+        body = msgpack.packb([{"title": f"Book {i}", "author": "Anon"} for i in range(3)])
+        response = self.client.post(
+            reverse('book_all-bulk'), body,
+            content_type='application/msgpack', HTTP_ACCEPT='application/msgpack',
+        )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual([book["title"] for book in msgpack.unpackb(response.content)], ["Book 0", "Book 1", "Book 2"])
+
+    def test_errors_keyed_by_index_render_as_json(self):
+        response = self.client.post(reverse('book_all-bulk'), [{"title": "X"}], format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(list(response.json()), ["0"])
@@ -1,14 +1,89 @@
-from rest_framework import generics, viewsets
+from django.db import transaction
+from rest_framework import generics, serializers, status, viewsets
+from rest_framework.decorators import action
 from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+
+from apikit.conditional import ConditionalGetMixin, coalesce_table_versions
+from apikit.throttling import AnonBucketThrottle, UserBucketThrottle
+
 from .models import Book
-from .serializers import BookSerializer
+from .serializers import BULK_MAX_ITEMS, BookSerializer
+
+
+def as_pk(value):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
 
-class BookList(generics.ListAPIView):
+class BookList(ConditionalGetMixin, generics.ListAPIView):
     queryset = Book.objects.all()
     serializer_class = BookSerializer
 
 
-class BookViewSet(viewsets.ModelViewSet):
+class BookViewSet(ConditionalGetMixin, viewsets.ModelViewSet):
     queryset = Book.objects.all()
     serializer_class = BookSerializer
     permission_classes = [IsAuthenticated]
+    throttle_classes = [AnonBucketThrottle, UserBucketThrottle]
+
+    # Batch endpoint for ingest jobs: /books_all/bulk/ takes a JSON list.
+    #   POST          create books                        -> 201 + created books
+    #   PUT / PATCH   update books, each item has an "id" -> 200 + updated books
+    #   DELETE        delete books, body is a list of ids -> 204
+    # Every batch runs in one transaction: if any item is invalid nothing is
+    # written and the 400 response maps item indexes to their errors.
+    @action(detail=False, methods=['post', 'put', 'patch', 'delete'], url_path='bulk')
+    def bulk(self, request):
+        if request.method == 'DELETE':
+            return self.bulk_destroy(request)
+
+        if request.method == 'POST':
+            serializer = self.get_serializer(data=request.data, many=True, max_length=BULK_MAX_ITEMS)
+            response_status = status.HTTP_201_CREATED
+        else:
+            serializer = self.get_serializer(
+                self.get_bulk_instances(request.data),
+                data=request.data,
+                many=True,
+                partial=request.method == 'PATCH',
+                max_length=BULK_MAX_ITEMS,
+            )
+            response_status = status.HTTP_200_OK
+
+        with transaction.atomic():
+            serializer.is_valid(raise_exception=True)
+            serializer.save()
+        return Response(serializer.data, status=response_status)
+
+    def get_bulk_instances(self, data):
+        # One query for every book the payload names; BookListSerializer
+        # reports the ids it cannot find.
+        items = data if isinstance(data, list) else []
+        ids = [as_pk(item.get('id')) for item in items if isinstance(item, dict)]
+        return self.get_queryset().in_bulk([pk for pk in ids if pk is not None])
+
+    def bulk_destroy(self, request):
+        ids = request.data
+        if not isinstance(ids, list) or not ids or len(ids) > BULK_MAX_ITEMS:
+            raise serializers.ValidationError(
+                {'non_field_errors': [f'Expected a list of 1 to {BULK_MAX_ITEMS} book ids.']}
+            )
+        pks = [as_pk(pk) for pk in ids]
+        with transaction.atomic():
+            books = self.get_queryset().filter(pk__in=[pk for pk in pks if pk is not None])
+            existing = set(books.values_list('pk', flat=True))
+            errors = {
+                index: {'id': ['No book with this id.']}
+                for index, pk in enumerate(pks)
+                if pk not in existing
+            }
+            if errors:
+                raise serializers.ValidationError(errors)
+            # delete() sends post_delete for every book, so signal receivers
+            # and cascades still run; the table version is bumped once.
+            with coalesce_table_versions():
+                books.delete()
+        return Response(status=status.HTTP_204_NO_CONTENT)
@@ -19,5 +19,6 @@ from django.urls import path, include
 
 urlpatterns = [
     path('admin/', admin.site.urls),
+    path('perfmon/', include('perfmon.urls')),
     path('api/', include('api.urls')),
 ]
@@ -9,6 +9,12 @@ from django.dispatch import receiver
 class Author(models.Model):
     name = models.CharField(max_length=100)
 
+    class Meta:
+        indexes = [
+            # query_samples.get_books_by_author() looks authors up by name.
+            models.Index(fields=['name'], name='rel_author_name_idx'),
+        ]
+
     def __str__(self):
         return self.name
 
@@ -43,6 +49,12 @@ class Library(models.Model):
     name = models.CharField(max_length=100)
     books = models.ManyToManyField(Book, related_name='libraries')
 
+    class Meta:
+        indexes = [
+            # Libraries are looked up by name in query_samples.py.
+            models.Index(fields=['name'], name='rel_library_name_idx'),
+        ]
+
     def __str__(self):
         return self.name
 
@@ -0,0 +1,29 @@
+"""
+Maintenance of the denormalized Post.comment_count / Post.last_comment_at.
+
+Each helper is a single UPDATE built from F() expressions, so concurrent
+comments never lose an increment. Callers run them in the same transaction
+as the comment insert or delete.
+"""
+from django.db.models import F, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce, Greatest
+
+from .models import Comment, Post
+
+
+def comment_added(comment):
+    Post.objects.filter(pk=comment.post_id).update(
+        comment_count=F("comment_count") + 1,
+        # Coalesce first: SQLite's GREATEST returns NULL if any argument is NULL.
+        last_comment_at=Greatest(
+            Coalesce("last_comment_at", Value(comment.created_at)), Value(comment.created_at)
+        ),
+    )
+
+
+def comment_removed(comment):
+    latest = Comment.objects.filter(post=OuterRef("pk")).order_by("-created_at").values("created_at")[:1]
+    Post.objects.filter(pk=comment.post_id).update(
+        comment_count=Greatest(F("comment_count") - 1, Value(0)),
+        last_comment_at=Subquery(latest),
+    )
@@ -0,0 +1,103 @@
+"""
+Async counterparts of the read-only blog views, served under /async/.
+
+They render the same templates with the same context as the sync views,
+but fetch everything up front through Django's async ORM (aget, acount,
+async for). Nothing may hit the database lazily while a template renders,
+which is why the user, the comment page and the tag cloud are materialized
+before render() and passed in explicitly.
+
+They bring no throughput gain on this stack. Django 5.2 runs every async ORM
+call in a thread, and under ASGI it runs sync views in per-request threads.
+`manage.py loadtest` at concurrency 20 under uvicorn measured 130 req/s for
+/posts/ and 137 req/s for /async/posts/. The views are kept as a pattern for
+async-native database access, for when the ORM or a driver stops needing
+threads. They do not use the anonymous page cache (blog/cache.py).
+"""
+from django.core.paginator import Paginator
+from django.shortcuts import aget_object_or_404, render
+from django.views import View
+
+from .forms import CommentForm
+from .models import Post
+from .pagination import KeysetPaginationMixin
+from .search import get_search_engine
+from .tagging import tags_named
+from .tagstats import assign_cloud_levels, tag_cloud_queryset
+from .views import PostDetailView, PostSortMixin
+
+
+class AsyncKeysetListView(KeysetPaginationMixin, View):
+    template_name = None
+
+    def get_queryset(self):
+        return Post.objects.all()
+
+    async def get_extra_context(self):
+        return {}
+
+    async def get(self, request, *args, **kwargs):
+        window, state = self.get_page_window(self.get_queryset(), self.paginate_by)
+        rows = [post async for post in window]
+        paginator, page, posts, is_paginated = self.make_page(rows, state)
+        context = {
+            "posts": posts,
+            "page_obj": page,
+            "paginator": paginator,
+            "is_paginated": is_paginated,
+            "user": await request.auser(),
+            **await self.get_extra_context(),
+        }
+        return render(request, self.template_name, context)
+
+
+class AsyncPostListView(PostSortMixin, AsyncKeysetListView):
+    template_name = "blog/post_list.html"
+
+    async def get_extra_context(self):
+        return {"sort": self.get_sort()}
+
+
+class AsyncTagPostListView(AsyncKeysetListView):
+    template_name = "blog/tag_post_list.html"
+
+    def get_queryset(self):
+        return Post.objects.filter(tags__in=tags_named(self.kwargs["tag_name"]))
+
+    async def get_extra_context(self):
+        cloud = [stats async for stats in tag_cloud_queryset()]
+        return {"tag_name": self.kwargs["tag_name"], "tag_cloud": assign_cloud_levels(cloud)}
+
+
+class AsyncPostDetailView(View):
+    template_name = "blog/post_detail.html"
+    comments_per_page = PostDetailView.comments_per_page
+
+    async def get(self, request, pk):
+        post = await aget_object_or_404(
+            Post.objects.select_related("author").prefetch_related("tags"), pk=pk
+        )
+        comments = post.comments.select_related("author").order_by("-created_at", "-pk")
+        paginator = Paginator(comments, self.comments_per_page)
+        # Fill the cached count asynchronously so get_page() does not query.
+        paginator.count = await comments.acount()
+        page = paginator.get_page(request.GET.get("comments_page"))
+        page.object_list = [comment async for comment in page.object_list]
+
+        user = await request.auser()
+        context = {"object": post, "post": post, "comments": page, "user": user}
+        if user.is_authenticated:
+            context["comment_form"] = CommentForm()
+        return render(request, self.template_name, context)
+
+
+class AsyncSearchResultsView(View):
+    template_name = "blog/search_results.html"
+
+    async def get(self, request):
+        results = get_search_engine().search(request.GET.get("q", ""))
+        context = {
+            "posts": [post async for post in results],
+            "user": await request.auser(),
+        }
+        return render(request, self.template_name, context)
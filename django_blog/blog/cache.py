@@ -0,0 +1,126 @@
+"""
+Rendered-page cache for anonymous readers.
+
+Cached pages are tagged with invalidation groups ("posts", "post:<pk>",
+"tag:<name>", "tags"). Each group has a generation counter stored in the
+cache and the counters of a page's groups are part of its cache key, so
+bumping a group's generation makes every page in that group unreachable at
+once.
+blog/signals.py bumps the groups whenever a Post, Comment or Tag changes;
+BLOG_PAGE_CACHE_TIMEOUT only bounds how long unreachable entries linger.
+"""
+import hashlib
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.http import HttpResponse
+
+DEFAULT_TIMEOUT = 300
+KEY_PREFIX = "blog:page"
+
+POSTS_GROUP = "posts"
+# Pages showing tag popularity (the tag cloud).
+TAGS_GROUP = "tags"
+
+_stats_lock = threading.Lock()
+_stats = {"hits": 0, "misses": 0}
+
+
+def post_group(pk):
+    return f"post:{pk}"
+
+
+def tag_group(name):
+    # Tag pages match names case-insensitively (blog/tagging.py).
+    return f"tag:{name.lower()}"
+
+
+def _generation_key(group):
+    digest = hashlib.md5(group.encode()).hexdigest()
+    return f"{KEY_PREFIX}:gen:{digest}"
+
+
+def get_generations(groups):
+    keys = [_generation_key(group) for group in groups]
+    generations = cache.get_many(keys)
+    for key in keys:
+        if key not in generations:
+            # Seed from the clock rather than 0 so a counter that was evicted
+            # never comes back at a value an old page was stored under.
+            cache.add(key, time.time_ns(), timeout=None)
+            generations[key] = cache.get(key)
+    return [generations[key] for key in keys]
+
+
+def invalidate(*groups):
+    for group in set(groups):
+        key = _generation_key(group)
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.add(key, time.time_ns(), timeout=None)
+
+
+def page_cache_key(request, groups):
+    generations = ",".join(str(gen) for gen in get_generations(groups))
+    raw = f"{request.get_full_path()}|{generations}"
+    return f"{KEY_PREFIX}:{hashlib.md5(raw.encode()).hexdigest()}"
+
+
+def record(outcome):
+    with _stats_lock:
+        _stats[outcome] += 1
+
+
+def get_stats():
+    """Process-local hit/miss counters since start-up (or the last reset)."""
+    with _stats_lock:
+        return dict(_stats)
+
+
+def reset_stats():
+    with _stats_lock:
+        for key in _stats:
+            _stats[key] = 0
+
+
+class CachedPageMixin:
+    """Serve fully rendered GET responses to anonymous users from the cache.
+
+    Views list the invalidation groups their page depends on in
+    get_cache_groups(). Logged-in users always get a fresh render because
+    the pages show per-user links and forms.
+    """
+
+    def get_cache_groups(self):
+        return []
+
+    def dispatch(self, request, *args, **kwargs):
+        if request.method not in ("GET", "HEAD") or request.user.is_authenticated:
+            return super().dispatch(request, *args, **kwargs)
+
+        key = page_cache_key(request, self.get_cache_groups())
+        cached = cache.get(key)
+        if cached is not None:
+            record("hits")
+            content, content_type = cached
+            response = HttpResponse(content, content_type=content_type)
+            response["X-Cache"] = "HIT"
+            return response
+
+        record("misses")
+        response = super().dispatch(request, *args, **kwargs)
+        response["X-Cache"] = "MISS"
+        if response.status_code == 200 and not response.cookies:
+            timeout = getattr(settings, "BLOG_PAGE_CACHE_TIMEOUT", DEFAULT_TIMEOUT)
+
+            def store(rendered):
+                cache.set(key, (rendered.content, rendered["Content-Type"]), timeout)
+
+            if hasattr(response, "add_post_render_callback"):
+                response.add_post_render_callback(store)
+            else:
+                store(response)
+        return response
@@ -0,0 +1,9 @@
+from django.utils.functional import SimpleLazyObject
+
+from .tagstats import tag_cloud as build_tag_cloud
+
+
+def tag_cloud(request):
+    """Expose the popular-tags cloud as `tag_cloud`; only queried when a
+    template actually renders it."""
+    return {"tag_cloud": SimpleLazyObject(build_tag_cloud)}
@@ -9,7 +9,9 @@ class PostForm(forms.ModelForm):
 
     class Meta:
         model = Post
-        fields = ["title", "content", "tags"]
+        # "tags" is the declared free-text field above; the view resolves it
+        # with blog.tagging.set_post_tags instead of ModelForm's M2M save.
+        fields = ["title", "content"]
 
 
 class CommentForm(forms.ModelForm):
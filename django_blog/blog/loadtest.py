@@ -0,0 +1,34 @@
+"""
+ASGI entry point used by `manage.py loadtest`.
+
+Wraps the project's ASGI application with two changes that make runs
+comparable: the page cache is replaced by a dummy backend so every request
+reaches the database, and when BLOG_LOADTEST_QUERY_DELAY is set (seconds)
+every SQL query sleeps that long first to simulate a slow database.
+Never serve real traffic from this module.
+"""
+import os
+import time
+
+from django.conf import settings
+from django.db.backends.signals import connection_created
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "django_blog.settings")
+settings.CACHES = {"default": {"BACKEND": "django.core.cache.backends.dummy.DummyCache"}}
+
+from django_blog.asgi import application  # noqa: E402,F401
+
+QUERY_DELAY = float(os.environ.get("BLOG_LOADTEST_QUERY_DELAY", "0"))
+
+
+def slow_query(execute, sql, params, many, context):
+    time.sleep(QUERY_DELAY)
+    return execute(sql, params, many, context)
+
+
+def add_query_delay(sender, connection, **kwargs):
+    connection.execute_wrappers.append(slow_query)
+
+
+if QUERY_DELAY:
+    connection_created.connect(add_query_delay)
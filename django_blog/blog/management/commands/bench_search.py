@@ -0,0 +1,78 @@
+import random
+import time
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from blog.models import Post, Tag
+from blog.search import IcontainsSearchEngine, InvertedIndexSearchEngine
+
+TAG_WORDS = (
+    "django python query index cache search token cursor signal model view "
+    "template async worker latency shard replica vacuum planner buffer join"
+).split()
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare the icontains search scan with the inverted index on a "
+        "generated data set. Everything runs in a transaction that is rolled back."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--posts", type=int, default=20000)
+        parser.add_argument("--queries", type=int, default=50)
+        parser.add_argument("--vocabulary", type=int, default=5000)
+        parser.add_argument("--seed", type=int, default=0)
+
+    def handle(self, *args, **options):
+        rng = random.Random(options["seed"])
+        words = [f"word{i}" for i in range(options["vocabulary"])]
+        queries = [rng.choice(words) for _ in range(options["queries"])]
+
+        with transaction.atomic():
+            self.populate(rng, words, options["posts"])
+            for engine in (IcontainsSearchEngine(), InvertedIndexSearchEngine()):
+                self.run(engine, queries)
+            transaction.set_rollback(True)
+
+    def populate(self, rng, words, count):
+        author = User.objects.create_user(username="bench-search-author")
+        tags = Tag.objects.bulk_create([Tag(name=f"bench-{word}") for word in TAG_WORDS])
+        posts = Post.objects.bulk_create(
+            [
+                Post(
+                    title=" ".join(rng.choices(words, k=4)),
+                    content=" ".join(rng.choices(words, k=40)),
+                    author=author,
+                )
+                for _ in range(count)
+            ],
+            batch_size=1000,
+        )
+        through = Post.tags.through
+        through.objects.bulk_create(
+            [
+                through(post_id=post.pk, tag_id=tag.pk)
+                for post in posts
+                for tag in rng.sample(tags, 2)
+            ],
+            batch_size=1000,
+        )
+        started = time.perf_counter()
+        engine = InvertedIndexSearchEngine()
+        for start in range(0, len(posts), 1000):
+            engine.index_posts(posts[start:start + 1000])
+        self.stdout.write(
+            f"Indexed {count} posts in {time.perf_counter() - started:.2f}s"
+        )
+
+    def run(self, engine, queries):
+        started = time.perf_counter()
+        for query in queries:
+            list(engine.search(query)[:20].values_list("pk", flat=True))
+        elapsed = time.perf_counter() - started
+        self.stdout.write(
+            f"{type(engine).__name__:<28} {elapsed / len(queries) * 1000:8.2f} ms/query"
+        )
@@ -0,0 +1,40 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count, Max
+
+from blog.models import Comment, Post
+
+
+class Command(BaseCommand):
+    help = "Recompute Post.comment_count and Post.last_comment_at from the comments table."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=1000)
+
+    def handle(self, *args, **options):
+        batch_size = options["batch_size"]
+        total = 0
+        last_pk = 0
+        while True:
+            posts = list(
+                Post.objects.filter(pk__gt=last_pk)
+                .order_by("pk")
+                .only("pk", "comment_count", "last_comment_at")[:batch_size]
+            )
+            if not posts:
+                break
+            stats = {
+                row["post"]: row
+                for row in Comment.objects.filter(post__in=posts)
+                .values("post")
+                .annotate(count=Count("pk"), latest=Max("created_at"))
+            }
+            for post in posts:
+                row = stats.get(post.pk, {})
+                post.comment_count = row.get("count", 0)
+                post.last_comment_at = row.get("latest")
+            with transaction.atomic():
+                Post.objects.bulk_update(posts, ["comment_count", "last_comment_at"])
+            total += len(posts)
+            last_pk = posts[-1].pk
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt activity for {total} posts."))
@@ -0,0 +1,25 @@
+from django.core.management.base import BaseCommand
+
+from blog.models import Post
+from blog.search import get_search_engine
+
+
+class Command(BaseCommand):
+    help = "Rebuild the search index for every blog post."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=500)
+
+    def handle(self, *args, **options):
+        engine = get_search_engine()
+        batch_size = options["batch_size"]
+        total = 0
+        last_pk = 0
+        while True:
+            batch = list(Post.objects.filter(pk__gt=last_pk).order_by("pk")[:batch_size])
+            if not batch:
+                break
+            engine.index_posts(batch)
+            total += len(batch)
+            last_pk = batch[-1].pk
+        self.stdout.write(self.style.SUCCESS(f"Indexed {total} posts."))
@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from blog.tagstats import rebuild_all
+
+
+class Command(BaseCommand):
+    help = "Recompute the TagStats popularity table from the post/tag links."
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            count = rebuild_all()
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt stats for {count} tags."))
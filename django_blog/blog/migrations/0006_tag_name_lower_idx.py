@@ -0,0 +1,18 @@
+# Generated by Django 5.2 on 2026-10-18 20:21
+
+import django.db.models.functions.text
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0005_post_published_idx'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='tag',
+            index=models.Index(django.db.models.functions.text.Lower('name'), name='blog_tag_name_lower_idx'),
+        ),
+    ]
@@ -0,0 +1,26 @@
+# Generated by Django 5.2 on 2026-10-18 20:26
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0007_post_activity'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TagStats',
+            fields=[
+                ('tag', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='stats', serialize=False, to='blog.tag')),
+                ('post_count', models.PositiveIntegerField(default=0)),
+                ('score', models.FloatField(default=0)),
+                ('last_used_at', models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['-post_count'], name='blog_tagstats_count_idx'), models.Index(fields=['-score'], name='blog_tagstats_score_idx')],
+            },
+        ),
+    ]
@@ -1,10 +1,18 @@
 from django.db import models
 from django.contrib.auth.models import User
+from django.db.models.functions import Lower
+from django.urls import reverse
 
 
 class Tag(models.Model):
     name = models.CharField(max_length=50, unique=True)
 
+    class Meta:
+        indexes = [
+            # Case-insensitive lookups in blog/tagging.py.
+            models.Index(Lower("name"), name="blog_tag_name_lower_idx"),
+        ]
+
     def __str__(self):
         return self.name
 
@@ -16,9 +24,24 @@ class Post(models.Model):
     author = models.ForeignKey(User, on_delete=models.CASCADE, related_name="posts")
     tags = models.ManyToManyField(Tag, related_name="posts", blank=True)
 
+    # Denormalized from Comment; kept current by blog/activity.py and
+    # rebuilt with `manage.py rebuild_post_activity`.
+    comment_count = models.PositiveIntegerField(default=0)
+    last_comment_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            # Support the keyset pagination orders in blog/pagination.py.
+            models.Index(fields=["-published_date", "-id"], name="blog_post_published_idx"),
+            models.Index(fields=["-comment_count", "-id"], name="blog_post_activity_idx"),
+        ]
+
     def __str__(self):
         return self.title
 
+    def get_absolute_url(self):
+        return reverse("post-detail", kwargs={"pk": self.pk})
+
 class Comment(models.Model):
     post = models.ForeignKey(Post, on_delete=models.CASCADE, related_name="comments")
     author = models.ForeignKey(User, on_delete=models.CASCADE, related_name="comments")
@@ -28,3 +51,41 @@ class Comment(models.Model):
 
     def __str__(self):
         return f"Comment by {self.author} on {self.post}"
+
+
+class SearchTerm(models.Model):
+    """One row of the post search index: a normalized token and how strongly it
+    describes the post (title and tag hits outrank body hits)."""
+    term = models.CharField(max_length=64)
+    post = models.ForeignKey(Post, on_delete=models.CASCADE, related_name="search_terms")
+    weight = models.PositiveIntegerField(default=1)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["term", "post"], name="blog_searchterm_term_post_uniq"),
+        ]
+
+    def __str__(self):
+        return f"{self.term} -> {self.post_id} ({self.weight})"
+
+
+class TagStats(models.Model):
+    """Materialized popularity of a Tag, kept current by blog/tagstats.py.
+
+    `score` is a recency-weighted usage count stored in growing units (see
+    blog.tagstats.usage_weight) so it can be ordered on directly without ever
+    decaying old rows.
+    """
+    tag = models.OneToOneField(Tag, on_delete=models.CASCADE, primary_key=True, related_name="stats")
+    post_count = models.PositiveIntegerField(default=0)
+    score = models.FloatField(default=0)
+    last_used_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["-post_count"], name="blog_tagstats_count_idx"),
+            models.Index(fields=["-score"], name="blog_tagstats_score_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.tag_id}: {self.post_count} posts"
@@ -0,0 +1,138 @@
+"""
+Keyset ("cursor") pagination for post listings.
+
+Pages are ordered descending on a keyset of model fields ending in the
+primary key, e.g. (published_date, id) for newest first. Instead of an
+OFFSET, each page link carries an opaque cursor holding the key of the last
+(or first) post shown, so the next query is a range read on the matching
+index (blog_post_published_idx, blog_post_activity_idx) and costs the same at
+any depth.
+"""
+import base64
+import json
+
+from django.db.models import Q
+from django.http import Http404
+
+NEXT = "n"
+PREVIOUS = "p"
+
+
+def _field(model, name):
+    return model._meta.pk if name == "pk" else model._meta.get_field(name)
+
+
+def encode_cursor(direction, obj, keyset):
+    values = [_field(type(obj), name).value_to_string(obj) for name in keyset]
+    raw = json.dumps([direction, values], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(token, model, keyset):
+    """Return (direction, key values); raise ValueError if malformed."""
+    # Decoding and parsing errors are all ValueError subclasses.
+    raw = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4)).decode()
+    direction, values = json.loads(raw)
+    if direction not in (NEXT, PREVIOUS) or len(values) != len(keyset):
+        raise ValueError(f"Invalid cursor {token!r}")
+    try:
+        key = [_field(model, name).to_python(value) for name, value in zip(keyset, values)]
+    except Exception as exc:
+        # to_python() raises django.core.exceptions.ValidationError.
+        raise ValueError(f"Invalid cursor {token!r}") from exc
+    return direction, key
+
+
+def keyset_filter(keyset, key, lookup):
+    """Rows strictly after `key` in keyset order, e.g. for (a, b) and "lt":
+    a < x OR (a = x AND b < y)."""
+    condition = Q()
+    equal = {}
+    for name, value in zip(keyset, key):
+        condition |= Q(**equal, **{f"{name}__{lookup}": value})
+        equal[name] = value
+    return condition
+
+
+class CursorPage:
+    """The subset of Django's Page API that the post list templates use."""
+
+    def __init__(self, object_list, next_cursor=None, previous_cursor=None):
+        self.object_list = object_list
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+
+    def has_next(self):
+        return self.next_cursor is not None
+
+    def has_previous(self):
+        return self.previous_cursor is not None
+
+    def has_other_pages(self):
+        return self.has_next() or self.has_previous()
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+
+class KeysetPaginationMixin:
+    """Replaces ListView's page-number pagination with cursor pagination.
+
+    Exposes `page_obj` (a CursorPage) and `is_paginated` to the template just
+    like the stock pagination; `paginator` is None because there is no total.
+    """
+
+    paginate_by = 10
+    cursor_kwarg = "cursor"
+    keyset = ("published_date", "pk")
+
+    def get_keyset(self):
+        return self.keyset
+
+    def paginate_queryset(self, queryset, page_size):
+        window, state = self.get_page_window(queryset, page_size)
+        return self.make_page(list(window), state)
+
+    def get_page_window(self, queryset, page_size):
+        """Return the sliced queryset for the requested page (not yet
+        evaluated, so async views can iterate it with `async for`) and the
+        state make_page() needs."""
+        keyset = self.get_keyset()
+        token = self.request.GET.get(self.cursor_kwarg)
+        if not token:
+            direction, key = NEXT, None
+        else:
+            try:
+                direction, key = decode_cursor(token, queryset.model, keyset)
+            except (TypeError, ValueError):
+                raise Http404("Invalid cursor.")
+
+        if direction == NEXT:
+            queryset = queryset.order_by(*[f"-{name}" for name in keyset])
+            if key:
+                queryset = queryset.filter(keyset_filter(keyset, key, "lt"))
+        else:
+            queryset = queryset.order_by(*keyset).filter(keyset_filter(keyset, key, "gt"))
+        return queryset[:page_size + 1], (keyset, direction, key, page_size)
+
+    def make_page(self, rows, state):
+        """Build ListView's (paginator, page, object_list, is_paginated)
+        from the rows fetched for get_page_window()."""
+        keyset, direction, key, page_size = state
+        has_more = len(rows) > page_size
+        rows = rows[:page_size]
+        if direction == PREVIOUS:
+            rows.reverse()
+
+        next_cursor = previous_cursor = None
+        if rows:
+            if has_more or direction == PREVIOUS:
+                next_cursor = encode_cursor(NEXT, rows[-1], keyset)
+            if key and (has_more or direction == NEXT):
+                previous_cursor = encode_cursor(PREVIOUS, rows[0], keyset)
+
+        page = CursorPage(rows, next_cursor, previous_cursor)
+        return (None, page, rows, page.has_other_pages())
@@ -0,0 +1,123 @@
+"""
+Search backends for blog posts.
+
+The engine used by SearchResultsView is chosen with the BLOG_SEARCH_ENGINE
+setting (a dotted path). Every engine exposes the same three hooks:
+
+- search(query)        -> ranked Post queryset
+- index_posts(posts)   -> (re)build the index rows for the given posts
+- remove_post(post_id) -> drop a post from the index
+
+The signal handlers in blog/signals.py call the index hooks whenever a Post,
+its tags, or a Tag changes, so the index never needs a manual refresh after
+the initial `manage.py rebuild_search_index`.
+"""
+import re
+from collections import Counter
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, Q, Sum
+from django.utils.module_loading import import_string
+
+from .models import Post, SearchTerm
+
+DEFAULT_SEARCH_ENGINE = "blog.search.InvertedIndexSearchEngine"
+
+TITLE_WEIGHT = 3
+TAG_WEIGHT = 2
+CONTENT_WEIGHT = 1
+
+TOKEN_RE = re.compile(r"\w+")
+MAX_TERM_LENGTH = SearchTerm._meta.get_field("term").max_length
+
+
+def tokenize(text):
+    """Split text into lower-cased word tokens that fit in SearchTerm.term."""
+    return [token[:MAX_TERM_LENGTH] for token in TOKEN_RE.findall((text or "").lower())]
+
+
+class BaseSearchEngine:
+    def search(self, query):
+        raise NotImplementedError
+
+    def index_posts(self, posts):
+        pass
+
+    def remove_post(self, post_id):
+        pass
+
+
+class IcontainsSearchEngine(BaseSearchEngine):
+    """The original substring scan over title, content and tag names.
+
+    Needs no index, but reads every post (and the tag join) on each search.
+    """
+
+    def search(self, query):
+        return Post.objects.filter(
+            Q(title__icontains=query) |
+            Q(content__icontains=query) |
+            Q(tags__name__icontains=query)
+        ).distinct()
+
+
+class InvertedIndexSearchEngine(BaseSearchEngine):
+    """Token index stored in the SearchTerm table.
+
+    A post matches when it contains every term of the query; results are
+    ordered by the summed term weights, newest first on ties.
+    """
+
+    batch_size = 1000
+
+    def search(self, query):
+        terms = set(tokenize(query))
+        if not terms:
+            return Post.objects.none()
+        return (
+            Post.objects.filter(search_terms__term__in=terms)
+            .annotate(
+                search_rank=Sum("search_terms__weight"),
+                matched_terms=Count("search_terms"),
+            )
+            .filter(matched_terms=len(terms))
+            .order_by("-search_rank", "-published_date", "-pk")
+        )
+
+    def build_terms(self, post, tag_names):
+        weights = Counter()
+        for term in tokenize(post.title):
+            weights[term] += TITLE_WEIGHT
+        for name in tag_names:
+            for term in tokenize(name):
+                weights[term] += TAG_WEIGHT
+        for term in tokenize(post.content):
+            weights[term] += CONTENT_WEIGHT
+        return [SearchTerm(post=post, term=term, weight=weight) for term, weight in weights.items()]
+
+    def index_posts(self, posts):
+        posts = list(posts)
+        if not posts:
+            return
+        tag_names = {post.pk: [] for post in posts}
+        through = Post.tags.through
+        rows = through.objects.filter(post_id__in=tag_names).values_list("post_id", "tag__name")
+        for post_id, name in rows:
+            tag_names[post_id].append(name)
+
+        rows = []
+        for post in posts:
+            rows.extend(self.build_terms(post, tag_names[post.pk]))
+        with transaction.atomic():
+            SearchTerm.objects.filter(post_id__in=tag_names).delete()
+            SearchTerm.objects.bulk_create(rows, batch_size=self.batch_size)
+
+    def remove_post(self, post_id):
+        SearchTerm.objects.filter(post_id=post_id).delete()
+
+
+def get_search_engine():
+    """Return an instance of the engine configured in BLOG_SEARCH_ENGINE."""
+    path = getattr(settings, "BLOG_SEARCH_ENGINE", DEFAULT_SEARCH_ENGINE)
+    return import_string(path)()
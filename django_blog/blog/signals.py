@@ -0,0 +1,129 @@
+"""
+Keeps data derived from posts, comments and tags in sync:
+
+- the search index (blog/search.py)
+- the anonymous page cache (blog/cache.py)
+- tag popularity (blog/tagstats.py)
+"""
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete, pre_save
+from django.dispatch import receiver
+
+from .cache import POSTS_GROUP, TAGS_GROUP, invalidate, post_group, tag_group
+from .models import Comment, Post, Tag
+from .search import get_search_engine
+from .tagstats import tags_added, tags_removed
+
+
+def tag_names(tag_ids):
+    return list(Tag.objects.filter(pk__in=tag_ids).values_list("name", flat=True))
+
+
+def post_tags_changed(post_ids, tag_ids):
+    """Refresh everything that depends on which tags the given posts carry."""
+    get_search_engine().index_posts(Post.objects.filter(pk__in=post_ids))
+    invalidate(
+        TAGS_GROUP,
+        *[post_group(pk) for pk in post_ids],
+        *[tag_group(name) for name in tag_names(tag_ids)],
+    )
+
+
+# ---------- Posts ----------
+
+@receiver(post_save, sender=Post)
+def post_saved(sender, instance, **kwargs):
+    get_search_engine().index_posts([instance])
+    names = instance.tags.values_list("name", flat=True)
+    invalidate(POSTS_GROUP, post_group(instance.pk), *[tag_group(name) for name in names])
+
+
+@receiver(pre_delete, sender=Post)
+def remember_post_tags(sender, instance, **kwargs):
+    # The tag links are gone by the time post_delete fires.
+    instance._tags = list(instance.tags.values_list("pk", "name"))
+
+
+@receiver(post_delete, sender=Post)
+def post_deleted(sender, instance, **kwargs):
+    get_search_engine().remove_post(instance.pk)
+    tags = getattr(instance, "_tags", [])
+    tags_removed([pk for pk, name in tags])
+    invalidate(
+        POSTS_GROUP,
+        post_group(instance.pk),
+        *([TAGS_GROUP] if tags else []),
+        *[tag_group(name) for pk, name in tags],
+    )
+
+
+@receiver(m2m_changed, sender=Post.tags.through)
+def post_tag_links_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    # reverse is True for tag.posts.add()/remove()/clear(); pk_set then holds
+    # post ids instead of tag ids.
+    if action in ("pre_clear", "pre_remove"):
+        # clear() does not report which links it removes, and remove() reports
+        # every id it was given, linked or not; capture the real links first.
+        related = instance.posts if reverse else instance.tags
+        if action == "pre_remove":
+            related = related.filter(pk__in=pk_set)
+        instance._removed_pks = set(related.values_list("pk", flat=True))
+        return
+    if action in ("post_clear", "post_remove"):
+        pk_set = getattr(instance, "_removed_pks", set())
+    elif action != "post_add":
+        return
+    if not pk_set:
+        return
+
+    update_stats = tags_added if action == "post_add" else tags_removed
+    if reverse:
+        update_stats([instance.pk], links_per_tag=len(pk_set))
+    else:
+        update_stats(pk_set)
+
+    if reverse:
+        post_tags_changed(pk_set, {instance.pk})
+    else:
+        post_tags_changed({instance.pk}, pk_set)
+
+
+# ---------- Tags ----------
+
+@receiver(pre_save, sender=Tag)
+def remember_tag_name(sender, instance, **kwargs):
+    if instance.pk:
+        instance._old_name = (
+            Tag.objects.filter(pk=instance.pk).values_list("name", flat=True).first()
+        )
+
+
+@receiver(post_save, sender=Tag)
+def tag_saved(sender, instance, created, **kwargs):
+    if created:
+        return
+    post_ids = set(instance.posts.values_list("pk", flat=True))
+    post_tags_changed(post_ids, {instance.pk})
+    old_name = getattr(instance, "_old_name", None)
+    if old_name:
+        invalidate(tag_group(old_name))
+
+
+@receiver(pre_delete, sender=Tag)
+def remember_tagged_posts(sender, instance, **kwargs):
+    instance._tagged_post_ids = set(instance.posts.values_list("pk", flat=True))
+
+
+@receiver(post_delete, sender=Tag)
+def tag_deleted(sender, instance, **kwargs):
+    post_ids = getattr(instance, "_tagged_post_ids", set())
+    get_search_engine().index_posts(Post.objects.filter(pk__in=post_ids))
+    invalidate(TAGS_GROUP, tag_group(instance.name), *[post_group(pk) for pk in post_ids])
+
+
+# ---------- Comments ----------
+
+@receiver(post_save, sender=Comment)
+@receiver(post_delete, sender=Comment)
+def comment_changed(sender, instance, **kwargs):
+    # The post list shows comment counts and can be sorted by them.
+    invalidate(POSTS_GROUP, post_group(instance.post_id))
@@ -0,0 +1,66 @@
+"""
+Tag resolution shared by the post create and update views.
+
+Tags arrive as one comma-separated string. Names are normalized (whitespace
+collapsed, lower-cased) so "Django", " django " and "DJANGO" all map to the
+same Tag, and a whole list is resolved in a fixed number of queries no matter
+how many tags the post has.
+"""
+from django.db.models.functions import Lower
+
+from .models import Tag
+
+MAX_TAG_LENGTH = Tag._meta.get_field("name").max_length
+
+
+def normalize_tag_name(name):
+    return " ".join(name.split()).lower()[:MAX_TAG_LENGTH].strip()
+
+
+def parse_tag_names(tags_str):
+    """Split a comma-separated string into unique, normalized tag names."""
+    names = []
+    for raw in (tags_str or "").split(","):
+        name = normalize_tag_name(raw)
+        if name and name not in names:
+            names.append(name)
+    return names
+
+
+def tags_named(name):
+    """Tags matching name once both are normalized.
+
+    Tags saved before normalization may still be stored in mixed case, so the
+    match goes through Lower("name") (indexed by blog_tag_name_lower_idx).
+    """
+    return Tag.objects.annotate(lower_name=Lower("name")).filter(lower_name=normalize_tag_name(name))
+
+
+def resolve_tags(names):
+    """Return a Tag for each normalized name, creating the missing ones.
+
+    One query finds existing tags (matched case-insensitively, so tags saved
+    before normalization are reused), one bulk insert adds the rest and one
+    query reads back their ids.
+    """
+    if not names:
+        return []
+    found = {
+        tag.lower_name: tag
+        for tag in Tag.objects.annotate(lower_name=Lower("name")).filter(lower_name__in=names)
+    }
+    missing = [name for name in names if name not in found]
+    if missing:
+        # ignore_conflicts covers a concurrent request creating the same tag.
+        Tag.objects.bulk_create([Tag(name=name) for name in missing], ignore_conflicts=True)
+        found.update((tag.name, tag) for tag in Tag.objects.filter(name__in=missing))
+    return [found[name] for name in names]
+
+
+def set_post_tags(post, tags_str):
+    """Point post.tags at the tags named in tags_str.
+
+    RelatedManager.set() diffs against the current links, so tags that stay
+    on the post are neither deleted nor re-inserted.
+    """
+    post.tags.set(resolve_tags(parse_tag_names(tags_str)))
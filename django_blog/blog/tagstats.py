@@ -0,0 +1,108 @@
+"""
+Incremental maintenance of TagStats and the tag cloud built from it.
+
+Every tag link added adds usage_weight(now) to the tag's score. The weight
+doubles every SCORE_HALF_LIFE, which is equivalent to halving all older
+contributions, so ordering by the stored score ranks tags by recent usage
+with no periodic decay job. Weights are measured from SCORE_EPOCH and stay
+well inside float range for over a decade; move the epoch forward and run
+`manage.py rebuild_tag_stats` long before then.
+"""
+from datetime import datetime, timedelta, timezone
+
+from django.db.models import Case, F, Value, When
+from django.db.models.functions import Greatest
+from django.utils import timezone as django_timezone
+
+from .models import Post, TagStats
+
+SCORE_EPOCH = datetime(2026, 1, 1, tzinfo=timezone.utc)
+SCORE_HALF_LIFE = timedelta(days=7)
+
+CLOUD_SIZE = 30
+CLOUD_LEVELS = 5
+CLOUD_ORDERS = {
+    "popular": "-post_count",
+    "recent": "-score",
+}
+
+
+def usage_weight(when):
+    return 2 ** ((when - SCORE_EPOCH) / SCORE_HALF_LIFE)
+
+
+def tags_added(tag_ids, links_per_tag=1):
+    if not tag_ids:
+        return
+    now = django_timezone.now()
+    # Tags created through bulk_create (blog.tagging) have no stats row yet.
+    TagStats.objects.bulk_create(
+        [TagStats(tag_id=pk) for pk in tag_ids], ignore_conflicts=True
+    )
+    TagStats.objects.filter(tag_id__in=tag_ids).update(
+        post_count=F("post_count") + links_per_tag,
+        score=F("score") + usage_weight(now) * links_per_tag,
+        last_used_at=now,
+    )
+
+
+def tags_removed(tag_ids, links_per_tag=1):
+    """Take links away from the tags' counts and scores.
+
+    When each link was added is not stored, so every removed link takes the
+    tag's average contribution (score / post_count) off the score. The score
+    reaches 0 together with the count.
+    """
+    if not tag_ids:
+        return
+    TagStats.objects.filter(tag_id__in=tag_ids).update(
+        post_count=Greatest(F("post_count") - links_per_tag, Value(0)),
+        score=Case(
+            When(
+                post_count__gt=links_per_tag,
+                then=F("score") * (F("post_count") - links_per_tag) / F("post_count"),
+            ),
+            default=Value(0.0),
+        ),
+    )
+
+
+def rebuild_all():
+    """Recompute every TagStats row from the Post.tags links, scoring each
+    link by its post's publication date."""
+    stats = {}
+    links = Post.tags.through.objects.values_list("tag_id", "post__published_date")
+    for tag_id, published in links.iterator(chunk_size=2000):
+        row = stats.setdefault(tag_id, TagStats(tag_id=tag_id))
+        row.post_count += 1
+        row.score += usage_weight(published)
+        if row.last_used_at is None or published > row.last_used_at:
+            row.last_used_at = published
+    TagStats.objects.all().delete()
+    TagStats.objects.bulk_create(stats.values(), batch_size=1000)
+    return len(stats)
+
+
+def tag_cloud_queryset(order="popular", limit=CLOUD_SIZE):
+    return (
+        TagStats.objects.select_related("tag")
+        .filter(post_count__gt=0)
+        .order_by(CLOUD_ORDERS.get(order, CLOUD_ORDERS["popular"]))[:limit]
+    )
+
+
+def assign_cloud_levels(rows):
+    """Give each TagStats row a `level` from 1 to CLOUD_LEVELS scaled by post
+    count and return the rows in alphabetical order."""
+    if not rows:
+        return rows
+    low = min(row.post_count for row in rows)
+    spread = max(row.post_count for row in rows) - low
+    for row in rows:
+        row.level = 1 + round((row.post_count - low) * (CLOUD_LEVELS - 1) / spread) if spread else 1
+    return sorted(rows, key=lambda row: row.tag.name)
+
+
+def tag_cloud(order="popular", limit=CLOUD_SIZE):
+    """The top tags as leveled TagStats rows, see assign_cloud_levels()."""
+    return assign_cloud_levels(list(tag_cloud_queryset(order, limit)))
@@ -1,3 +1,419 @@
-from django.test import TestCase
+import re
+from io import StringIO
 
-# Create your tests here.
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from . import cache as page_cache
+from .models import Comment, Post, SearchTerm, Tag, TagStats
+from .search import get_search_engine
+from .tagging import parse_tag_names, set_post_tags
+
+
+class BlogTestCase(TestCase):
+    def setUp(self):
+        # Cached pages would otherwise leak between tests that reuse ids.
+        cache.clear()
+
+
+class SearchIndexTests(BlogTestCase):
+    def setUp(self):
+        super().setUp()
+        self.user = User.objects.create_user(username="writer", password="pass12345")
+        self.post = Post.objects.create(
+            title="Caching in Django",
+            content="Notes about the low level cache API.",
+            author=self.user,
+        )
+
+    def search(self, query):
+        return list(get_search_engine().search(query))
+
+    def test_post_is_indexed_on_save(self):
+        self.assertEqual(self.search("caching"), [self.post])
+        self.post.title = "Sharding in Django"
+        self.post.save()
+        self.assertEqual(self.search("caching"), [])
+        self.assertEqual(self.search("sharding"), [self.post])
+
+    def test_tag_changes_update_index(self):
+        tag = Tag.objects.create(name="performance")
+        self.post.tags.add(tag)
+        self.assertEqual(self.search("performance"), [self.post])
+
+        tag.name = "speed"
+        tag.save()
+        self.assertEqual(self.search("performance"), [])
+        self.assertEqual(self.search("speed"), [self.post])
+
+        tag.posts.clear()
+        self.assertEqual(self.search("speed"), [])
+
+        self.post.tags.add(tag)
+        tag.delete()
+        self.assertEqual(self.search("speed"), [])
+
+    def test_deleted_post_leaves_no_terms(self):
+        self.post.delete()
+        self.assertFalse(SearchTerm.objects.exists())
+
+    def test_all_terms_must_match_and_title_outranks_content(self):
+        body_hit = Post.objects.create(
+            title="Something else", content="caching django tips", author=self.user
+        )
+        Post.objects.create(title="Unrelated", content="caching only", author=self.user)
+        self.assertEqual(self.search("Django caching"), [self.post, body_hit])
+
+    @override_settings(BLOG_SEARCH_ENGINE="blog.search.IcontainsSearchEngine")
+    def test_icontains_engine_matches_substrings(self):
+        self.assertEqual(self.search("cach"), [self.post])
+
+    def test_search_view_uses_engine(self):
+        response = self.client.get(reverse("search"), {"q": "cache"})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(list(response.context["posts"]), [self.post])
+
+    def explain(self, sql):
+        with connection.cursor() as cursor:
+            if connection.vendor == "postgresql":
+                # The planner prefers sequential scans on tables this small.
+                cursor.execute("SET LOCAL enable_seqscan = off")
+                cursor.execute("EXPLAIN " + sql)
+            else:
+                cursor.execute("EXPLAIN QUERY PLAN " + sql)
+            return "\n".join(str(row[-1]) for row in cursor.fetchall())
+
+    def test_search_view_looks_terms_up_by_index(self):
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(reverse("search"), {"q": "django cache"})
+        term_queries = [q["sql"] for q in queries if '"blog_searchterm"' in q["sql"]]
+        self.assertTrue(term_queries)
+        for sql in term_queries:
+            plan = self.explain(sql)
+            self.assertNotRegex(plan, r"\bSCAN blog_searchterm\b(?! USING)|Seq Scan on blog_searchterm\b")
+
+
+class KeysetPaginationTests(BlogTestCase):
+    def setUp(self):
+        super().setUp()
+        self.user = User.objects.create_user(username="writer", password="pass12345")
+        self.tag = Tag.objects.create(name="news")
+        self.posts = []
+        for i in range(25):
+            post = Post.objects.create(title=f"Post {i}", content="...", author=self.user)
+            post.tags.add(self.tag)
+            self.posts.append(post)
+        # Newest first, with ties on published_date broken by id.
+        self.expected = sorted(self.posts, key=lambda p: (p.published_date, p.pk), reverse=True)
+
+    def walk(self, url):
+        seen, cursor, pages = [], None, []
+        while True:
+            response = self.client.get(url, {"cursor": cursor} if cursor else {})
+            self.assertEqual(response.status_code, 200)
+            page = response.context["page_obj"]
+            pages.append(page)
+            seen.extend(response.context["posts"])
+            if not page.has_next():
+                return seen, pages
+            cursor = page.next_cursor
+
+    def test_forward_walk_returns_every_post_once(self):
+        for url in (reverse("post-list"), reverse("tag-posts", args=["news"])):
+            seen, pages = self.walk(url)
+            self.assertEqual(seen, self.expected)
+            self.assertEqual([len(page) for page in pages], [10, 10, 5])
+            self.assertFalse(pages[0].has_previous())
+
+    def test_previous_cursor_returns_preceding_page(self):
+        url = reverse("post-list")
+        first = self.client.get(url).context["page_obj"]
+        second = self.client.get(url, {"cursor": first.next_cursor}).context["page_obj"]
+        back = self.client.get(url, {"cursor": second.previous_cursor}).context["page_obj"]
+        self.assertEqual(list(back), list(first))
+        self.assertFalse(back.has_previous())
+        self.assertTrue(back.has_next())
+
+    def test_invalid_cursor_is_404(self):
+        response = self.client.get(reverse("post-list"), {"cursor": "not-a-cursor"})
+        self.assertEqual(response.status_code, 404)
+
+
+class PostDetailQueryTests(BlogTestCase):
+    def setUp(self):
+        super().setUp()
+        self.author = User.objects.create_user(username="writer", password="pass12345")
+        self.post = Post.objects.create(title="Hello", content="World", author=self.author)
+        self.post.tags.add(Tag.objects.create(name="a"), Tag.objects.create(name="b"))
+
+    def add_comments(self, count):
+        for i in range(count):
+            commenter = User.objects.create_user(username=f"reader{Comment.objects.count()}")
+            Comment.objects.create(post=self.post, author=commenter, content=f"Comment {i}")
+
+    def count_queries(self):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(reverse("post-detail", args=[self.post.pk]))
+        self.assertEqual(response.status_code, 200)
+        return len(ctx.captured_queries)
+
+    def test_query_count_does_not_grow_with_comments(self):
+        self.add_comments(2)
+        baseline = self.count_queries()
+        self.add_comments(15)
+        self.assertEqual(self.count_queries(), baseline)
+
+    def test_comments_are_paginated(self):
+        self.add_comments(25)
+        url = reverse("post-detail", args=[self.post.pk])
+        response = self.client.get(url)
+        self.assertEqual(len(response.context["comments"]), 20)
+        response = self.client.get(url, {"comments_page": 2})
+        self.assertEqual(len(response.context["comments"]), 5)
+
+
+class TagResolutionTests(BlogTestCase):
+    def setUp(self):
+        super().setUp()
+        self.user = User.objects.create_user(username="writer", password="pass12345")
+        self.post = Post.objects.create(title="Hello", content="World", author=self.user)
+
+    def test_names_are_normalized_and_deduplicated(self):
+        self.assertEqual(
+            parse_tag_names(" Django ,django,  Web   Dev,,WEB DEV "), ["django", "web dev"]
+        )
+
+    def test_existing_tags_are_reused_case_insensitively(self):
+        legacy = Tag.objects.create(name="Python")
+        set_post_tags(self.post, "python, new")
+        self.assertEqual(Tag.objects.count(), 2)
+        self.assertIn(legacy, self.post.tags.all())
+
+    def test_tag_pages_match_names_case_insensitively(self):
+        set_post_tags(self.post, "Django")
+        legacy = Post.objects.create(title="Old", content="Post", author=self.user)
+        legacy.tags.add(Tag.objects.create(name="Web Dev"))
+        for name, post in (("Django", self.post), ("DJANGO", self.post), ("web dev", legacy)):
+            for url_name in ("tag-posts", "async-tag-posts"):
+                response = self.client.get(reverse(url_name, args=[name]))
+                self.assertEqual(list(response.context["posts"]), [post])
+
+    def test_query_count_does_not_depend_on_tag_count(self):
+        Tag.objects.create(name="tag0")
+        with CaptureQueriesContext(connection) as few:
+            set_post_tags(self.post, "tag0, tag1, tag2")
+        names = ", ".join(f"tag{i}" for i in range(30))
+        with CaptureQueriesContext(connection) as many:
+            set_post_tags(self.post, names)
+        self.assertEqual(len(many.captured_queries), len(few.captured_queries))
+        self.assertEqual(self.post.tags.count(), 30)
+
+    def test_create_view_saves_tags(self):
+        self.client.login(username="writer", password="pass12345")
+        response = self.client.post(
+            reverse("post-create"), {"title": "New", "content": "Body", "tags": "A, b, a"}
+        )
+        self.assertEqual(response.status_code, 302)
+        post = Post.objects.get(title="New")
+        self.assertEqual(sorted(post.tags.values_list("name", flat=True)), ["a", "b"])
+
+
+class PageCacheTests(BlogTestCase):
+    def setUp(self):
+        super().setUp()
+        self.user = User.objects.create_user(username="writer", password="pass12345")
+        self.tag = Tag.objects.create(name="news")
+        self.post = Post.objects.create(title="Hello", content="World", author=self.user)
+        self.post.tags.add(self.tag)
+        self.urls = [
+            reverse("post-list"),
+            reverse("post-detail", args=[self.post.pk]),
+            reverse("tag-posts", args=["news"]),
+        ]
+
+    def assertCached(self, url, cached=True):
+        response = self.client.get(url)
+        self.assertEqual(response["X-Cache"], "HIT" if cached else "MISS")
+        return response
+
+    def test_second_anonymous_request_is_served_from_cache(self):
+        page_cache.reset_stats()
+        for url in self.urls:
+            self.assertCached(url, cached=False)
+            with self.assertNumQueries(0):
+                self.assertCached(url)
+        self.assertEqual(page_cache.get_stats(), {"hits": 3, "misses": 3})
+
+    def test_logged_in_users_bypass_cache(self):
+        self.client.login(username="writer", password="pass12345")
+        response = self.client.get(self.urls[0])
+        self.assertNotIn("X-Cache", response)
+
+    def test_post_edit_invalidates_list_detail_and_tag_pages(self):
+        for url in self.urls:
+            self.client.get(url)
+        self.post.title = "Changed"
+        self.post.save()
+        for url in self.urls:
+            self.assertContains(self.assertCached(url, cached=False), "Changed")
+
+    def test_comment_invalidates_its_post_and_the_list_only(self):
+        for url in self.urls:
+            self.client.get(url)
+        Comment.objects.create(post=self.post, author=self.user, content="First!")
+        self.assertContains(self.assertCached(self.urls[1], cached=False), "First!")
+        self.assertCached(self.urls[0], cached=False)
+        self.assertCached(self.urls[2])
+
+    def test_tag_changes_invalidate_tag_pages(self):
+        other = Tag.objects.create(name="other")
+        other_url = reverse("tag-posts", args=["other"])
+        self.client.get(other_url)
+        self.client.get(self.urls[2])
+
+        self.post.tags.add(other)
+        self.assertContains(self.assertCached(other_url, cached=False), "Hello")
+
+        self.tag.posts.clear()
+        self.assertNotContains(self.assertCached(self.urls[2], cached=False), "Hello")
+
+
+class PostActivityTests(BlogTestCase):
+    def setUp(self):
+        super().setUp()
+        self.user = User.objects.create_user(username="writer", password="pass12345")
+        self.post = Post.objects.create(title="Hello", content="World", author=self.user)
+        self.client.login(username="writer", password="pass12345")
+
+    def test_comment_views_maintain_counters(self):
+        self.client.post(reverse("comment-add", args=[self.post.pk]), {"content": "one"})
+        self.client.post(reverse("comment-create", args=[self.post.pk]), {"content": "two"})
+        self.post.refresh_from_db()
+        latest = Comment.objects.latest("created_at")
+        self.assertEqual(self.post.comment_count, 2)
+        self.assertEqual(self.post.last_comment_at, latest.created_at)
+
+        self.client.post(reverse("comment-delete", args=[latest.pk]))
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.comment_count, 1)
+        self.assertEqual(self.post.last_comment_at, Comment.objects.get().created_at)
+
+    def test_rebuild_command_recomputes_counters(self):
+        Comment.objects.create(post=self.post, author=self.user, content="untracked")
+        Post.objects.filter(pk=self.post.pk).update(comment_count=7)
+        call_command("rebuild_post_activity", stdout=StringIO())
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.comment_count, 1)
+        self.assertIsNotNone(self.post.last_comment_at)
+
+    def test_list_can_sort_by_activity(self):
+        quiet = Post.objects.create(title="Quiet", content="...", author=self.user)
+        Post.objects.filter(pk=self.post.pk).update(comment_count=5)
+        response = self.client.get(reverse("post-list"), {"sort": "active"})
+        self.assertEqual(list(response.context["posts"]), [self.post, quiet])
+
+
+class TagStatsTests(BlogTestCase):
+    def setUp(self):
+        super().setUp()
+        self.user = User.objects.create_user(username="writer", password="pass12345")
+        self.posts = [
+            Post.objects.create(title=f"Post {i}", content="...", author=self.user)
+            for i in range(3)
+        ]
+
+    def counts(self):
+        return dict(TagStats.objects.values_list("tag__name", "post_count"))
+
+    def test_counts_follow_tag_links(self):
+        for post in self.posts:
+            set_post_tags(post, "django")
+        set_post_tags(self.posts[0], "django, python")
+        self.assertEqual(self.counts(), {"django": 3, "python": 1})
+
+        set_post_tags(self.posts[1], "python")
+        self.posts[2].delete()
+        self.assertEqual(self.counts(), {"django": 1, "python": 2})
+
+        python = Tag.objects.get(name="python")
+        python.posts.clear()
+        self.posts[0].tags.clear()
+        self.assertEqual(self.counts(), {"django": 0, "python": 0})
+
+    def test_removing_links_lowers_count_and_score(self):
+        for post in self.posts:
+            set_post_tags(post, "django, python")
+        django, python = Tag.objects.get(name="django"), Tag.objects.get(name="python")
+        score = TagStats.objects.get(tag=django).score
+
+        # The third post is not tagged "unused", and removing links that do
+        # not exist must not change any count.
+        unused = Tag.objects.create(name="unused")
+        self.posts[0].tags.remove(django, unused)
+        python.posts.remove(self.posts[1], self.posts[2], self.posts[2])
+        django.posts.remove(self.posts[0])
+        self.assertEqual(self.counts(), {"django": 2, "python": 1})
+        self.assertAlmostEqual(TagStats.objects.get(tag=django).score, score * 2 / 3)
+
+        django.posts.clear()
+        python.posts.clear()
+        self.assertEqual(
+            list(TagStats.objects.filter(tag__in=[django, python]).values_list("post_count", "score")),
+            [(0, 0.0), (0, 0.0)],
+        )
+
+    def test_rebuild_matches_incremental_counts(self):
+        set_post_tags(self.posts[0], "a, b")
+        set_post_tags(self.posts[1], "a")
+        incremental = self.counts()
+        TagStats.objects.update(post_count=99)
+        call_command("rebuild_tag_stats", stdout=StringIO())
+        self.assertEqual(self.counts(), incremental)
+
+    def test_tag_cloud_page_and_sidebar(self):
+        set_post_tags(self.posts[0], "a, b")
+        set_post_tags(self.posts[1], "a")
+        response = self.client.get(reverse("tag-cloud"))
+        levels = {row.tag.name: row.level for row in response.context["tags"]}
+        self.assertEqual(levels, {"a": 5, "b": 1})
+
+        response = self.client.get(reverse("tag-posts", args=["b"]))
+        self.assertContains(response, 'class="tag-level-5"')
+
+        # Tagging another post invalidates cached pages showing the cloud.
+        set_post_tags(self.posts[2], "b")
+        response = self.client.get(reverse("tag-cloud"))
+        self.assertEqual(response["X-Cache"], "MISS")
+        counts = {row.tag.name: row.post_count for row in response.context["tags"]}
+        self.assertEqual(counts, {"a": 2, "b": 2})
+
+
+class AsyncReadPathTests(BlogTestCase):
+    def setUp(self):
+        super().setUp()
+        self.user = User.objects.create_user(username="writer", password="pass12345")
+        self.post = Post.objects.create(title="Async Django", content="Body", author=self.user)
+        set_post_tags(self.post, "python")
+        Comment.objects.create(post=self.post, author=self.user, content="Nice")
+
+    async def test_async_views_render_like_sync_views(self):
+        pairs = [
+            ("post-list", "async-post-list", [], {"sort": "active"}),
+            ("post-detail", "async-post-detail", [self.post.pk], {}),
+            ("search", "async-search", [], {"q": "async"}),
+            ("tag-posts", "async-tag-posts", ["python"], {}),
+        ]
+        for sync_name, async_name, args, params in pairs:
+            expected = await self.async_client.get(reverse(sync_name, args=args), params)
+            response = await self.async_client.get(reverse(async_name, args=args), params)
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(response.content, expected.content)
+
+    async def test_async_detail_404(self):
+        response = await self.async_client.get(reverse("async-post-detail", args=[0]))
+        self.assertEqual(response.status_code, 404)
@@ -1,8 +1,14 @@
+from django.urls import path
 from .views import (
     PostListView, PostDetailView,
     PostCreateView, PostUpdateView, PostDeleteView,
     CommentCreateView, CommentUpdateView, CommentDeleteView,
-    SearchResultsView, TagPostListView,
+    SearchResultsView, TagPostListView, TagCloudView,
+    add_comment,
+)
+from .async_views import (
+    AsyncPostListView, AsyncPostDetailView,
+    AsyncSearchResultsView, AsyncTagPostListView,
 )
 
 urlpatterns = [
@@ -12,10 +18,18 @@ urlpatterns = [
     path("post/<int:pk>/update/", PostUpdateView.as_view(), name="post-update"),
     path("post/<int:pk>/delete/", PostDeleteView.as_view(), name="post-delete"),
 
-    path("post/<int:pk>/comments/new/", CommentCreateView.as_view(), name="comment-create"),
+    path("post/<int:post_id>/comments/new/", CommentCreateView.as_view(), name="comment-create"),
+    path("post/<int:post_id>/comments/add/", add_comment, name="comment-add"),
     path("comment/<int:pk>/update/", CommentUpdateView.as_view(), name="comment-update"),
     path("comment/<int:pk>/delete/", CommentDeleteView.as_view(), name="comment-delete"),
 
     path("search/", SearchResultsView.as_view(), name="search"),
+    path("tags/", TagCloudView.as_view(), name="tag-cloud"),
     path("tags/<str:tag_name>/", TagPostListView.as_view(), name="tag-posts"),
+
+    # Async read path (blog/async_views.py), for serving under ASGI.
+    path("async/posts/", AsyncPostListView.as_view(), name="async-post-list"),
+    path("async/post/<int:pk>/", AsyncPostDetailView.as_view(), name="async-post-detail"),
+    path("async/search/", AsyncSearchResultsView.as_view(), name="async-search"),
+    path("async/tags/<str:tag_name>/", AsyncTagPostListView.as_view(), name="async-tag-posts"),
 ]
@@ -9,33 +9,76 @@ from django.shortcuts import get_object_or_404, redirect
 from django.contrib.auth.mixins import LoginRequiredMixin, UserPassesTestMixin
 from django.views.generic import ListView, DetailView, CreateView, UpdateView, DeleteView
 from django.urls import reverse, reverse_lazy
+from django.core.paginator import Paginator
+from django.db import transaction
 from django.db.models import Q
 from .models import Post, Comment, Tag
+from .activity import comment_added, comment_removed
+from .cache import POSTS_GROUP, TAGS_GROUP, CachedPageMixin, post_group, tag_group
 from .forms import PostForm, CommentForm
+from .pagination import KeysetPaginationMixin
+from .search import get_search_engine
+from .tagging import set_post_tags, tags_named
+from .tagstats import CLOUD_ORDERS, tag_cloud
 from django.contrib.auth.decorators import login_required 
 from django.utils.decorators import method_decorator
-from django.views.generic import ListView
+from django.views.generic import ListView, TemplateView
 
 
-class PostListView(ListView):
+class PostSortMixin:
+    # ?sort=<name> -> keyset, each served by an index on Post.
+    sort_keysets = {
+        "newest": ("published_date", "pk"),
+        "active": ("comment_count", "pk"),
+    }
+
+    def get_sort(self):
+        sort = self.request.GET.get("sort", "newest")
+        return sort if sort in self.sort_keysets else "newest"
+
+    def get_keyset(self):
+        return self.sort_keysets[self.get_sort()]
+
+
+class PostListView(CachedPageMixin, PostSortMixin, KeysetPaginationMixin, ListView):
     model = Post
     template_name = "blog/post_list.html"
     context_object_name = "posts"
 
+    def get_cache_groups(self):
+        return [POSTS_GROUP]
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context["sort"] = self.get_sort()
+        return context
+
 
-class PostDetailView(DetailView):
+class PostDetailView(CachedPageMixin, DetailView):
     model = Post
     template_name = "blog/post_detail.html"
+    comments_per_page = 20
+
+    def get_cache_groups(self):
+        return [post_group(self.kwargs["pk"])]
+
+    def get_queryset(self):
+        # Tags are rendered on the page; load them with the post.
+        return Post.objects.select_related("author").prefetch_related("tags")
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        context["comments"] = self.object.comments.order_by("-created_at")
+        comments = self.object.comments.select_related("author").order_by("-created_at", "-pk")
+        page = Paginator(comments, self.comments_per_page).get_page(
+            self.request.GET.get("comments_page")
+        )
+        context["comments"] = page
         if self.request.user.is_authenticated:
             context["comment_form"] = CommentForm()
         return context
 
 
-cclass PostCreateView(LoginRequiredMixin, CreateView):
+class PostCreateView(LoginRequiredMixin, CreateView):
     model = Post
     form_class = PostForm
     template_name = "blog/post_form.html"
@@ -43,18 +86,9 @@ cclass PostCreateView(LoginRequiredMixin, CreateView):
     def form_valid(self, form):
         form.instance.author = self.request.user
         response = super().form_valid(form)
-        tags_str = form.cleaned_data.get("tags", "")
-        self._save_tags(tags_str, self.object)
+        set_post_tags(self.object, form.cleaned_data.get("tags", ""))
         return response
 
-    def _save_tags(self, tags_str, post):
-        tags = [t.strip() for t in tags_str.split(",") if t.strip()]
-        tag_objs = []
-        for name in tags:
-            tag_obj, created = Tag.objects.get_or_create(name=name)
-            tag_objs.append(tag_obj)
-        post.tags.set(tag_objs)
-
 
 class PostUpdateView(LoginRequiredMixin, UserPassesTestMixin, UpdateView):
     model = Post
@@ -69,25 +103,18 @@ class PostUpdateView(LoginRequiredMixin, UserPassesTestMixin, UpdateView):
     def form_valid(self, form):
         form.instance.author = self.request.user
         response = super().form_valid(form)
-        tags_str = form.cleaned_data.get("tags", "")
-        self._save_tags(tags_str, self.object)
+        set_post_tags(self.object, form.cleaned_data.get("tags", ""))
         return response
 
-    def _save_tags(self, tags_str, post):
-        tags = [t.strip() for t in tags_str.split(",") if t.strip()]
-        tag_objs = []
-        for name in tags:
-            tag_obj, created = Tag.objects.get_or_create(name=name)
-            tag_objs.append(tag_obj)
-        post.tags.set(tag_objs)
-
     def test_func(self):
         post = self.get_object()
         return self.request.user == post.author
 
 
 class PostDeleteView(LoginRequiredMixin, UserPassesTestMixin, DeleteView):
-    ...
+    model = Post
+    template_name = "blog/post_confirm_delete.html"
+    success_url = reverse_lazy("post-list")
 
     def test_func(self):
         post = self.get_object()
@@ -104,7 +131,9 @@ def add_comment(request, post_id):
             comment = form.save(commit=False)
             comment.post = post
             comment.author = request.user
-            comment.save()
+            with transaction.atomic():
+                comment.save()
+                comment_added(comment)
     return redirect("post-detail", pk=post.id)
 
 class CommentCreateView(LoginRequiredMixin, CreateView):
@@ -116,7 +145,10 @@ class CommentCreateView(LoginRequiredMixin, CreateView):
         post = get_object_or_404(Post, pk=self.kwargs["post_id"])
         form.instance.post = post
         form.instance.author = self.request.user
-        return super().form_valid(form)
+        with transaction.atomic():
+            response = super().form_valid(form)
+            comment_added(self.object)
+        return response
 
     def get_success_url(self):
         return reverse("post-detail", kwargs={"pk": self.kwargs["post_id"]})
@@ -138,6 +170,12 @@ class CommentDeleteView(LoginRequiredMixin, UserPassesTestMixin, DeleteView):
     model = Comment
     template_name = "blog/comment_confirm_delete.html"
 
+    def form_valid(self, form):
+        with transaction.atomic():
+            response = super().form_valid(form)
+            comment_removed(self.object)
+        return response
+
     def get_success_url(self):
         return reverse("post-detail", kwargs={"pk": self.object.post.pk})
 
@@ -152,23 +190,37 @@ class SearchResultsView(ListView):
 
     def get_queryset(self):
         query = self.request.GET.get("q", "")
-        return Post.objects.filter(
-            Q(title__icontains=query) |
-            Q(content__icontains=query) |
-            Q(tags__name__icontains=query)
-        ).distinct()
+        return get_search_engine().search(query)
 
 
-class TagPostListView(ListView):
+class TagPostListView(CachedPageMixin, KeysetPaginationMixin, ListView):
     model = Post
     template_name = "blog/tag_post_list.html"
     context_object_name = "posts"
 
+    def get_cache_groups(self):
+        return [tag_group(self.kwargs["tag_name"]), TAGS_GROUP]
+
     def get_queryset(self):
-        tag_name = self.kwargs["tag_name"]
-        return Post.objects.filter(tags__name=tag_name).distinct()
+        # resolve_tags() never creates two tags that differ only in case, so
+        # the join cannot duplicate posts.
+        return Post.objects.filter(tags__in=tags_named(self.kwargs["tag_name"]))
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         context["tag_name"] = self.kwargs["tag_name"]
         return context
+
+
+class TagCloudView(CachedPageMixin, TemplateView):
+    template_name = "blog/tag_cloud.html"
+
+    def get_cache_groups(self):
+        return [TAGS_GROUP]
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        order = self.request.GET.get("order", "popular")
+        context["order"] = order if order in CLOUD_ORDERS else "popular"
+        context["tags"] = tag_cloud(context["order"])
+        return context
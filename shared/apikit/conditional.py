@@ -0,0 +1,173 @@
+import hashlib
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.apps import apps
+from django.conf import settings
+from django.db.models import F
+from django.utils import timezone
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+
+
+# Conditional GET for the read endpoints.
+#
+# List responses are validated by the version counters of the tables they
+# read; detail responses by the object's updated_at column. Either way the
+# validators cost one indexed lookup, so a matching If-None-Match /
+# If-Modified-Since gets a 304 before the queryset is evaluated or anything
+# is serialized.
+#
+# The counters live in the project's API_TABLE_VERSION_MODEL (default
+# 'api.TableVersion'), a model with fields table (primary key), version and
+# updated_at. The project bumps them from its model signals; writes that
+# bypass signals (QuerySet.update(), bulk_create(), bulk_update()) must call
+# bump_table_version() themselves. Inside coalesce_table_versions() the
+# per-row bumps of a QuerySet.delete() become one bump per table.
+
+# Tables bumped inside the current coalesce_table_versions() block.
+_pending_bumps = ContextVar('apikit_pending_bumps', default=None)
+
+
+def get_table_version_model():
+    return apps.get_model(getattr(settings, 'API_TABLE_VERSION_MODEL', 'api.TableVersion'))
+
+
+def bump_table_version(model):
+    pending = _pending_bumps.get()
+    if pending is not None:
+        pending.setdefault(model._meta.db_table, model)
+        return
+    TableVersion = get_table_version_model()
+    table = model._meta.db_table
+    now = timezone.now()
+    updated = TableVersion.objects.filter(table=table).update(
+        version=F('version') + 1, updated_at=now
+    )
+    if not updated:
+        TableVersion.objects.get_or_create(
+            table=table, defaults={'version': 1, 'updated_at': now}
+        )
+
+
+@contextmanager
+def coalesce_table_versions():
+    """Bump each table changed in the block once, when the block succeeds."""
+    if _pending_bumps.get() is not None:
+        yield
+        return
+    pending = {}
+    token = _pending_bumps.set(pending)
+    try:
+        yield
+    finally:
+        _pending_bumps.reset(token)
+    for model in pending.values():
+        bump_table_version(model)
+
+
+def get_table_versions(models):
+    """Return ([version per model], latest change time or None)."""
+    tables = [model._meta.db_table for model in models]
+    return _versions(tables, _version_rows(tables))
+
+
+async def aget_table_versions(models):
+    tables = [model._meta.db_table for model in models]
+    return _versions(tables, [row async for row in _version_rows(tables)])
+
+
+def _version_rows(tables):
+    return get_table_version_model().objects.filter(table__in=tables).values_list('table', 'version', 'updated_at')
+
+
+def _versions(tables, version_rows):
+    rows = {table: (version, updated_at) for table, version, updated_at in version_rows}
+    versions = [rows.get(table, (0, None))[0] for table in tables]
+    stamps = [rows[table][1] for table in tables if table in rows]
+    return versions, max(stamps, default=None)
+
+
+class ConditionalGetMixin:
+    """
+    Strong ETag and Last-Modified headers for list() and retrieve().
+
+    etag_models lists the models whose changes can alter a list response
+    (defaults to the queryset's model).
+    """
+    etag_models = None
+
+    def make_etag(self, *parts):
+        # The same data renders differently per format (JSON, browsable API).
+        raw = '|'.join(str(part) for part in (*parts, self.request.accepted_renderer.format))
+        return hashlib.md5(raw.encode()).hexdigest()
+
+    def get_list_validators(self):
+        models = self.etag_models or [self.get_queryset().model]
+        versions, last_modified = get_table_versions(models)
+        return self.make_etag(self.request.get_full_path(), *versions), last_modified
+
+    async def aget_list_validators(self):
+        models = self.etag_models or [self.get_queryset().model]
+        versions, last_modified = await aget_table_versions(models)
+        return self.make_etag(self.request.get_full_path(), *versions), last_modified
+
+    def get_object_validators(self):
+        return self.object_validators(self.object_updated_at().first())
+
+    async def aget_object_validators(self):
+        return self.object_validators(await self.object_updated_at().afirst())
+
+    def object_updated_at(self):
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        return (
+            self.filter_queryset(self.get_queryset())
+            .filter(**{self.lookup_field: self.kwargs[lookup_url_kwarg]})
+            .values_list('updated_at', flat=True)
+        )
+
+    def object_validators(self, updated_at):
+        if updated_at is None:
+            # Let retrieve() produce the 404.
+            return None, None
+        # The full path, because query parameters (?fields=) shape the body too.
+        return self.make_etag(self.request.get_full_path(), updated_at.isoformat()), updated_at
+
+    def conditional(self, validators, handler, request, *args, **kwargs):
+        etag, last_modified = validators
+        if etag is None:
+            return handler(request, *args, **kwargs)
+        response = self.not_modified(request, etag, last_modified) or handler(request, *args, **kwargs)
+        return self.add_validators(response, etag, last_modified)
+
+    async def aconditional(self, validators, handler, request, *args, **kwargs):
+        """conditional() for an async handler."""
+        etag, last_modified = validators
+        if etag is None:
+            return await handler(request, *args, **kwargs)
+        response = (
+            self.not_modified(request, etag, last_modified)
+            or await handler(request, *args, **kwargs)
+        )
+        return self.add_validators(response, etag, last_modified)
+
+    def not_modified(self, request, etag, last_modified):
+        timestamp = int(last_modified.timestamp()) if last_modified else None
+        return get_conditional_response(request, etag=quote_etag(etag), last_modified=timestamp)
+
+    def add_validators(self, response, etag, last_modified):
+        if response.status_code in (200, 304):
+            response['ETag'] = quote_etag(etag)
+            if last_modified is not None:
+                response['Last-Modified'] = http_date(int(last_modified.timestamp()))
+        return response
+
+    def list(self, request, *args, **kwargs):
+        return self.conditional(
+            self.get_list_validators(), super().list, request, *args, **kwargs
+        )
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.conditional(
+            self.get_object_validators(), super().retrieve, request, *args, **kwargs
+        )
@@ -0,0 +1,68 @@
+import os
+import tempfile
+import time
+from unittest import mock
+
+from django.contrib.auth.models import AnonymousUser
+from django.core.management.base import BaseCommand
+from django.test import RequestFactory
+from rest_framework.throttling import AnonRateThrottle
+
+from apikit.throttling import AnonBucketThrottle, Limiter, SQLiteBucketStore
+
+
+class Command(BaseCommand):
+    help = (
+        "Measure the cost of one throttle decision: DRF's cache-backed "
+        "AnonRateThrottle against the token-bucket throttle with the local "
+        "store and with the shared SQLite store (with and without leases)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--decisions", type=int, default=100000)
+        parser.add_argument("--clients", type=int, default=1000)
+        parser.add_argument("--rate", default="10000/min")
+        parser.add_argument("--path", default="/api/books/", help="Path of the simulated requests.")
+
+    def handle(self, *args, **options):
+        factory = RequestFactory()
+        requests = []
+        for i in range(options["clients"]):
+            request = factory.get(options["path"], REMOTE_ADDR=f"10.{i // 65536}.{i // 256 % 256}.{i % 256}")
+            request.user = AnonymousUser()
+            requests.append(request)
+
+        handle, path = tempfile.mkstemp(suffix=".sqlite3")
+        os.close(handle)
+        try:
+            limiters = [
+                ("DRF AnonRateThrottle (cache)", None),
+                ("bucket, local store", Limiter()),
+                ("bucket, sqlite, no lease", Limiter(SQLiteBucketStore(path))),
+                ("bucket, sqlite, lease 10", Limiter(SQLiteBucketStore(path), lease_size=10)),
+            ]
+            for label, limiter in limiters:
+                self.run(label, limiter, requests, options)
+        finally:
+            os.remove(path)
+            for suffix in ("-wal", "-shm"):
+                if os.path.exists(path + suffix):
+                    os.remove(path + suffix)
+
+    def run(self, label, limiter, requests, options):
+        rate = options["rate"]
+        if limiter is None:
+            throttle_class = type("Throttle", (AnonRateThrottle,), {"rate": rate})
+        else:
+            throttle_class = type("Throttle", (AnonBucketThrottle,), {"rate": rate})
+
+        allowed = 0
+        count = options["decisions"]
+        with mock.patch("apikit.throttling.get_limiter", return_value=limiter):
+            started = time.perf_counter()
+            for i in range(count):
+                allowed += throttle_class().allow_request(requests[i % len(requests)], None)
+            elapsed = time.perf_counter() - started
+        self.stdout.write(
+            f"{label:<30} {elapsed / count * 1e6:8.2f} us/decision  ({allowed} allowed of {count})"
+        )
@@ -0,0 +1,91 @@
+from rest_framework.exceptions import ParseError
+from rest_framework.negotiation import DefaultContentNegotiation
+from rest_framework.parsers import BaseParser
+from rest_framework.renderers import BaseRenderer, JSONRenderer
+from rest_framework.utils import encoders
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+
+# Faster encoders for API responses, registered in REST_FRAMEWORK.
+#
+# - ORJSONRenderer encodes application/json with orjson. It is opt-in
+#   (?format=orjson) because its output is not always JSONRenderer's:
+#   floats use orjson's repr (1e16, 1e-7 instead of 1e+16, 1e-07) and NaN
+#   and Infinity become null instead of raising under STRICT_JSON. It falls
+#   back to JSONRenderer when orjson is not installed, when an indent is
+#   requested, or for values orjson cannot encode.
+# - MessagePackRenderer / MessagePackParser handle application/msgpack and
+#   need the msgpack package.
+#
+# A class whose package is missing sets available = False, and
+# AvailableContentNegotiation skips it: a msgpack request without msgpack
+# installed gets 406 / 415 instead of a 500.
+
+# DRF's encodings for dates, decimals, lazy strings, querysets...
+_default = encoders.JSONEncoder().default
+
+
+class ORJSONRenderer(JSONRenderer):
+    format = 'orjson'
+    available = True
+
+    if orjson is not None:
+        options = orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if (
+            orjson is None or data is None or self.ensure_ascii or not self.compact
+            or self.get_indent(accepted_media_type, renderer_context or {}) is not None
+        ):
+            return super().render(data, accepted_media_type, renderer_context)
+        try:
+            ret = orjson.dumps(data, default=_default, option=self.options)
+        except TypeError:
+            # E.g. integers wider than 64 bits.
+            return super().render(data, accepted_media_type, renderer_context)
+        # Same JavaScript-safe escaping as JSONRenderer.
+        return ret.replace('\u2028'.encode(), b'\\u2028').replace('\u2029'.encode(), b'\\u2029')
+
+
+class MessagePackRenderer(BaseRenderer):
+    media_type = 'application/msgpack'
+    format = 'msgpack'
+    charset = None
+    render_style = 'binary'
+    available = msgpack is not None
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        return msgpack.packb(data, default=_default, use_bin_type=True)
+
+
+class MessagePackParser(BaseParser):
+    media_type = 'application/msgpack'
+    renderer_class = MessagePackRenderer
+    available = msgpack is not None
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        try:
+            return msgpack.unpackb(stream.read(), raw=False)
+        except (ValueError, TypeError, msgpack.UnpackException) as exc:
+            raise ParseError('MessagePack parse error - %s' % str(exc))
+
+
+class AvailableContentNegotiation(DefaultContentNegotiation):
+    def select_parser(self, request, parsers):
+        parsers = [parser for parser in parsers if getattr(parser, 'available', True)]
+        return super().select_parser(request, parsers)
+
+    def select_renderer(self, request, renderers, format_suffix=None):
+        renderers = [renderer for renderer in renderers if getattr(renderer, 'available', True)]
+        return super().select_renderer(request, renderers, format_suffix)
@@ -0,0 +1,159 @@
+import sqlite3
+import threading
+import time
+from functools import lru_cache
+
+from django.conf import settings
+from rest_framework.throttling import AnonRateThrottle, UserRateThrottle
+
+
+# Token-bucket throttling.
+#
+# A bucket holds up to `num_requests` tokens (the burst) and refills at
+# num_requests / duration tokens per second; each request spends one token.
+# Buckets live in a store:
+# - LocalBucketStore keeps them in a dict, so a decision is a few
+#   microseconds but every worker process has its own limit.
+# - SQLiteBucketStore keeps them in a SQLite file shared by all workers on
+#   the host (API_THROTTLE_STORE = 'sqlite').
+# With the shared store a process leases API_THROTTLE_LEASE_SIZE tokens at a
+# time and spends them locally, so most decisions still never leave the
+# process. A lease is dropped after API_THROTTLE_LEASE_SECONDS; unused
+# leased tokens let a client exceed its limit by at most lease size x
+# workers.
+
+def refill(tokens, updated, now, rate, capacity):
+    return min(capacity, tokens + max(0.0, now - updated) * rate)
+
+
+class LocalBucketStore:
+    # Buckets that have refilled completely carry no information; they are
+    # pruned once there are more than max_keys buckets.
+    max_keys = 100000
+
+    def __init__(self):
+        self.buckets = {}
+        self.lock = threading.Lock()
+
+    def take(self, key, rate, capacity, count=1):
+        """Take up to count tokens; return (tokens taken, tokens left)."""
+        now = time.time()
+        with self.lock:
+            tokens, updated, _ = self.buckets.get(key, (capacity, now, now))
+            tokens = refill(tokens, updated, now, rate, capacity)
+            taken = min(count, int(tokens))
+            left = tokens - taken
+            self.buckets[key] = (left, now, now + (capacity - left) / rate)
+            if len(self.buckets) > self.max_keys:
+                self.buckets = {
+                    key: bucket for key, bucket in self.buckets.items() if bucket[2] > now
+                }
+        return taken, left
+
+
+class SQLiteBucketStore:
+    def __init__(self, path):
+        self.path = str(path)
+        self.local = threading.local()
+
+    def connection(self):
+        # One connection per thread, opened lazily so forked workers never
+        # share one.
+        conn = getattr(self.local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            conn.execute(
+                'CREATE TABLE IF NOT EXISTS throttle_bucket ('
+                'key TEXT PRIMARY KEY, tokens REAL NOT NULL, updated REAL NOT NULL)'
+            )
+            self.local.conn = conn
+        return conn
+
+    def take(self, key, rate, capacity, count=1):
+        """Take up to count tokens; return (tokens taken, tokens left)."""
+        conn = self.connection()
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            now = time.time()
+            row = conn.execute(
+                'SELECT tokens, updated FROM throttle_bucket WHERE key = ?', (key,)
+            ).fetchone()
+            tokens = refill(*(row or (capacity, now)), now, rate, capacity)
+            taken = min(count, int(tokens))
+            conn.execute(
+                'INSERT OR REPLACE INTO throttle_bucket (key, tokens, updated) VALUES (?, ?, ?)',
+                (key, tokens - taken, now),
+            )
+            conn.execute('COMMIT')
+        except BaseException:
+            conn.execute('ROLLBACK')
+            raise
+        return taken, tokens - taken
+
+
+class Limiter:
+    def __init__(self, shared=None, lease_size=1, lease_seconds=1.0):
+        self.local = LocalBucketStore()
+        self.shared = shared
+        self.lease_size = lease_size
+        self.lease_seconds = lease_seconds
+        self.leases = {}
+        self.lock = threading.Lock()
+
+    def allow(self, key, rate, capacity):
+        """Return (allowed, seconds until the next token if not allowed)."""
+        if self.shared is None:
+            taken, left = self.local.take(key, rate, capacity)
+        else:
+            now = time.monotonic()
+            with self.lock:
+                tokens, expires = self.leases.get(key, (0, 0.0))
+                if tokens and expires > now:
+                    self.leases[key] = (tokens - 1, expires)
+                    return True, None
+            taken, left = self.shared.take(key, rate, capacity, self.lease_size)
+            if taken:
+                with self.lock:
+                    self.leases[key] = (taken - 1, now + self.lease_seconds)
+        if taken:
+            return True, None
+        return False, (1 - left) / rate
+
+
+@lru_cache(maxsize=None)
+def get_limiter():
+    if getattr(settings, 'API_THROTTLE_STORE', 'local') == 'sqlite':
+        return Limiter(
+            SQLiteBucketStore(settings.API_THROTTLE_SQLITE_PATH),
+            lease_size=getattr(settings, 'API_THROTTLE_LEASE_SIZE', 10),
+            lease_seconds=getattr(settings, 'API_THROTTLE_LEASE_SECONDS', 1.0),
+        )
+    return Limiter()
+
+
+class BucketThrottleMixin:
+    # Replaces SimpleRateThrottle's cache-backed request history with a
+    # token bucket from get_limiter(); rates and keys stay DRF's.
+    def allow_request(self, request, view):
+        if self.rate is None:
+            return True
+        key = self.get_cache_key(request, view)
+        if key is None:
+            return True
+        allowed, self.retry_after = get_limiter().allow(
+            key, self.num_requests / self.duration, self.num_requests
+        )
+        return allowed
+
+    def wait(self):
+        return self.retry_after
+
+
+class AnonBucketThrottle(BucketThrottleMixin, AnonRateThrottle):
+    """Limits anonymous clients by IP address ('anon' rate)."""
+
+
+class UserBucketThrottle(BucketThrottleMixin, UserRateThrottle):
+    """Limits authenticated clients by user id ('user' rate)."""
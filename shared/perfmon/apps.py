@@ -0,0 +1,15 @@
+from django.apps import AppConfig, apps
+
+
+class PerfmonConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'perfmon'
+
+    def ready(self):
+        # Register the receiver that adds the query recorder to new connections.
+        from . import signals  # noqa: F401
+
+        if apps.is_installed('rest_framework'):
+            from .middleware import instrument_serializers
+
+            instrument_serializers()
@@ -0,0 +1,212 @@
+import logging
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from time import perf_counter
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+
+from .stats import registry, sql_shape
+
+logger = logging.getLogger('perfmon')
+
+
+# Records, for every request, the number of SQL queries, the time spent in
+# them, the time spent in DRF serializers (.data, or any block wrapped in
+# serializer_phase()), the time spent rendering (TemplateResponse and DRF
+# Response bodies) and the rest of the view ("app": Python code, forms),
+# adds them to the per-view histograms in perfmon.stats and reports them to
+# the client in a Server-Timing header (by default only with DEBUG on).
+# Queries run while serializing or rendering count as db, not as serializer
+# or render time.
+#
+# A request that runs the same SQL shape PERFMON_N_PLUS_ONE_THRESHOLD times or
+# more is flagged as a likely N+1 and logged to the 'perfmon' logger.
+#
+# Templates rendered with the render() shortcut are part of "app": they run
+# inside the view, before the middleware sees the response. Streaming
+# responses are measured up to the first byte.
+#
+# Goes first in MIDDLEWARE so the total covers the other middleware too.
+
+class QueryRecorder:
+    """
+    Database execute wrapper counting queries, their time and their SQL; also
+    accumulates the request's serializer time (see serializer_phase()).
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+        self.statements = Counter()
+        self.serializer = 0.0
+        # Set while a serializer_phase() block runs and once rendering has
+        # started: serializers called from a renderer (the browsable API's
+        # forms) are part of render.
+        self.busy = False
+
+    def __call__(self, execute, sql, params, many, context):
+        start = perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.duration += perf_counter() - start
+            self.count += 1
+            self.statements[sql] += 1
+
+    def most_repeated(self):
+        """(SQL shape, count) of the most repeated shape, or (None, 0)."""
+        shapes = Counter()
+        for sql, count in self.statements.items():
+            shapes[sql_shape(sql)] += count
+        return shapes.most_common(1)[0] if shapes else (None, 0)
+
+
+# The recorder of the request being handled. A context variable rather than
+# a per-connection execute_wrapper() because database connections are per
+# thread, and the async ORM runs its queries in worker threads that inherit
+# the request's context but not its connection.
+current_recorder = ContextVar('perfmon_recorder', default=None)
+
+
+def record_query(execute, sql, params, many, context):
+    """Execute wrapper installed on every connection (see perfmon.signals)."""
+    recorder = current_recorder.get()
+    if recorder is None:
+        return execute(sql, params, many, context)
+    return recorder(execute, sql, params, many, context)
+
+
+@contextmanager
+def serializer_phase():
+    """Count the enclosed block as serializer time of the current request."""
+    recorder = current_recorder.get()
+    if recorder is None or recorder.busy:
+        yield
+        return
+    recorder.busy = True
+    start, db_before = perf_counter(), recorder.duration
+    try:
+        yield
+    finally:
+        recorder.serializer += perf_counter() - start - (recorder.duration - db_before)
+        recorder.busy = False
+
+
+def instrument_serializers():
+    """Time every DRF serializer's .data (installed by PerfmonConfig.ready())."""
+    from rest_framework.serializers import BaseSerializer
+
+    data = BaseSerializer.data.fget
+    if getattr(data, 'perfmon', False):
+        return
+
+    def timed_data(self):
+        with serializer_phase():
+            return data(self)
+
+    timed_data.perfmon = True
+    BaseSerializer.data = property(timed_data)
+
+
+class PerfmonMiddleware:
+    async_capable = True
+    sync_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.enabled = getattr(settings, 'PERFMON_ENABLED', True)
+        # Timings and query counts tell clients how the server works; only
+        # send them in development unless a project opts in.
+        self.server_timing = getattr(settings, 'PERFMON_SERVER_TIMING', settings.DEBUG)
+        self.threshold = getattr(settings, 'PERFMON_N_PLUS_ONE_THRESHOLD', 5)
+        # Under ASGI the chain stays async, so async views keep running on
+        # the event loop.
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+        if not self.enabled:
+            return self.get_response(request)
+        recorder, token = self.start(request)
+        try:
+            response = self.get_response(request)
+        finally:
+            current_recorder.reset(token)
+        return self.finish(request, response, recorder)
+
+    async def __acall__(self, request):
+        if not self.enabled:
+            return await self.get_response(request)
+        recorder, token = self.start(request)
+        try:
+            response = await self.get_response(request)
+        finally:
+            current_recorder.reset(token)
+        return self.finish(request, response, recorder)
+
+    def start(self, request):
+        recorder = request._perfmon_recorder = QueryRecorder()
+        request._perfmon_render = None
+        request._perfmon_start = perf_counter()
+        return recorder, current_recorder.set(recorder)
+
+    def finish(self, request, response, recorder):
+        total = perf_counter() - request._perfmon_start
+
+        render = db_during_render = 0.0
+        if request._perfmon_render is not None:
+            render_start, db_before_render = request._perfmon_render
+            db_during_render = recorder.duration - db_before_render
+            render = perf_counter() - render_start - db_during_render
+        timings = {
+            'total': total,
+            'db': recorder.duration,
+            'serializer': recorder.serializer,
+            'render': render,
+            'app': max(0.0, total - recorder.duration - recorder.serializer - render),
+        }
+
+        shape, repeats = recorder.most_repeated()
+        repeated = None
+        if repeats >= self.threshold:
+            repeated = {'sql': shape, 'count': repeats}
+            logger.warning(
+                'Possible N+1 in %s %s: %d similar queries: %s',
+                request.method, request.path, repeats, shape,
+            )
+
+        match = request.resolver_match
+        view = f'{request.method} {match.view_name if match else "<unresolved>"}'
+        sample = {f'{name}_ms': seconds * 1000 for name, seconds in timings.items()}
+        sample['queries'] = recorder.count
+        registry.record(view, sample, repeated)
+
+        if self.server_timing:
+            response['Server-Timing'] = self.server_timing_header(timings, recorder.count, repeated)
+        return response
+
+    def process_template_response(self, request, response):
+        # Called for TemplateResponse (and DRF's Response) just before the
+        # handler renders it.
+        recorder = getattr(request, '_perfmon_recorder', None)
+        if recorder is not None:
+            recorder.busy = True
+            request._perfmon_render = (perf_counter(), recorder.duration)
+        return response
+
+    def server_timing_header(self, timings, queries, repeated):
+        metrics = [
+            f'db;dur={timings["db"] * 1000:.2f};desc="{queries} queries"',
+            f'app;dur={timings["app"] * 1000:.2f}',
+            f'serializer;dur={timings["serializer"] * 1000:.2f}',
+            f'render;dur={timings["render"] * 1000:.2f}',
+            f'total;dur={timings["total"] * 1000:.2f}',
+        ]
+        if repeated:
+            metrics.append(f'nplusone;desc="{repeated["count"]} similar queries"')
+        return ', '.join(metrics)
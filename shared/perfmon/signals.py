@@ -0,0 +1,11 @@
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+
+from .middleware import record_query
+
+
+@receiver(connection_created)
+def install_query_recorder(sender, connection, **kwargs):
+    # The wrapper list outlives reconnects, so only add it once.
+    if record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(record_query)
@@ -0,0 +1,119 @@
+import re
+import threading
+from bisect import bisect_left
+
+from django.utils import timezone
+
+
+# Per-view request statistics, aggregated in process memory.
+#
+# Every request adds one sample to a few fixed-bucket histograms, so the
+# cost is a lock, a dict lookup and a bisect whatever the traffic; memory
+# grows with the number of views, not requests. Each worker process keeps
+# its own numbers.
+
+# Bucket upper bounds; the last bucket is open-ended.
+TIME_BUCKETS_MS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000)
+QUERY_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+
+_STRINGS = re.compile(r"'(?:[^']|'')*'")
+_NUMBERS = re.compile(r'\b\d+(?:\.\d+)?\b')
+_IN_LISTS = re.compile(r'\(\s*(?:%s|\?)(?:\s*,\s*(?:%s|\?))*\s*\)')
+
+
+def sql_shape(sql):
+    """sql with literals and IN (...) lists collapsed, so repeats compare equal."""
+    sql = _NUMBERS.sub('?', _STRINGS.sub('?', sql))
+    return _IN_LISTS.sub('(?)', sql)
+
+
+class Histogram:
+    def __init__(self, bounds):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.total = 0.0
+        self.max = 0
+
+    def add(self, value):
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.total += value
+        self.max = max(self.max, value)
+
+    def percentile(self, fraction):
+        """Upper bound of the bucket holding the given fraction of samples."""
+        rank = fraction * sum(self.counts)
+        seen = 0
+        for bound, count in zip(self.bounds, self.counts):
+            seen += count
+            if count and seen >= rank:
+                return bound
+        return self.max
+
+    def as_dict(self):
+        samples = sum(self.counts)
+        labels = [f'le_{bound}' for bound in self.bounds] + [f'gt_{self.bounds[-1]}']
+        return {
+            'buckets': dict(zip(labels, self.counts)),
+            'mean': round(self.total / samples, 3) if samples else 0,
+            'p50': self.percentile(0.5),
+            'p95': self.percentile(0.95),
+            'p99': self.percentile(0.99),
+            'max': round(self.max, 3),
+        }
+
+
+class ViewStats:
+    def __init__(self):
+        self.requests = 0
+        self.histograms = {
+            'total_ms': Histogram(TIME_BUCKETS_MS),
+            'db_ms': Histogram(TIME_BUCKETS_MS),
+            'app_ms': Histogram(TIME_BUCKETS_MS),
+            'serializer_ms': Histogram(TIME_BUCKETS_MS),
+            'render_ms': Histogram(TIME_BUCKETS_MS),
+            'queries': Histogram(QUERY_BUCKETS),
+        }
+        self.n_plus_one = 0
+        self.last_n_plus_one = None
+
+    def add(self, sample, repeated):
+        self.requests += 1
+        for name, value in sample.items():
+            self.histograms[name].add(value)
+        if repeated:
+            self.n_plus_one += 1
+            self.last_n_plus_one = repeated
+
+    def as_dict(self):
+        data = {'requests': self.requests}
+        data.update((name, histogram.as_dict()) for name, histogram in self.histograms.items())
+        data['n_plus_one'] = {'requests': self.n_plus_one, 'last': self.last_n_plus_one}
+        return data
+
+
+class StatsRegistry:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.reset()
+
+    def record(self, view, sample, repeated=None):
+        """Add a request's sample ({histogram: value}) and its repeated SQL, if any."""
+        with self.lock:
+            stats = self.views.get(view)
+            if stats is None:
+                stats = self.views[view] = ViewStats()
+            stats.add(sample, repeated)
+
+    def snapshot(self):
+        with self.lock:
+            return {
+                'since': self.since.isoformat(),
+                'views': {view: stats.as_dict() for view, stats in sorted(self.views.items())},
+            }
+
+    def reset(self):
+        self.views = {}
+        self.since = timezone.now()
+
+
+registry = StatsRegistry()
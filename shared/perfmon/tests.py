@@ -0,0 +1,168 @@
+import time
+import unittest
+
+from django.apps import apps
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.http import HttpResponse
+from django.template import engines
+from django.template.response import TemplateResponse
+from django.test import TestCase, override_settings
+from django.urls import include, path, reverse
+
+from .middleware import serializer_phase
+from .stats import Histogram, registry, sql_shape
+
+User = get_user_model()
+
+
+def one_query(request):
+    User.objects.count()
+    return HttpResponse('ok')
+
+
+def n_plus_one(request):
+    for user in User.objects.all():
+        User.objects.filter(pk=user.pk).exists()
+    return HttpResponse('ok')
+
+
+async def async_query(request):
+    await User.objects.acount()
+    return HttpResponse('ok')
+
+
+def serialize(request):
+    with serializer_phase():
+        User.objects.count()
+        time.sleep(0.02)
+    return HttpResponse('ok')
+
+
+def drf_serializer(request):
+    from rest_framework import serializers
+
+    class SlowSerializer(serializers.Serializer):
+        name = serializers.SerializerMethodField()
+
+        def get_name(self, obj):
+            time.sleep(0.02)
+            return 'name'
+
+    return HttpResponse(SlowSerializer({}).data['name'])
+
+
+def template_response(request):
+    template = engines['django'].from_string('{{ count }}')
+    return TemplateResponse(request, template, {'count': User.objects.count()})
+
+
+urlpatterns = [
+    path('one/', one_query, name='one-query'),
+    path('loop/', n_plus_one, name='n-plus-one'),
+    path('serialize/', serialize, name='serialize'),
+    path('drf/', drf_serializer, name='drf-serializer'),
+    path('template/', template_response, name='template-response'),
+    path('async/', async_query, name='async-query'),
+    path('perfmon/', include('perfmon.urls')),
+]
+
+
+@override_settings(ROOT_URLCONF=__name__, SECURE_SSL_REDIRECT=False, PERFMON_SERVER_TIMING=True)
+class PerfmonMiddlewareTests(TestCase):
+    """
+    Per-view query counts, timings, N+1 flags and the stats endpoint.
+    """
+
+    def setUp(self):
+        registry.reset()
+
+    def test_server_timing_header(self):
+        response = self.client.get(reverse('one-query'))
+        metrics = [metric.split(';')[0] for metric in response['Server-Timing'].split(', ')]
+        self.assertEqual(metrics, ['db', 'app', 'serializer', 'render', 'total'])
+        self.assertIn('desc="1 queries"', response['Server-Timing'])
+
+    def durations(self, response):
+        return {
+            metric.split(';')[0]: float(metric.split('dur=')[1].split(';')[0])
+            for metric in response['Server-Timing'].split(', ') if 'dur=' in metric
+        }
+
+    def test_serializer_time_is_not_app_time(self):
+        durations = self.durations(self.client.get(reverse('serialize')))
+        self.assertGreaterEqual(durations['serializer'], 20)
+        self.assertLess(durations['app'], 20)
+        histogram = registry.snapshot()['views']['GET serialize']['serializer_ms']
+        self.assertGreaterEqual(histogram['mean'], 20)
+
+    @unittest.skipUnless(apps.is_installed('rest_framework'), 'REST framework is not installed')
+    def test_drf_serializer_data_is_measured(self):
+        durations = self.durations(self.client.get(reverse('drf-serializer')))
+        self.assertGreaterEqual(durations['serializer'], 20)
+        self.assertLess(durations['app'], 20)
+
+    async def test_async_views_are_measured(self):
+        response = await self.async_client.get(reverse('async-query'))
+        self.assertIn('desc="1 queries"', response['Server-Timing'])
+
+    def test_requests_are_aggregated_per_view(self):
+        for _ in range(3):
+            self.client.get(reverse('one-query'))
+        self.client.get(reverse('template-response'))
+        views = registry.snapshot()['views']
+        self.assertEqual(views['GET one-query']['requests'], 3)
+        self.assertEqual(views['GET one-query']['queries']['buckets']['le_1'], 3)
+        self.assertEqual(views['GET template-response']['requests'], 1)
+
+    def test_repeated_queries_are_flagged(self):
+        User.objects.bulk_create([User(username=f'user{i}') for i in range(6)])
+        with self.assertLogs('perfmon', 'WARNING'):
+            response = self.client.get(reverse('n-plus-one'))
+        self.assertIn('nplusone', response['Server-Timing'])
+        flagged = registry.snapshot()['views']['GET n-plus-one']['n_plus_one']
+        self.assertEqual(flagged['requests'], 1)
+        self.assertEqual(flagged['last']['count'], 6)
+
+        self.client.get(reverse('one-query'))
+        self.assertEqual(registry.snapshot()['views']['GET one-query']['n_plus_one']['requests'], 0)
+
+    def test_server_timing_follows_debug_by_default(self):
+        with self.settings(PERFMON_SERVER_TIMING=None):
+            del settings.PERFMON_SERVER_TIMING
+            self.assertNotIn('Server-Timing', self.client_class().get(reverse('one-query')))
+            with self.settings(DEBUG=True):
+                self.assertIn('Server-Timing', self.client_class().get(reverse('one-query')))
+        self.assertEqual(registry.snapshot()['views']['GET one-query']['requests'], 2)
+
+    @override_settings(PERFMON_ENABLED=False)
+    def test_disabled(self):
+        response = self.client.get(reverse('one-query'))
+        self.assertNotIn('Server-Timing', response)
+        self.assertEqual(registry.snapshot()['views'], {})
+
+    def test_stats_endpoint_is_staff_only(self):
+        url = reverse('perfmon-stats')
+        self.client.get(reverse('one-query'))
+        self.assertEqual(self.client.get(url).status_code, 403)
+
+        self.client.force_login(User.objects.create_user(username='reader', password='pass1234'))
+        self.assertEqual(self.client.get(url).status_code, 403)
+
+        self.client.force_login(
+            User.objects.create_user(username='admin', password='pass1234', is_staff=True)
+        )
+        data = self.client.get(url).json()
+        self.assertEqual(data['views']['GET one-query']['requests'], 1)
+
+    def test_sql_shape_and_histogram(self):
+        self.assertEqual(
+            sql_shape('SELECT * FROM t WHERE id IN (%s, %s, %s) AND name = \'x\' LIMIT 21'),
+            'SELECT * FROM t WHERE id IN (?) AND name = ? LIMIT ?',
+        )
+        histogram = Histogram((1, 10, 100))
+        for value in (0.5, 5, 5, 50, 500):
+            histogram.add(value)
+        self.assertEqual(histogram.counts, [1, 2, 1, 1])
+        self.assertEqual(histogram.percentile(0.5), 10)
+        self.assertEqual(histogram.percentile(1), 500)
@@ -0,0 +1,19 @@
+import os
+
+from django.core.exceptions import PermissionDenied
+from django.http import JsonResponse
+from django.views.decorators.cache import never_cache
+from django.views.decorators.http import require_GET
+
+from .stats import registry
+
+
+@require_GET
+@never_cache
+def stats(request):
+    """Per-view histograms collected by PerfmonMiddleware in this process (staff only)."""
+    if not (request.user.is_active and request.user.is_staff):
+        raise PermissionDenied
+    data = registry.snapshot()
+    data['pid'] = os.getpid()
+    return JsonResponse(data)